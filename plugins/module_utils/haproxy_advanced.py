@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey, nicholas@morey.tech
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+import base64
+import binascii
+import re
+
+# a haproxy time value, in milliseconds when there is no unit
+HAPROXY_TIME_RE = re.compile(r'^\d+(us|ms|s|m|h|d)?$')
+
+
+def decode_advanced(text):
+    """ return the lines of a base64 encoded advanced pass thru field, like the webgui stores them """
+    if not text:
+        return []
+    try:
+        text = base64.b64decode(text, validate=True).decode('utf-8')
+    except (binascii.Error, ValueError):
+        pass
+    return [line.rstrip() for line in text.splitlines() if line.strip()]
+
+
+def encode_advanced(lines):
+    """ return lines as an advanced pass thru field, base64 encoded like the webgui does """
+    if not lines:
+        return ''
+    return base64.b64encode('\n'.join(lines).encode('utf-8')).decode('ascii')
+
+
+def _keyword_of(line, keywords):
+    """ return the keyword of keywords line sets, None if it sets none of them """
+    words = line.split()
+    for keyword in keywords:
+        size = len(keyword.split())
+        if words[:size] == keyword.split():
+            return keyword
+    return None
+
+
+def get_advanced_options(text, keywords):
+    """ return keyword -> value of the keywords set in an advanced pass thru field, the last line wins like in haproxy """
+    options = dict()
+    for line in decode_advanced(text):
+        keyword = _keyword_of(line, keywords)
+        if keyword is not None:
+            options[keyword] = ' '.join(line.split()[len(keyword.split()):])
+    return options
+
+
+def set_advanced_options(text, options):
+    """ return text with the keyword lines of options set, or None if nothing changes
+
+    options maps a keyword to its value: the line of the keyword is replaced in place, or added at the end when missing,
+    and removed when the value is False. Keywords whose value is None are left as they are, so are the other lines.
+    """
+    options = dict((keyword, value) for keyword, value in options.items() if value is not None)
+    lines = decode_advanced(text)
+    result = []
+    done = set()
+    for line in lines:
+        keyword = _keyword_of(line, options)
+        if keyword is None:
+            result.append(line)
+        elif options[keyword] is not False and keyword not in done:
+            result.append(line[:len(line) - len(line.lstrip())] + '{0} {1}'.format(keyword, options[keyword]).rstrip())
+            done.add(keyword)
+    for keyword in options:
+        if options[keyword] is not False and keyword not in done:
+            result.append('{0} {1}'.format(keyword, options[keyword]).rstrip())
+
+    if result == lines:
+        return None
+    return encode_advanced(result)
+
+
+def split_inline_options(text, keywords, flags=()):
+    """ return (keyword -> value, other text) of a one line pass thru, like the per server one
+
+    The keywords take one value, except the flags which take none and whose value is True.
+    """
+    options = dict()
+    rest = []
+    words = (text or '').split()
+    idx = 0
+    while idx < len(words):
+        if words[idx] in flags:
+            options[words[idx]] = True
+            idx += 1
+        elif words[idx] in keywords and idx + 1 < len(words):
+            options[words[idx]] = words[idx + 1]
+            idx += 2
+        else:
+            rest.append(words[idx])
+            idx += 1
+    return (options, ' '.join(rest))
+
+
+def join_inline_options(text, options):
+    """ return the one line pass thru text followed by the keywords of options whose value is not None, in options order """
+    parts = [text.strip()] if text and text.strip() else []
+    parts += ['{0} {1}'.format(keyword, value) for keyword, value in options.items() if value is not None]
+    return ' '.join(parts)
+
+
+def set_inline_options(text, options, flags=()):
+    """ return the one line pass thru text with the keywords of options set, or None if nothing changes
+
+    Like set_advanced_options, a keyword is replaced in place, or added at the end when missing, and removed when its
+    value is False. Keywords whose value is None are left as they are. The flags take no value and are set by True.
+    """
+    (current, dummy) = split_inline_options(text, options, flags)
+    wanted = dict((keyword, value) for keyword, value in options.items() if value is not None)
+    if all(current.get(keyword, False) == (value if value is False or value is True else str(value)) for keyword, value in wanted.items()):
+        return None
+
+    words = (text or '').split()
+    result = []
+    done = set()
+    idx = 0
+    while idx < len(words):
+        keyword = words[idx]
+        size = 1 if keyword in flags else 2
+        if keyword not in wanted:
+            result.append(keyword)
+            size = 1
+        elif wanted[keyword] is not False and keyword not in done:
+            result.append(_inline_option(keyword, wanted[keyword]))
+            done.add(keyword)
+        idx += size
+    for keyword, value in wanted.items():
+        if value is not False and keyword not in done:
+            result.append(_inline_option(keyword, value))
+    return ' '.join(result)
+
+
+def _inline_option(keyword, value):
+    """ return the text setting keyword to value in a one line pass thru """
+    if value is True:
+        return keyword
+    return '{0} {1}'.format(keyword, value)
@@ -0,0 +1,387 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey, nicholas@morey.tech
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_apply import haproxy_update
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_base import get_haproxy_section
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_backend import (
+    PFSenseHaproxyBackendModule,
+    HAPROXY_BACKEND_ARGUMENT_SPEC,
+)
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_backend_server import (
+    PFSenseHaproxyBackendServerModule,
+    HAPROXY_BACKEND_SERVER_ARGUMENT_SPEC,
+    HAPROXY_BACKEND_SERVER_ITEM_ARGUMENT_SPEC,
+    HAPROXY_BACKEND_SERVER_ITEM_MUTUALLY_EXCLUSIVE,
+)
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_frontend import (
+    PFSenseHaproxyFrontendModule,
+    HAPROXY_FRONTEND_ARGUMENT_SPEC,
+)
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_frontend_server import (
+    PFSenseHaproxyFrontendServerModule,
+    HAPROXY_FRONTEND_SERVER_ARGUMENT_SPEC,
+)
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_frontend_acl import (
+    PFSenseHaproxyFrontendAclModule,
+    HAPROXY_FRONTEND_ACL_ARGUMENT_SPEC,
+)
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_frontend_action import (
+    PFSenseHaproxyFrontendActionModule,
+    HAPROXY_FRONTEND_ACTION_ARGUMENT_SPEC,
+)
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_profile import get_haproxy_profiler, haproxy_phase, load_haproxy_pfsense
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_render import render_haproxy_cfg, set_rendered_result
+
+HAPROXY_AGGREGATE_ARGUMENT_SPEC = dict(
+    aggregated_backends=dict(required=False, type='list', elements='dict'),
+    aggregated_backend_servers=dict(required=False, type='list', elements='dict'),
+    aggregated_frontends=dict(required=False, type='list', elements='dict'),
+    aggregated_frontend_servers=dict(required=False, type='list', elements='dict'),
+    aggregated_frontend_acls=dict(required=False, type='list', elements='dict'),
+    aggregated_frontend_actions=dict(required=False, type='list', elements='dict'),
+    purge_backends=dict(default=False, required=False, type='bool'),
+    purge_backend_servers=dict(default=False, required=False, type='bool'),
+    purge_frontends=dict(default=False, required=False, type='bool'),
+    purge_frontend_servers=dict(default=False, required=False, type='bool'),
+    purge_frontend_acls=dict(default=False, required=False, type='bool'),
+    purge_frontend_actions=dict(default=False, required=False, type='bool'),
+    reload=dict(default='immediate', choices=['immediate', 'deferred']),
+    render_only=dict(default=False, required=False, type='bool'),
+    profile=dict(default=False, required=False, type='bool'),
+)
+
+HAPROXY_AGGREGATE_REQUIRED_ONE_OF = [[
+    'aggregated_backends',
+    'aggregated_backend_servers',
+    'aggregated_frontends',
+    'aggregated_frontend_servers',
+    'aggregated_frontend_acls',
+    'aggregated_frontend_actions',
+]]
+
+
+def _get_text(elt, tag):
+    """ return the text of the tag child of elt, or None """
+    child_elt = elt.find(tag)
+    if child_elt is None:
+        return None
+    return child_elt.text
+
+
+def _items(container_elt):
+    """ yield the item children of container_elt """
+    if container_elt is None:
+        return
+    for item_elt in container_elt:
+        if item_elt.tag == 'item':
+            yield item_elt
+
+
+class PFSenseHaproxyAggregateModule(object):
+    """ module managing a whole pfsense haproxy configuration in one run """
+
+    @staticmethod
+    def get_argument_spec():
+        """ return argument spec """
+        return HAPROXY_AGGREGATE_ARGUMENT_SPEC
+
+    ##############################
+    # init
+    #
+    def __init__(self, module):
+        self.module = module
+        self.pfsense = load_haproxy_pfsense(module)
+
+        # all the modules share the same pfsense object, and so the same XML tree
+        self.pfsense_backends = PFSenseHaproxyBackendModule(module, self.pfsense)
+        self.pfsense_backend_servers = PFSenseHaproxyBackendServerModule(module, self.pfsense)
+        self.pfsense_frontends = PFSenseHaproxyFrontendModule(module, self.pfsense)
+        self.pfsense_frontend_servers = PFSenseHaproxyFrontendServerModule(module, self.pfsense)
+        self.pfsense_frontend_acls = PFSenseHaproxyFrontendAclModule(module, self.pfsense)
+        self.pfsense_frontend_actions = PFSenseHaproxyFrontendActionModule(module, self.pfsense)
+        self.rendered_before = None
+
+    def _all_modules(self):
+        """ return the managed modules in dependency order """
+        return [
+            self.pfsense_backends,
+            self.pfsense_frontends,
+            self.pfsense_backend_servers,
+            self.pfsense_frontend_servers,
+            self.pfsense_frontend_acls,
+            self.pfsense_frontend_actions,
+        ]
+
+    @staticmethod
+    def _params_from_spec(spec, **values):
+        """ return a complete params dict for spec, as AnsibleModule would have built it """
+        params = dict()
+        for name, option in spec.items():
+            params[name] = option.get('default')
+        params.update(values)
+        return params
+
+    def _validate_items(self, name, spec, mutually_exclusive=None):
+        """ check every item of the name list against the spec of its module and return them with defaults set """
+        items = self.module.params[name]
+        if items is None:
+            return []
+
+        # reloading, rendering and profiling are done once for all the items
+        spec = dict((option, value) for option, value in spec.items() if option not in ['reload', 'render_only', 'profile'])
+        validator = ArgumentSpecValidator(spec, mutually_exclusive=mutually_exclusive)
+        validated = []
+        for idx, item in enumerate(items):
+            result = validator.validate(item)
+            if result.error_messages:
+                self.module.fail_json(msg="{0}[{1}]: {2}".format(name, idx, ', '.join(result.error_messages)))
+            validated.append(result.validated_parameters)
+        return validated
+
+    ##############################
+    # want matching
+    #
+    @staticmethod
+    def want_backend(backend_elt, backends):
+        """ return True if we want to keep backend_elt """
+        name = _get_text(backend_elt, 'name')
+        for backend in backends:
+            if backend['state'] == 'absent':
+                continue
+            if backend['name'] == name:
+                return True
+        return False
+
+    @staticmethod
+    def want_backend_server(backend_name, server_elt, servers):
+        """ return True if we want to keep server_elt """
+        name = _get_text(server_elt, 'name')
+        for server in servers:
+            if server['state'] == 'absent':
+                continue
+            if server['backend'] == backend_name and server['name'] == name:
+                return True
+        return False
+
+    @staticmethod
+    def want_frontend(frontend_elt, frontends):
+        """ return True if we want to keep frontend_elt """
+        name = _get_text(frontend_elt, 'name')
+        for frontend in frontends:
+            if frontend['state'] == 'absent':
+                continue
+            if frontend['name'] == name:
+                return True
+        return False
+
+    @staticmethod
+    def want_frontend_server(frontend_name, server_elt, servers):
+        """ return True if we want to keep server_elt """
+        name = _get_text(server_elt, 'name')
+        for server in servers:
+            if server['state'] == 'absent':
+                continue
+            if server['frontend'] == frontend_name and "'{0}_{1}'".format(server['extaddr'], server['extaddr_port']) == name:
+                return True
+        return False
+
+    @staticmethod
+    def want_frontend_acl(frontend_name, acl_elt, acls):
+        """ return True if we want to keep acl_elt """
+        name = _get_text(acl_elt, 'name')
+        for acl in acls:
+            if acl['state'] == 'absent':
+                continue
+            if acl['frontend'] == frontend_name and acl['name'] == name:
+                return True
+        return False
+
+    @staticmethod
+    def want_frontend_action(frontend_name, action_elt, actions):
+        """ return True if we want to keep action_elt """
+        action = _get_text(action_elt, 'action')
+        acl = _get_text(action_elt, 'acl') or ''
+        for want in actions:
+            if want['state'] == 'absent':
+                continue
+            if want['frontend'] != frontend_name or want['action'] != action or (want['acl'] or '') != acl:
+                continue
+            if action == 'use_backend' and want['backend'] == _get_text(action_elt, 'use_backendbackend'):
+                return True
+            if action == 'custom' and want['custom_action'] == _get_text(action_elt, 'customcustomaction'):
+                return True
+        return False
+
+    ##############################
+    # run
+    #
+    def _purge_frontend_actions(self, want):
+        """ delete every frontend action not in want """
+        todel = []
+        for frontend_elt in _items(self.pfsense_frontends.frontends):
+            frontend_name = _get_text(frontend_elt, 'name')
+            for action_elt in _items(frontend_elt.find('a_actionitems')):
+                if self.want_frontend_action(frontend_name, action_elt, want):
+                    continue
+                todel.append(self._params_from_spec(
+                    HAPROXY_FRONTEND_ACTION_ARGUMENT_SPEC,
+                    state='absent',
+                    frontend=frontend_name,
+                    action=_get_text(action_elt, 'action'),
+                    backend=_get_text(action_elt, 'use_backendbackend'),
+                    custom_action=_get_text(action_elt, 'customcustomaction'),
+                    acl=_get_text(action_elt, 'acl'),
+                ))
+        for params in todel:
+            self.pfsense_frontend_actions.run(params)
+
+    def _purge_frontend_acls(self, want):
+        """ delete every frontend acl not in want """
+        todel = []
+        for frontend_elt in _items(self.pfsense_frontends.frontends):
+            frontend_name = _get_text(frontend_elt, 'name')
+            for acl_elt in _items(frontend_elt.find('a_acl')):
+                if self.want_frontend_acl(frontend_name, acl_elt, want):
+                    continue
+                todel.append(self._params_from_spec(
+                    HAPROXY_FRONTEND_ACL_ARGUMENT_SPEC,
+                    state='absent',
+                    frontend=frontend_name,
+                    name=_get_text(acl_elt, 'name'),
+                    expression=_get_text(acl_elt, 'expression'),
+                    value=_get_text(acl_elt, 'value'),
+                ))
+        for params in todel:
+            self.pfsense_frontend_acls.run(params)
+
+    def _purge_frontend_servers(self, want):
+        """ delete every frontend server not in want """
+        todel = []
+        for frontend_elt in _items(self.pfsense_frontends.frontends):
+            frontend_name = _get_text(frontend_elt, 'name')
+            for server_elt in _items(frontend_elt.find('a_extaddr')):
+                if self.want_frontend_server(frontend_name, server_elt, want):
+                    continue
+                todel.append(self._params_from_spec(
+                    HAPROXY_FRONTEND_SERVER_ARGUMENT_SPEC,
+                    state='absent',
+                    frontend=frontend_name,
+                    extaddr=_get_text(server_elt, 'extaddr'),
+                    extaddr_port=_get_text(server_elt, 'extaddr_port'),
+                ))
+        for params in todel:
+            self.pfsense_frontend_servers.run(params)
+
+    def _purge_backend_servers(self, want):
+        """ delete every backend server not in want """
+        todel = []
+        for backend_elt in _items(self.pfsense_backends.backends):
+            backend_name = _get_text(backend_elt, 'name')
+            for server_elt in _items(backend_elt.find('ha_servers')):
+                if self.want_backend_server(backend_name, server_elt, want):
+                    continue
+                todel.append(self._params_from_spec(
+                    HAPROXY_BACKEND_SERVER_ARGUMENT_SPEC,
+                    state='absent',
+                    backend=backend_name,
+                    name=_get_text(server_elt, 'name'),
+                ))
+        for params in todel:
+            self.pfsense_backend_servers.run(params)
+
+    def _purge_frontends(self, want):
+        """ delete every frontend not in want """
+        todel = []
+        for frontend_elt in _items(self.pfsense_frontends.frontends):
+            if not self.want_frontend(frontend_elt, want):
+                todel.append(self._params_from_spec(HAPROXY_FRONTEND_ARGUMENT_SPEC, state='absent', name=_get_text(frontend_elt, 'name')))
+        for params in todel:
+            self.pfsense_frontends.run(params)
+
+    def _purge_backends(self, want):
+        """ delete every backend not in want """
+        todel = []
+        for backend_elt in _items(self.pfsense_backends.backends):
+            if not self.want_backend(backend_elt, want):
+                todel.append(self._params_from_spec(HAPROXY_BACKEND_ARGUMENT_SPEC, state='absent', name=_get_text(backend_elt, 'name')))
+        for params in todel:
+            self.pfsense_backends.run(params)
+
+    def run(self):
+        """ process input params to add/update/delete all haproxy objects """
+        params = self.module.params
+        if params['render_only']:
+            with haproxy_phase(self.pfsense, 'render'):
+                self.rendered_before = render_haproxy_cfg(get_haproxy_section(self.pfsense))
+
+        backends = self._validate_items('aggregated_backends', HAPROXY_BACKEND_ARGUMENT_SPEC)
+        backend_servers = self._validate_items(
+            'aggregated_backend_servers',
+            dict(HAPROXY_BACKEND_SERVER_ITEM_ARGUMENT_SPEC, backend=HAPROXY_BACKEND_SERVER_ARGUMENT_SPEC['backend']),
+            HAPROXY_BACKEND_SERVER_ITEM_MUTUALLY_EXCLUSIVE)
+        frontends = self._validate_items('aggregated_frontends', HAPROXY_FRONTEND_ARGUMENT_SPEC)
+        frontend_servers = self._validate_items('aggregated_frontend_servers', HAPROXY_FRONTEND_SERVER_ARGUMENT_SPEC)
+        frontend_acls = self._validate_items('aggregated_frontend_acls', HAPROXY_FRONTEND_ACL_ARGUMENT_SPEC)
+        frontend_actions = self._validate_items('aggregated_frontend_actions', HAPROXY_FRONTEND_ACTION_ARGUMENT_SPEC)
+
+        # objects are purged from the leaves to the roots...
+        if params['purge_frontend_actions']:
+            self._purge_frontend_actions(frontend_actions)
+        if params['purge_frontend_acls']:
+            self._purge_frontend_acls(frontend_acls)
+        if params['purge_frontend_servers']:
+            self._purge_frontend_servers(frontend_servers)
+        if params['purge_backend_servers']:
+            self._purge_backend_servers(backend_servers)
+        if params['purge_frontends']:
+            self._purge_frontends(frontends)
+        if params['purge_backends']:
+            self._purge_backends(backends)
+
+        # ...and created from the roots to the leaves
+        for item_params in backends:
+            self.pfsense_backends.run(item_params)
+        for item_params in frontends:
+            self.pfsense_frontends.run(item_params)
+        for item_params in backend_servers:
+            self.pfsense_backend_servers.run(item_params)
+        for item_params in frontend_servers:
+            self.pfsense_frontend_servers.run(item_params)
+        for item_params in frontend_acls:
+            self.pfsense_frontend_acls.run(item_params)
+        for item_params in frontend_actions:
+            self.pfsense_frontend_actions.run(item_params)
+
+    def commit_changes(self):
+        """ apply changes and exit module """
+        stdout = ''
+        stderr = ''
+        changed = any(pfmodule.result['changed'] for pfmodule in self._all_modules())
+
+        result = dict(reloaded=False)
+        if self.rendered_before is not None:
+            with haproxy_phase(self.pfsense, 'render'):
+                rendered = render_haproxy_cfg(get_haproxy_section(self.pfsense))
+            set_rendered_result(result, self.rendered_before, rendered)
+        elif changed and not self.module.check_mode:
+            self.pfsense.write_config(descr='aggregated haproxy change')
+            (dummy, stdout, stderr) = haproxy_update(self.pfsense, self.module.params['reload'], result, get_haproxy_section(self.pfsense))
+
+        result['result_backends'] = self.pfsense_backends.result['commands']
+        result['result_backend_servers'] = self.pfsense_backend_servers.result['commands']
+        result['result_frontends'] = self.pfsense_frontends.result['commands']
+        result['result_frontend_servers'] = self.pfsense_frontend_servers.result['commands']
+        result['result_frontend_acls'] = self.pfsense_frontend_acls.result['commands']
+        result['result_frontend_actions'] = self.pfsense_frontend_actions.result['commands']
+        result['changed'] = changed
+        result['stdout'] = stdout
+        result['stderr'] = stderr
+        profiler = get_haproxy_profiler(self.pfsense)
+        if profiler is not None:
+            result['timings'] = profiler.report()
+        self.module.exit_json(**result)
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey, nicholas@morey.tech
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+import hashlib
+import re
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_profile import (
+    get_haproxy_profiler,
+    haproxy_phase,
+    haproxy_visit,
+    load_haproxy_pfsense,
+)
+
+HAPROXY_APPLY_ARGUMENT_SPEC = dict(
+    force=dict(default=False, required=False, type='bool'),
+    profile=dict(default=False, required=False, type='bool'),
+)
+
+# regenerate haproxy.cfg, check it and reload haproxy
+HAPROXY_RELOAD_CMD = '''require_once("haproxy/haproxy.inc");
+$result = haproxy_check_and_run($savemsg, true); if ($result) unlink_if_exists($d_haproxyconfdirty_path);
+echo "reloaded=" . ($result ? 1 : 0) . "\\n";'''
+
+# only flag haproxy as dirty (like the webgui does), counting the reloads we are skipping in the flag file
+HAPROXY_DEFER_RELOAD_CMD = '''require_once("haproxy/haproxy.inc");
+$pending = 0; if (file_exists($d_haproxyconfdirty_path)) $pending = intval(file_get_contents($d_haproxyconfdirty_path));
+$pending = max($pending, 0) + 1; file_put_contents($d_haproxyconfdirty_path, $pending);
+echo "pending=" . $pending . "\\n";'''
+
+# reload haproxy if it has been flagged as dirty, a flag file left empty by the webgui counts as one reload
+HAPROXY_APPLY_CMD = '''require_once("haproxy/haproxy.inc");
+$pending = 0; if (file_exists($d_haproxyconfdirty_path)) $pending = max(intval(file_get_contents($d_haproxyconfdirty_path)), 1);
+echo "pending=" . $pending . "\\n";
+if ($pending > 0 || {force}) {{
+$result = haproxy_check_and_run($savemsg, true); if ($result) unlink_if_exists($d_haproxyconfdirty_path);
+echo "reloaded=" . ($result ? 1 : 0) . "\\n"; echo $savemsg;
+}}'''
+
+# only report if haproxy has been flagged as dirty
+HAPROXY_PENDING_CMD = '''require_once("haproxy/haproxy.inc");
+$pending = 0; if (file_exists($d_haproxyconfdirty_path)) $pending = max(intval(file_get_contents($d_haproxyconfdirty_path)), 1);
+echo "pending=" . $pending . "\\n";'''
+
+# fields of the haproxy items which are not used to generate haproxy.cfg
+HAPROXY_COSMETIC_FIELDS = frozenset(['desc'])
+
+
+def _get_counter(stdout, name):
+    """ return the value of the name=<int> line printed by our php commands """
+    match = re.search(r'^{0}=(\d+)$'.format(name), stdout or '', re.MULTILINE)
+    if match is None:
+        return None
+    return int(match.group(1))
+
+
+def _canonical(elt, visited):
+    """ return the canonical form of elt, or None if it holds nothing (pfsense handles empty and missing fields alike) """
+    visited[0] += 1
+    children = []
+    for child_elt in elt:
+        if child_elt.tag in HAPROXY_COSMETIC_FIELDS:
+            continue
+        child = _canonical(child_elt, visited)
+        if child is not None:
+            children.append(child)
+    text = (elt.text or '').strip()
+    if not text and not children and not elt.attrib:
+        return None
+    return (elt.tag, text, sorted(elt.attrib.items()), children)
+
+
+def haproxy_fingerprint(haproxy_elt, visited=None):
+    """ return a digest of the haproxy configuration, leaving out what does not end up in haproxy.cfg
+
+    The number of elements walked is added to visited[0], when given.
+    """
+    if visited is None:
+        visited = [0]
+    return hashlib.sha256(repr(_canonical(haproxy_elt, visited)).encode('utf-8')).hexdigest()
+
+
+def _pfsense_fingerprint(pfsense, haproxy_elt):
+    """ return the fingerprint of haproxy_elt, timed and counted when profiling """
+    visited = [0]
+    with haproxy_phase(pfsense, 'fingerprint'):
+        fingerprint = haproxy_fingerprint(haproxy_elt, visited)
+    haproxy_visit(pfsense, 'fingerprint', visited[0])
+    return fingerprint
+
+
+def remember_haproxy_fingerprint(pfsense, haproxy_elt):
+    """ take the fingerprint of the haproxy configuration before any change, once per pfsense XML tree """
+    if getattr(pfsense, 'haproxy_fingerprint', None) is None and haproxy_elt is not None:
+        pfsense.haproxy_fingerprint = _pfsense_fingerprint(pfsense, haproxy_elt)
+
+
+def haproxy_update(pfsense, reload_mode, result, haproxy_elt=None):
+    """ reload haproxy now or, when the reload is deferred, only flag it as dirty
+
+    Nothing is done when the fingerprint of haproxy_elt is the one remembered before the changes.
+    """
+    result['reloaded'] = False
+    before = getattr(pfsense, 'haproxy_fingerprint', None)
+    if before is not None and haproxy_elt is not None and before == _pfsense_fingerprint(pfsense, haproxy_elt):
+        return (0, '', '')
+
+    if reload_mode == 'deferred':
+        (rc, stdout, stderr) = pfsense.phpshell(HAPROXY_DEFER_RELOAD_CMD)
+        result['pending_reloads'] = _get_counter(stdout, 'pending')
+        return (rc, stdout, stderr)
+
+    (rc, stdout, stderr) = pfsense.phpshell(HAPROXY_RELOAD_CMD)
+    result['reloaded'] = _get_counter(stdout, 'reloaded') == 1
+    return (rc, stdout, stderr)
+
+
+class PFSenseHaproxyApplyModule(object):
+    """ module applying deferred pfsense haproxy reloads """
+
+    @staticmethod
+    def get_argument_spec():
+        """ return argument spec """
+        return HAPROXY_APPLY_ARGUMENT_SPEC
+
+    ##############################
+    # init
+    #
+    def __init__(self, module, pfsense=None):
+        self.module = module
+        self.pfsense = load_haproxy_pfsense(module, pfsense)
+        self.result = dict(changed=False, coalesced=0, reloaded=False)
+
+        profiler = get_haproxy_profiler(self.pfsense)
+        if profiler is not None:
+            self.result['timings'] = profiler.report()
+
+    ##############################
+    # run
+    #
+    def run(self, params):
+        """ reload haproxy once for all the deferred reloads """
+        if self.module.check_mode:
+            (dummy, stdout, stderr) = self.pfsense.phpshell(HAPROXY_PENDING_CMD)
+            pending = _get_counter(stdout, 'pending') or 0
+            self.result['changed'] = pending > 0 or params['force']
+            self.result['coalesced'] = pending
+            return
+
+        force = 'true' if params['force'] else 'false'
+        (dummy, stdout, stderr) = self.pfsense.phpshell(HAPROXY_APPLY_CMD.format(force=force))
+        self.result['coalesced'] = _get_counter(stdout, 'pending') or 0
+        self.result['reloaded'] = _get_counter(stdout, 'reloaded') == 1
+        self.result['changed'] = _get_counter(stdout, 'reloaded') is not None
+        self.result['stdout'] = stdout
+        self.result['stderr'] = stderr
+
+        if self.result['changed'] and not self.result['reloaded']:
+            self.module.fail_json(msg='haproxy configuration check failed', **self.result)
+
+    def commit_changes(self):
+        """ exit module """
+        self.module.exit_json(**self.result)
@@ -6,15 +6,20 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 import re
-from ansible_collections.pfsensible.core.plugins.module_utils.module_base import PFSenseModuleBase
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_advanced import HAPROXY_TIME_RE, get_advanced_options, set_advanced_options
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_base import PFSenseHaproxyBase
 
 HAPROXY_BACKEND_ARGUMENT_SPEC = dict(
     state=dict(default='present', choices=['present', 'absent']),
     name=dict(required=True, type='str'),
-    balance=dict(default='none', choices=['none', 'roundrobin', 'static-rr', 'leastconn', 'source', 'uri']),
+    balance=dict(default='none', choices=['none', 'roundrobin', 'static-rr', 'leastconn', 'source', 'uri', 'hdr', 'url_param', 'random', 'first']),
     balance_urilen=dict(required=False, type='int'),
     balance_uridepth=dict(required=False, type='int'),
     balance_uriwhole=dict(required=False, type='bool'),
+    balance_hdr=dict(required=False, type='str'),
+    balance_url_param=dict(required=False, type='str'),
+    balance_random_draws=dict(required=False, type='int'),
+    hash_type=dict(required=False, choices=['map-based', 'consistent']),
     connection_timeout=dict(required=False, type='int'),
     server_timeout=dict(required=False, type='int'),
     check_type=dict(default='none', choices=['none', 'Basic', 'HTTP', 'Agent', 'LDAP', 'MySQL', 'PostgreSQL', 'Redis', 'SMTP', 'ESMTP', 'SSL']),
@@ -26,10 +31,47 @@ HAPROXY_BACKEND_ARGUMENT_SPEC = dict(
     monitor_httpversion=dict(required=False, type='str'),
     monitor_username=dict(required=False, type='str'),
     monitor_domain=dict(required=False, type='str'),
+    http_reuse=dict(required=False, choices=['never', 'safe', 'aggressive', 'always']),
+    pool_max_conn=dict(required=False, type='int'),
+    pool_purge_delay=dict(required=False, type='str'),
+    reload=dict(default='immediate', choices=['immediate', 'deferred']),
+    render_only=dict(default=False, required=False, type='bool'),
+    profile=dict(default=False, required=False, type='bool'),
 )
 
+# param -> backend keyword, without a field in the webgui, written in the backend pass thru (advanced_backend)
+# the pool settings are server keywords, set on all the servers of the backend with default-server
+HAPROXY_BACKEND_OPTIONS = dict(
+    hash_type='hash-type',
+    http_reuse='http-reuse',
+    pool_max_conn='default-server pool-max-conn',
+    pool_purge_delay='default-server pool-purge-delay',
+)
+
+# balance -> the param giving its argument, which is required
+HAPROXY_BALANCE_ARGS = dict(
+    hdr='balance_hdr',
+    url_param='balance_url_param',
+)
+
+# the param of the arguments of each balance algorithm, only valid with it
+HAPROXY_BALANCE_PARAMS = dict(
+    balance_urilen='uri',
+    balance_uridepth='uri',
+    balance_uriwhole='uri',
+    balance_hdr='hdr',
+    balance_url_param='url_param',
+    balance_random_draws='random',
+)
+
+# the balance algorithms hashing a request key, to which hash-type applies
+HAPROXY_BALANCE_HASHES = ['source', 'uri', 'hdr', 'url_param']
 
-class PFSenseHaproxyBackendModule(PFSenseModuleBase):
+# a header name (RFC 7230 token)
+HAPROXY_HEADER_RE = re.compile(r"^[A-Za-z0-9!#$%&'*+.^_`|~-]+$")
+
+
+class PFSenseHaproxyBackendModule(PFSenseHaproxyBase):
     """ module managing pfsense haproxy backends """
 
     @staticmethod
@@ -43,13 +85,6 @@ class PFSenseHaproxyBackendModule(PFSenseModuleBase):
     def __init__(self, module, pfsense=None):
         super(PFSenseHaproxyBackendModule, self).__init__(module, pfsense)
         self.name = "pfsense_haproxy_backend"
-        self.obj = dict()
-
-        pkgs_elt = self.pfsense.get_element('installedpackages')
-        self.haproxy = pkgs_elt.find('haproxy') if pkgs_elt is not None else None
-        self.root_elt = self.haproxy.find('ha_pools') if self.haproxy is not None else None
-        if self.root_elt is None:
-            self.module.fail_json(msg='Unable to find backends XML configuration entry. Are you sure haproxy is installed ?')
 
     ##############################
     # params processing
@@ -59,9 +94,7 @@ class PFSenseHaproxyBackendModule(PFSenseModuleBase):
         obj = dict()
         obj['name'] = self.params['name']
         if self.params['state'] == 'present':
-            self._get_ansible_param(obj, 'balance', force=True)
-            if obj['balance'] == 'none':
-                obj['balance'] = None
+            obj['balance'] = self._balance()
             self._get_ansible_param(obj, 'balance_urilen', force=True)
             self._get_ansible_param(obj, 'balance_uridepth', force=True)
             self._get_ansible_param(obj, 'connection_timeout', force=True)
@@ -77,14 +110,76 @@ class PFSenseHaproxyBackendModule(PFSenseModuleBase):
             self._get_ansible_param(obj, 'monitor_username', force=True)
             self._get_ansible_param(obj, 'monitor_domain', force=True)
 
+            options = dict((keyword, self.params[param]) for param, keyword in HAPROXY_BACKEND_OPTIONS.items())
+            backend_elt = self.index.find(self.root_elt, obj['name'])
+            advanced = set_advanced_options(backend_elt.findtext('advanced_backend') if backend_elt is not None else None, options)
+            if advanced is not None:
+                obj['advanced_backend'] = advanced
+
         return obj
 
+    def _balance(self):
+        """ return the balance field, the algorithm with its arguments as the haproxy package writes it in haproxy.cfg """
+        balance = self.params['balance']
+        if balance == 'none':
+            return None
+        if balance == 'hdr':
+            return 'hdr({0})'.format(self.params['balance_hdr'])
+        if balance == 'url_param':
+            return 'url_param {0}'.format(self.params['balance_url_param'])
+        if balance == 'random' and self.params['balance_random_draws'] is not None:
+            return 'random({0})'.format(self.params['balance_random_draws'])
+        return balance
+
+    def _validate_balance(self):
+        """ check the arguments of the balance algorithm """
+        balance = self.params['balance']
+        for param, algorithm in HAPROXY_BALANCE_PARAMS.items():
+            if self.params[param] not in [None, False] and balance != algorithm:
+                self.module.fail_json(msg="{0} is only valid when balance is '{1}'".format(param, algorithm))
+
+        param = HAPROXY_BALANCE_ARGS.get(balance)
+        if param is not None and not self.params[param]:
+            self.module.fail_json(msg="{0} is required when balance is '{1}'".format(param, balance))
+        if self.params['balance_hdr'] is not None and not HAPROXY_HEADER_RE.match(self.params['balance_hdr']):
+            self.module.fail_json(msg="balance_hdr must be a header name")
+        if self.params['balance_url_param'] is not None and re.search(r'[\s&=?#]', self.params['balance_url_param']) is not None:
+            self.module.fail_json(msg="balance_url_param must be a URL parameter name")
+        if self.params['balance_random_draws'] is not None and self.params['balance_random_draws'] < 1:
+            self.module.fail_json(msg='balance_random_draws must be positive')
+
+        if self.params['hash_type'] is not None and balance not in HAPROXY_BALANCE_HASHES:
+            self.module.fail_json(msg="hash_type is only valid when balance is one of {0}".format(', '.join(HAPROXY_BALANCE_HASHES)))
+
     def _validate_params(self):
         """ do some extra checks on input parameters """
+        self.root_elt = self.backends
+
         # check name
         if re.search(r'[^a-zA-Z0-9\.\-_]', self.params['name']) is not None:
             self.module.fail_json(msg="The field 'name' contains invalid characters.")
 
+        if self.params['state'] == 'present':
+            self._validate_balance()
+        if self.params['pool_max_conn'] is not None and self.params['pool_max_conn'] < -1:
+            self.module.fail_json(msg='pool_max_conn must be -1 (unlimited) or more')
+        if self.params['pool_purge_delay'] is not None and not HAPROXY_TIME_RE.match(self.params['pool_purge_delay']):
+            self.module.fail_json(msg="pool_purge_delay must be a haproxy time, like 5s or 500ms")
+
+    @staticmethod
+    def _options(advanced):
+        """ return param -> value of the options set in a backend pass thru, the int params as int, like the module params """
+        options = get_advanced_options(advanced, HAPROXY_BACKEND_OPTIONS.values())
+        values = dict()
+        for param, keyword in HAPROXY_BACKEND_OPTIONS.items():
+            if keyword not in options:
+                continue
+            value = options[keyword]
+            if HAPROXY_BACKEND_ARGUMENT_SPEC[param].get('type') == 'int' and value.lstrip('-').isdigit():
+                value = int(value)
+            values[param] = value
+        return values
+
     ##############################
     # XML processing
     #
@@ -94,36 +189,6 @@ class PFSenseHaproxyBackendModule(PFSenseModuleBase):
         self.obj['id'] = self._get_next_id()
         return server_elt
 
-    def _find_target(self):
-        """ find the XML target_elt """
-        for item_elt in self.root_elt:
-            if item_elt.tag != 'item':
-                continue
-            name_elt = item_elt.find('name')
-            if name_elt is not None and name_elt.text == self.obj['name']:
-                return item_elt
-        return None
-
-    def _get_next_id(self):
-        """ get next free haproxy id  """
-        max_id = 99
-        id_elts = self.haproxy.findall('.//id')
-        for id_elt in id_elts:
-            if id_elt.text is None:
-                continue
-            ha_id = int(id_elt.text)
-            if ha_id > max_id:
-                max_id = ha_id
-        return str(max_id + 1)
-
-    ##############################
-    # run
-    #
-    def _update(self):
-        """ make the target pfsense reload haproxy """
-        return self.pfsense.phpshell('''require_once("haproxy/haproxy.inc");
-$result = haproxy_check_and_run($savemsg, true); if ($result) unlink_if_exists($d_haproxyconfdirty_path);''')
-
     ##############################
     # Logging
     #
@@ -135,6 +200,10 @@ $result = haproxy_check_and_run($savemsg, true); if ($result) unlink_if_exists($
             values += self.format_cli_field(self.params, 'balance_urilen')
             values += self.format_cli_field(self.params, 'balance_uridepth')
             values += self.format_cli_field(self.params, 'balance_uriwhole', fvalue=self.fvalue_bool)
+            values += self.format_cli_field(self.params, 'balance_hdr')
+            values += self.format_cli_field(self.params, 'balance_url_param')
+            values += self.format_cli_field(self.params, 'balance_random_draws')
+            values += self.format_cli_field(self.params, 'hash_type')
             values += self.format_cli_field(self.params, 'connection_timeout')
             values += self.format_cli_field(self.params, 'server_timeout')
             values += self.format_cli_field(self.params, 'check_type')
@@ -146,6 +215,9 @@ $result = haproxy_check_and_run($savemsg, true); if ($result) unlink_if_exists($
             values += self.format_cli_field(self.params, 'monitor_httpversion')
             values += self.format_cli_field(self.params, 'monitor_username')
             values += self.format_cli_field(self.params, 'monitor_domain')
+            values += self.format_cli_field(self.params, 'http_reuse')
+            values += self.format_cli_field(self.params, 'pool_max_conn')
+            values += self.format_cli_field(self.params, 'pool_purge_delay')
         else:
             for param in ['balance', 'log-health-checks', 'balance_uriwhole']:
                 if param in before and before[param] == '':
@@ -165,6 +237,10 @@ $result = haproxy_check_and_run($savemsg, true); if ($result) unlink_if_exists($
             values += self.format_updated_cli_field(self.obj, before, 'monitor_httpversion', add_comma=(values))
             values += self.format_updated_cli_field(self.obj, before, 'monitor_username', add_comma=(values))
             values += self.format_updated_cli_field(self.obj, before, 'monitor_domain', add_comma=(values))
+            before_options = self._options(before.get('advanced_backend'))
+            after_options = self._options(self.obj.get('advanced_backend', before.get('advanced_backend')))
+            for param in ['hash_type', 'http_reuse', 'pool_max_conn', 'pool_purge_delay']:
+                values += self.format_updated_cli_field(after_options, before_options, param, add_comma=(values))
         return values
 
     def _get_obj_name(self):
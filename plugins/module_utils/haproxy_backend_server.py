@@ -6,11 +6,20 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 import re
-from ansible_collections.pfsensible.core.plugins.module_utils.module_base import PFSenseModuleBase
+import time
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_advanced import HAPROXY_TIME_RE, join_inline_options, split_inline_options
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_base import PFSenseHaproxyBase
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_runtime import (
+    HaproxyRuntime,
+    HaproxyRuntimeError,
+    HAPROXY_RUNTIME_SERVER_STATES,
+    HAPROXY_RUNTIME_SOCKET,
+)
 
-HAPROXY_BACKEND_SERVER_ARGUMENT_SPEC = dict(
+# options of one server, also used to validate the items of servers
+HAPROXY_BACKEND_SERVER_ITEM_ARGUMENT_SPEC = dict(
     state=dict(default='present', choices=['present', 'absent']),
-    backend=dict(required=True, type='str'),
     name=dict(required=True, type='str'),
     mode=dict(default='active', choices=['active', 'backup', 'disabled', 'inactive']),
     forwardto=dict(required=False, type='str'),
@@ -26,17 +35,59 @@ HAPROXY_BACKEND_SERVER_ARGUMENT_SPEC = dict(
     clientcert=dict(required=False, type='str'),
     cookie=dict(required=False, type='str'),
     maxconn=dict(required=False, type='int'),
+    maxqueue=dict(required=False, type='int'),
+    slowstart=dict(required=False, type='str'),
+    inter=dict(required=False, type='str'),
+    fastinter=dict(required=False, type='str'),
+    downinter=dict(required=False, type='str'),
+    rise=dict(required=False, type='int'),
+    fall=dict(required=False, type='int'),
+    http2=dict(required=False, type='bool'),
     advanced=dict(required=False, type='str'),
     istemplate=dict(required=False, type='str'),
 )
 
-HAPROXY_BACKEND_SERVER_MUTUALLY_EXCLUSIVE = [
+# server keywords without a field in the webgui, written in the per server pass thru (advanced) after its text
+HAPROXY_SERVER_OPTIONS = ['maxqueue', 'slowstart', 'inter', 'fastinter', 'downinter', 'rise', 'fall']
+HAPROXY_SERVER_TIME_OPTIONS = ['slowstart', 'inter', 'fastinter', 'downinter']
+
+# the keywords selecting http/2 to the server, negotiated with alpn over ssl, or spoken directly in clear
+HAPROXY_SERVER_HTTP2_KEYWORDS = ['alpn', 'proto']
+
+HAPROXY_BACKEND_SERVER_ITEM_MUTUALLY_EXCLUSIVE = [
     ['forwardto', 'address'],
     ['forwardto', 'port'],
 ]
 
+HAPROXY_BACKEND_SERVER_ARGUMENT_SPEC = dict(
+    HAPROXY_BACKEND_SERVER_ITEM_ARGUMENT_SPEC,
+    backend=dict(required=True, type='str'),
+    name=dict(required=False, type='str'),
+    servers=dict(required=False, type='list', elements='dict'),
+    exclusive=dict(default=False, required=False, type='bool'),
+    apply_via=dict(default='reload', choices=['reload', 'runtime']),
+    runtime_socket=dict(default=HAPROXY_RUNTIME_SOCKET, required=False, type='path'),
+    drain=dict(default=False, required=False, type='bool'),
+    drain_timeout=dict(default=60, required=False, type='int'),
+    reload=dict(default='immediate', choices=['immediate', 'deferred']),
+    render_only=dict(default=False, required=False, type='bool'),
+    profile=dict(default=False, required=False, type='bool'),
+)
+
+HAPROXY_BACKEND_SERVER_MUTUALLY_EXCLUSIVE = HAPROXY_BACKEND_SERVER_ITEM_MUTUALLY_EXCLUSIVE + [
+    ['name', 'servers'],
+]
+
+HAPROXY_BACKEND_SERVER_REQUIRED_ONE_OF = [
+    ['name', 'servers'],
+]
+
+# bounds of the delay between two polls of the sessions of the draining servers, in seconds
+DRAIN_POLL_MIN = 0.25
+DRAIN_POLL_MAX = 2.0
+
 
-class PFSenseHaproxyBackendServerModule(PFSenseModuleBase):
+class PFSenseHaproxyBackendServerModule(PFSenseHaproxyBase):
     """ module managing pfsense haproxy backend servers """
 
     @staticmethod
@@ -50,18 +101,17 @@ class PFSenseHaproxyBackendServerModule(PFSenseModuleBase):
     def __init__(self, module, pfsense=None):
         super(PFSenseHaproxyBackendServerModule, self).__init__(module, pfsense)
         self.name = "pfsense_haproxy_backend_server"
-        self.root_elt = None
-        self.obj = dict()
-
-        pkgs_elt = self.pfsense.get_element('installedpackages')
-        self.haproxy = pkgs_elt.find('haproxy') if pkgs_elt is not None else None
-        self.backends = self.haproxy.find('ha_pools') if self.haproxy is not None else None
-        if self.backends is None:
-            self.module.fail_json(msg='Unable to find backends XML configuration entry. Are you sure haproxy is installed ?')
 
         self.backend = None
         self.servers = None
 
+        # (backend, server, field, value) changes to push through the runtime API, unless a reload is required anyway
+        self.runtime_changes = []
+        self.reload_required = False
+
+        # (backend, server) removed servers to drain before the reload
+        self.drain_servers = []
+
     ##############################
     # params processing
     #
@@ -84,26 +134,29 @@ class PFSenseHaproxyBackendServerModule(PFSenseModuleBase):
             self._get_ansible_param(obj, 'verifyhost')
 
             if 'ca' in params and params['ca'] is not None and params['ca'] != '':
-                ca_elt = self.pfsense.find_ca_elt(params['ca'])
-                if ca_elt is None:
+                obj['ssl-server-ca'] = self.cert_index.refid('ca', params['ca'])
+                if obj['ssl-server-ca'] is None:
                     self.module.fail_json(msg='%s is not a valid certificate authority' % (params['ca']))
-                obj['ssl-server-ca'] = ca_elt.find('refid').text
 
             if 'crl' in params and params['crl'] is not None and params['crl'] != '':
-                crl_elt = self.pfsense.find_crl_elt(params['crl'])
-                if crl_elt is None:
+                obj['ssl-server-crl'] = self.cert_index.refid('crl', params['crl'])
+                if obj['ssl-server-crl'] is None:
                     self.module.fail_json(msg='%s is not a valid certificate revocation list' % (params['crl']))
-                obj['ssl-server-crl'] = crl_elt.find('refid').text
 
             if 'clientcert' in params and params['clientcert'] is not None and params['clientcert'] != '':
-                cert = self.pfsense.find_cert_elt(params['clientcert'])
-                if cert is None:
+                obj['ssl-server-clientcert'] = self.cert_index.refid('cert', params['clientcert'])
+                if obj['ssl-server-clientcert'] is None:
                     self.module.fail_json(msg='%s is not a valid certificate' % (params['clientcert']))
-                obj['ssl-server-clientcert'] = cert.find('refid').text
 
             self._get_ansible_param(obj, 'cookie')
             self._get_ansible_param(obj, 'maxconn')
-            self._get_ansible_param(obj, 'advanced')
+
+            options = dict((option, params[option]) for option in HAPROXY_SERVER_OPTIONS)
+            if params.get('http2'):
+                options['alpn' if params.get('ssl') else 'proto'] = 'h2'
+            advanced = join_inline_options(params['advanced'], options)
+            if advanced:
+                obj['advanced'] = advanced
             self._get_ansible_param(obj, 'istemplate')
 
         return obj
@@ -128,18 +181,29 @@ class PFSenseHaproxyBackendServerModule(PFSenseModuleBase):
             self.backend.append(self.root_elt)
 
         if 'forwardto' in params and params['forwardto'] is not None:
-            frontend_elt = None
-            frontends = self.haproxy.find('ha_backends')
-            for item_elt in frontends:
-                if item_elt.tag != 'item':
-                    continue
-                name_elt = item_elt.find('name')
-                if name_elt is not None and name_elt.text == params['forwardto']:
-                    frontend_elt = item_elt
-                    break
+            frontend_elt = self._find_frontend(params['forwardto'])
             if frontend_elt is None:
                 self.module.fail_json(msg="The frontend named '{0}' does not exist".format(params['forwardto']))
 
+        self._validate_options(params)
+
+    def _validate_options(self, params):
+        """ check the queue, slowstart and health check options """
+        for option in ['maxqueue', 'rise', 'fall']:
+            if params.get(option) is not None and params[option] < (0 if option == 'maxqueue' else 1):
+                self.module.fail_json(msg="{0} must be {1}".format(option, 'positive or 0' if option == 'maxqueue' else 'positive'))
+        for option in HAPROXY_SERVER_TIME_OPTIONS:
+            if params.get(option) is not None and not HAPROXY_TIME_RE.match(params[option]):
+                self.module.fail_json(msg="{0} must be a haproxy time, like 2s or 500ms".format(option))
+
+        # the same keyword twice on the server line would make the options depend on their order
+        (options, dummy) = split_inline_options(params.get('advanced'), HAPROXY_SERVER_OPTIONS + HAPROXY_SERVER_HTTP2_KEYWORDS)
+        for option in HAPROXY_SERVER_OPTIONS:
+            if params.get(option) is not None and option in options:
+                self.module.fail_json(msg="{0} is set both as an option and in advanced".format(option))
+        if params.get('http2') and any(keyword in options for keyword in HAPROXY_SERVER_HTTP2_KEYWORDS):
+            self.module.fail_json(msg="http2 is set both as an option and with alpn or proto in advanced")
+
     ##############################
     # XML processing
     #
@@ -149,25 +213,38 @@ class PFSenseHaproxyBackendServerModule(PFSenseModuleBase):
         self.obj['id'] = self._get_next_id()
         return server_elt
 
-    def _find_backend(self, name):
-        """ return the target backend_elt if found """
-        for item_elt in self.backends:
-            if item_elt.tag != 'item':
+    def _copy_and_add_target(self):
+        """ populate the XML target_elt, haproxy must be reloaded to know the new server """
+        super(PFSenseHaproxyBackendServerModule, self)._copy_and_add_target()
+        self.reload_required = True
+
+    def _copy_and_update_target(self):
+        """ update the XML target_elt, and record the changes the runtime API can apply """
+        (before, changed) = super(PFSenseHaproxyBackendServerModule, self)._copy_and_update_target()
+        if changed:
+            self._record_runtime_changes(before, self.pfsense.element_to_dict(self.target_elt))
+        return (before, changed)
+
+    def _remove_target_elt(self):
+        """ delete target_elt from the XML, haproxy must be reloaded to drop the server """
+        super(PFSenseHaproxyBackendServerModule, self)._remove_target_elt()
+        self.reload_required = True
+        if self.params.get('drain'):
+            self.drain_servers.append((self.params['backend'], self.obj['name']))
+
+    def _record_runtime_changes(self, before, after):
+        """ record the weight and state changes of the server, any other change requires a reload """
+        for field in sorted(set(before) | set(after)):
+            if (before.get(field) or '') == (after.get(field) or ''):
                 continue
-            name_elt = item_elt.find('name')
-            if name_elt is not None and name_elt.text == name:
-                return item_elt
-        return None
-
-    def _find_target(self):
-        """ find the XML target_elt """
-        for item_elt in self.root_elt:
-            if item_elt.tag != 'item':
-                continue
-            name_elt = item_elt.find('name')
-            if name_elt is not None and name_elt.text == self.obj['name']:
-                return item_elt
-        return None
+            if field == 'weight':
+                # haproxy uses a weight of 1 when none is set
+                self.runtime_changes.append((self.params['backend'], self.obj['name'], 'weight', after.get(field) or '1'))
+            elif field == 'status' and before.get(field) in ['active', 'disabled'] and after.get(field) in HAPROXY_RUNTIME_SERVER_STATES:
+                # inactive servers are left out of haproxy.cfg and backup is not a runtime state
+                self.runtime_changes.append((self.params['backend'], self.obj['name'], 'state', HAPROXY_RUNTIME_SERVER_STATES[after[field]]))
+            else:
+                self.reload_required = True
 
     @staticmethod
     def _get_params_to_remove():
@@ -176,51 +253,118 @@ class PFSenseHaproxyBackendServerModule(PFSenseModuleBase):
         params += ['ssl-server-crl', 'ssl-server-ca', 'ssl-server-clientcert', 'cookie', 'maxconn', 'advanced']
         return params
 
-    def _get_next_id(self):
-        """ get next free haproxy id  """
-        max_id = 99
-        id_elts = self.haproxy.findall('.//id')
-        for id_elt in id_elts:
-            if id_elt.text is None:
-                continue
-            ha_id = int(id_elt.text)
-            if ha_id > max_id:
-                max_id = ha_id
-        return str(max_id + 1)
-
     ##############################
     # run
     #
+    def _validate_servers(self, servers):
+        """ check every item of servers and return them with defaults set """
+        validator = ArgumentSpecValidator(HAPROXY_BACKEND_SERVER_ITEM_ARGUMENT_SPEC, mutually_exclusive=HAPROXY_BACKEND_SERVER_ITEM_MUTUALLY_EXCLUSIVE)
+        validated = []
+        for idx, server in enumerate(servers):
+            result = validator.validate(server)
+            if result.error_messages:
+                self.module.fail_json(msg="servers[{0}]: {1}".format(idx, ', '.join(result.error_messages)))
+            validated.append(result.validated_parameters)
+        return validated
+
+    @staticmethod
+    def _server_params(params, server):
+        """ return the params to run the module on one server of servers """
+        server_params = dict(params)
+        server_params.update(server)
+        server_params['servers'] = None
+        return server_params
+
+    def run(self, params):
+        """ process input params to add/update/delete one server, or all the servers of the servers list """
+        if params.get('servers') is None:
+            super(PFSenseHaproxyBackendServerModule, self).run(params)
+            return
+
+        servers = self._validate_servers(params['servers'])
+        backend_elt = self._find_backend(params['backend'])
+        if backend_elt is None:
+            self.module.fail_json(msg="The backend named '{0}' does not exist".format(params['backend']))
+
+        wanted = set()
+        for server in servers:
+            if server['state'] == 'present':
+                wanted.add(server['name'])
+            super(PFSenseHaproxyBackendServerModule, self).run(self._server_params(params, server))
+
+        if params.get('exclusive'):
+            todel = []
+            for server_elt in backend_elt.findall('ha_servers/item'):
+                name = server_elt.findtext('name')
+                if name not in wanted:
+                    todel.append(self._server_params(params, dict(state='absent', name=name)))
+            for server_params in todel:
+                super(PFSenseHaproxyBackendServerModule, self).run(server_params)
+
+    def _drain(self):
+        """ put the removed servers in drain and wait until they have no session left, or until the timeout """
+        runtime = HaproxyRuntime(self.module.params['runtime_socket'])
+        start = time.monotonic()
+        deadline = start + self.module.params['drain_timeout']
+
+        pending = dict()
+        try:
+            for (backend, server) in self.drain_servers:
+                runtime.set_server(backend, server, 'state', 'drain')
+                pending.setdefault(backend, set()).add(server)
+
+            # one show stat per backend and poll, polled less often as the wait goes on
+            delay = DRAIN_POLL_MIN
+            while True:
+                for backend in list(pending):
+                    sessions = runtime.server_sessions(backend)
+                    pending[backend] = set(server for server in pending[backend] if sessions.get(server, 0) > 0)
+                    if not pending[backend]:
+                        del pending[backend]
+                remaining = deadline - time.monotonic()
+                if not pending or remaining <= 0:
+                    break
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, DRAIN_POLL_MAX)
+            self.result['drained'] = not pending
+        except HaproxyRuntimeError as exc:
+            self.result['drained'] = False
+            self.result['drain_error'] = str(exc)
+        self.result['drain_time'] = round(time.monotonic() - start, 3)
+
     def _update(self):
-        """ make the target pfsense reload """
-        return self.pfsense.phpshell('''require_once("haproxy/haproxy.inc");
-$result = haproxy_check_and_run($savemsg, true); if ($result) unlink_if_exists($d_haproxyconfdirty_path);''')
+        """ push the changes through the runtime API when it can apply all of them, reload haproxy otherwise """
+        if self.drain_servers:
+            self._drain()
+        if self.module.params.get('apply_via') == 'runtime' and self.runtime_changes and not self.reload_required:
+            self.result['runtime_commands'] = []
+            runtime = HaproxyRuntime(self.module.params['runtime_socket'])
+            try:
+                for (backend, server, field, value) in self.runtime_changes:
+                    self.result['runtime_commands'].append(runtime.set_server(backend, server, field, value))
+                return (0, '', '')
+            except HaproxyRuntimeError as exc:
+                # the reload applies what has already been pushed anyway
+                self.result['runtime_error'] = str(exc)
+        return super(PFSenseHaproxyBackendServerModule, self)._update()
 
     ##############################
     # Logging
     #
     def _get_ref_names(self, before):
         """ get cert and ca names """
-        if 'ssl-server-ca' in before and before['ssl-server-ca'] is not None and before['ssl-server-ca'] != '':
-            elt = self.pfsense.find_ca_elt(before['ssl-server-ca'], 'refid')
-            if elt is not None:
-                before['ca'] = elt.find('descr').text
-        if 'ca' not in before:
-            before['ca'] = None
-
-        if 'ssl-server-crl' in before and before['ssl-server-crl'] is not None and before['ssl-server-crl'] != '':
-            elt = self.pfsense.find_crl_elt(before['ssl-server-crl'], 'refid')
-            if elt is not None:
-                before['crl'] = elt.find('descr').text
-        if 'crl' not in before:
-            before['crl'] = None
-
-        if 'ssl-server-clientcert' in before and before['ssl-server-clientcert'] is not None and before['ssl-server-clientcert'] != '':
-            elt = self.pfsense.find_cert_elt(before['ssl-server-clientcert'], 'refid')
-            if elt is not None:
-                before['clientcert'] = elt.find('descr').text
-        if 'clientcert' not in before:
-            before['clientcert'] = None
+        for (param, tag, field) in [('ca', 'ca', 'ssl-server-ca'), ('crl', 'crl', 'ssl-server-crl'), ('clientcert', 'cert', 'ssl-server-clientcert')]:
+            before[param] = None
+            if before.get(field):
+                before[param] = self.cert_index.descr(tag, before[field])
+
+    @staticmethod
+    def _split_http2(advanced):
+        """ return (http2, the rest of advanced) of the per server pass thru text left once the options are removed """
+        (options, rest) = split_inline_options(advanced, HAPROXY_SERVER_HTTP2_KEYWORDS)
+        http2 = 'h2' in options.values()
+        rest = join_inline_options(rest, dict((keyword, value) for keyword, value in options.items() if value != 'h2'))
+        return (http2, rest or None)
 
     def _get_obj_name(self):
         """ return obj's name """
@@ -243,6 +387,9 @@ $result = haproxy_check_and_run($savemsg, true); if ($result) unlink_if_exists($
             values += self.format_cli_field(self.params, 'clientcert')
             values += self.format_cli_field(self.params, 'cookie')
             values += self.format_cli_field(self.params, 'maxconn')
+            for option in HAPROXY_SERVER_OPTIONS:
+                values += self.format_cli_field(self.params, option)
+            values += self.format_cli_field(self.params, 'http2', fvalue=self.fvalue_bool)
             values += self.format_cli_field(self.params, 'advanced')
             values += self.format_cli_field(self.params, 'istemplate')
         else:
@@ -264,6 +411,14 @@ $result = haproxy_check_and_run($savemsg, true); if ($result) unlink_if_exists($
             values += self.format_updated_cli_field(self.params, before, 'clientcert', add_comma=(values))
             values += self.format_updated_cli_field(self.obj, before, 'cookie', add_comma=(values))
             values += self.format_updated_cli_field(self.obj, before, 'maxconn', add_comma=(values))
-            values += self.format_updated_cli_field(self.obj, before, 'advanced', add_comma=(values))
+            # the options are logged on their own, advanced only with the rest of the text
+            (before_options, before_advanced) = split_inline_options(before.get('advanced'), HAPROXY_SERVER_OPTIONS)
+            (after_options, after_advanced) = split_inline_options(self.obj.get('advanced'), HAPROXY_SERVER_OPTIONS)
+            (before_options['http2'], before_options['advanced']) = self._split_http2(before_advanced)
+            (after_options['http2'], after_options['advanced']) = self._split_http2(after_advanced)
+            for option in HAPROXY_SERVER_OPTIONS:
+                values += self.format_updated_cli_field(after_options, before_options, option, add_comma=(values))
+            values += self.format_updated_cli_field(after_options, before_options, 'http2', add_comma=(values), fvalue=self.fvalue_bool)
+            values += self.format_updated_cli_field(after_options, before_options, 'advanced', add_comma=(values))
             values += self.format_updated_cli_field(self.obj, before, 'istemplate', add_comma=(values))
         return values
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey, nicholas@morey.tech
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+from ansible_collections.pfsensible.core.plugins.module_utils.module_base import PFSenseModuleBase
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_apply import haproxy_update, remember_haproxy_fingerprint
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_index import get_haproxy_cert_index, get_haproxy_index, get_haproxy_ids, item_name
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_profile import get_haproxy_profiler, haproxy_phase, load_haproxy_pfsense
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_render import render_haproxy_cfg, set_rendered_result
+
+HAPROXY_SECTION_ERRORS = dict(
+    ha_pools='Unable to find backends XML configuration entry. Are you sure haproxy is installed ?',
+    ha_backends='Unable to find frontends (ha_backends) XML configuration entry. Are you sure haproxy is installed ?',
+)
+
+
+def get_haproxy_section(pfsense, tag='haproxy'):
+    """ return installedpackages/haproxy (or one of its sections), looked up once per pfsense XML tree """
+    sections = getattr(pfsense, 'haproxy_sections', None)
+    if sections is None:
+        sections = dict()
+        pfsense.haproxy_sections = sections
+
+    section_elt = sections.get(tag)
+    if section_elt is None:
+        if tag == 'haproxy':
+            pkgs_elt = pfsense.get_element('installedpackages')
+            section_elt = pkgs_elt.find('haproxy') if pkgs_elt is not None else None
+        else:
+            haproxy_elt = get_haproxy_section(pfsense)
+            section_elt = haproxy_elt.find(tag) if haproxy_elt is not None else None
+        if section_elt is not None:
+            sections[tag] = section_elt
+    return section_elt
+
+
+class PFSenseHaproxyBase(PFSenseModuleBase):
+    """ base class of the modules managing pfsense haproxy items
+
+    The haproxy sections are only looked up when first used and are shared, like the name index, the certificate index
+    and the id allocator, by all the modules working on the same pfsense XML tree.
+    """
+
+    # key of the items of root_elt in the name index
+    index_key = staticmethod(item_name)
+
+    ##############################
+    # init
+    #
+    def __init__(self, module, pfsense=None):
+        super(PFSenseHaproxyBase, self).__init__(module, load_haproxy_pfsense(module, pfsense))
+        self.root_elt = None
+        self.obj = dict()
+        self.index = get_haproxy_index(self.pfsense)
+        self.rendered_before = None
+        self.result['reloaded'] = False
+
+        profiler = get_haproxy_profiler(self.pfsense)
+        if profiler is not None:
+            profiler.instrument(self)
+            self.result['timings'] = profiler.report()
+
+    def _get_section(self, tag):
+        """ return a haproxy section, failing if haproxy is not installed """
+        section_elt = get_haproxy_section(self.pfsense, tag)
+        if section_elt is None:
+            self.module.fail_json(msg=HAPROXY_SECTION_ERRORS[tag])
+        return section_elt
+
+    @property
+    def haproxy(self):
+        """ the haproxy package configuration """
+        return get_haproxy_section(self.pfsense)
+
+    @property
+    def backends(self):
+        """ the backends (ha_pools) """
+        return self._get_section('ha_pools')
+
+    @property
+    def frontends(self):
+        """ the frontends (ha_backends) """
+        return self._get_section('ha_backends')
+
+    @property
+    def cert_index(self):
+        """ the refid <-> descr index of the certificates, CAs and CRLs """
+        return get_haproxy_cert_index(self.pfsense)
+
+    ##############################
+    # XML processing
+    #
+    def _find_backend(self, name):
+        """ return the target backend_elt if found """
+        return self.index.find(self.backends, name)
+
+    def _find_frontend(self, name):
+        """ return the target frontend_elt if found """
+        return self.index.find(self.frontends, name)
+
+    def _find_target(self):
+        """ find the XML target_elt """
+        return self.index.find(self.root_elt, self.obj['name'], key=self.index_key)
+
+    def _copy_and_add_target(self):
+        """ populate the XML target_elt and index it """
+        super(PFSenseHaproxyBase, self)._copy_and_add_target()
+        self.index.add(self.root_elt, self.target_elt, key=self.index_key)
+
+    def _remove_target_elt(self):
+        """ delete target_elt from the XML and from the index """
+        super(PFSenseHaproxyBase, self)._remove_target_elt()
+        self.index.remove(self.root_elt, self.target_elt, key=self.index_key)
+
+    def _get_next_id(self):
+        """ get next free haproxy id  """
+        return get_haproxy_ids(self.pfsense, self.haproxy).next_id()
+
+    ##############################
+    # run
+    #
+    def run(self, params):
+        """ process input params to add/update/delete, rendering haproxy.cfg first when only a preview is wanted """
+        remember_haproxy_fingerprint(self.pfsense, self.haproxy)
+        if params.get('render_only') and self.rendered_before is None:
+            with haproxy_phase(self.pfsense, 'render'):
+                self.rendered_before = render_haproxy_cfg(self.haproxy)
+        super(PFSenseHaproxyBase, self).run(params)
+
+    def _update(self):
+        """ make the target pfsense reload haproxy, if the changes matter to haproxy.cfg """
+        return haproxy_update(self.pfsense, self.params['reload'], self.result, self.haproxy)
+
+    def commit_changes(self):
+        """ apply changes and exit module, or only report the rendered haproxy.cfg """
+        if self.rendered_before is not None:
+            with haproxy_phase(self.pfsense, 'render'):
+                rendered = render_haproxy_cfg(self.haproxy)
+            set_rendered_result(self.result, self.rendered_before, rendered)
+            self.module.exit_json(**self.result)
+        super(PFSenseHaproxyBase, self).commit_changes()
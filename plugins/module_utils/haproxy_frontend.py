@@ -6,7 +6,8 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 import re
-from ansible_collections.pfsensible.core.plugins.module_utils.module_base import PFSenseModuleBase
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_advanced import set_inline_options, split_inline_options
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_base import PFSenseHaproxyBase
 
 HAPROXY_FRONTEND_ARGUMENT_SPEC = dict(
     state=dict(default='present', choices=['present', 'absent']),
@@ -16,15 +17,20 @@ HAPROXY_FRONTEND_ARGUMENT_SPEC = dict(
     type=dict(default='http', choices=['http', 'https', 'tcp']),
     httpclose=dict(required=False, choices=['http-keep-alive']),
     backend_serverpool=dict(required=False, type='str'),
-    ssloffloadcert=dict(required=False, type='str'),
+    ssloffloadcert=dict(required=False, type='raw'),
     ssloffloadcert_type_search=dict(default='descr', type='str'),
     ssloffloadacl_an=dict(required=False, type='str'),
     max_connections=dict(default=100, type='int'),
-    addhttp_https_redirect=dict(required=False, type='bool')
+    addhttp_https_redirect=dict(required=False, type='bool'),
+    alpn=dict(required=False, type='list', elements='str', choices=['h2', 'http/1.1', 'http/1.0']),
+    ocsp_stapling=dict(required=False, type='bool'),
+    reload=dict(default='immediate', choices=['immediate', 'deferred']),
+    render_only=dict(default=False, required=False, type='bool'),
+    profile=dict(default=False, required=False, type='bool'),
 )
 
 
-class PFSenseHaproxyFrontendModule(PFSenseModuleBase):
+class PFSenseHaproxyFrontendModule(PFSenseHaproxyBase):
     """ module managing pfsense haproxy frontends """
 
     @staticmethod
@@ -38,16 +44,12 @@ class PFSenseHaproxyFrontendModule(PFSenseModuleBase):
     def __init__(self, module, pfsense=None):
         super(PFSenseHaproxyFrontendModule, self).__init__(module, pfsense)
         self.name = "pfsense_haproxy_frontend"
-        self.obj = dict()
-
-        pkgs_elt = self.pfsense.get_element('installedpackages')
-        self.haproxy = pkgs_elt.find('haproxy') if pkgs_elt is not None else None
-        self.root_elt = self.haproxy.find('ha_backends') if self.haproxy is not None else None
-        if self.root_elt is None:
-            self.module.fail_json(msg='Unable to find frontends (ha_backends) XML configuration entry. Are you sure haproxy is installed ?')
 
         self.servers = None
 
+        # refids of the additional certificates, None when they are left as they are
+        self.certificates = None
+
     ##############################
     # params processing
     #
@@ -71,18 +73,32 @@ class PFSenseHaproxyFrontendModule(PFSenseModuleBase):
             self._get_ansible_param(obj, 'backend_serverpool')
             self._get_ansible_param(obj, 'max_connections')
 
-            if 'ssloffloadcert' in params and params['ssloffloadcert'] is not None and params['ssloffloadcert'] != '':
+            if params['ssloffloadcert']:
                 search_field_type = 'type'
                 if 'ssloffloadcert_type_search' in params and params['ssloffloadcert_type_search'] is not None and params['ssloffloadcert_type_search'] != '':
                     search_field_type = params['ssloffloadcert_type_search']
 
-                cert_elt = self.pfsense.find_cert_elt(params['ssloffloadcert'], search_field=search_field_type)
-                if cert_elt is None:
-                    self.module.fail_json(msg='%s is not a valid certificate ' % (params['ssloffloadcert']))
-                obj['ssloffloadcert'] = cert_elt.find('refid').text
+                # the first certificate is the default one, the others are added to the crt-list and selected by SNI
+                refids = self._find_cert_refids(self._certificate_names(), search_field_type)
+                obj['ssloffloadcert'] = refids[0]
+                if isinstance(params['ssloffloadcert'], list):
+                    self.certificates = refids[1:]
 
             self._get_ansible_param(obj, 'ssloffloadacl_an')
 
+            # the protocols and the stapling are set with the offloading certificates, in their ssl options
+            options = dict()
+            if params.get('alpn') is not None:
+                options['alpn'] = ','.join(params['alpn']) or False
+            if params.get('ocsp_stapling') is not None:
+                options['ocsp-update'] = 'on' if params['ocsp_stapling'] else False
+            if options:
+                frontend_elt = self.index.find(self.root_elt, obj['name'])
+                dcertadv = frontend_elt.findtext('dcertadv') if frontend_elt is not None else None
+                dcertadv = set_inline_options(dcertadv, options)
+                if dcertadv is not None:
+                    obj['dcertadv'] = dcertadv
+
             # check for redirect
             if ('addhttp_https_redirect' in params and
                     params['addhttp_https_redirect'] is not None and
@@ -100,6 +116,8 @@ class PFSenseHaproxyFrontendModule(PFSenseModuleBase):
 
     def _validate_params(self):
         """ do some extra checks on input parameters """
+        self.root_elt = self.frontends
+
         # check name
         if re.search(r'[^a-zA-Z0-9\.\-_]', self.params['name']) is not None:
             self.module.fail_json(msg="The field 'name' contains invalid characters.")
@@ -123,6 +141,62 @@ class PFSenseHaproxyFrontendModule(PFSenseModuleBase):
                         "HTTP to HTTPS redirect is only valid for 'http' type frontends."
                 )
 
+            # Validate alpn, the tls connections of the other types are not terminated by haproxy
+            if self.params.get('alpn'):
+                self.module.fail_json(
+                    msg=f"Parameter 'alpn' cannot be used with frontend type '{frontend_type}'. "
+                        "ALPN is only negotiated by 'http' type frontends offloading SSL."
+                )
+
+            # Validate ocsp_stapling, the certificates of the other types are the ones of the servers
+            if self.params.get('ocsp_stapling'):
+                self.module.fail_json(
+                    msg=f"Parameter 'ocsp_stapling' cannot be used with frontend type '{frontend_type}'. "
+                        "OCSP responses are only stapled by 'http' type frontends offloading SSL."
+                )
+
+        # Validate alpn and ocsp_stapling, they are set in the options of the offloading certificates
+        if self.params.get('alpn') and not self._offloads_ssl():
+            self.module.fail_json(
+                msg="Parameter 'alpn' requires an SSL offloading certificate. "
+                    "Set 'ssloffloadcert', ALPN is only negotiated by frontends offloading SSL."
+            )
+        if self.params.get('ocsp_stapling') and not self._offloads_ssl():
+            self.module.fail_json(
+                msg="Parameter 'ocsp_stapling' requires an SSL offloading certificate. "
+                    "Set 'ssloffloadcert', OCSP responses are only stapled by frontends offloading SSL."
+            )
+
+        certificate = self.params['ssloffloadcert']
+        if certificate is not None and not isinstance(certificate, str) and (
+                not isinstance(certificate, list) or not all(isinstance(name, str) and name for name in certificate)):
+            self.module.fail_json(msg="ssloffloadcert must be a certificate or a list of certificates")
+        if isinstance(certificate, list) and len(set(certificate)) != len(certificate):
+            self.module.fail_json(msg="ssloffloadcert must not contain the same certificate twice")
+
+    def _offloads_ssl(self):
+        """ return True if the frontend is given an offloading certificate, or already has one """
+        if self.params['ssloffloadcert']:
+            return True
+        frontend_elt = self.index.find(self.root_elt, self.params['name'])
+        return frontend_elt is not None and bool(frontend_elt.findtext('ssloffloadcert'))
+
+    def _certificate_names(self):
+        """ return the names of the offloading certificates, the default one first """
+        if isinstance(self.params['ssloffloadcert'], list):
+            return self.params['ssloffloadcert']
+        return [self.params['ssloffloadcert']]
+
+    def _find_cert_refids(self, names, search_field):
+        """ return the refids of the certificates whose search_field is one of names, in names order """
+        refids = []
+        for name in names:
+            refid = self.cert_index.refid('cert', name, search_field)
+            if refid is None:
+                self.module.fail_json(msg='%s is not a valid certificate ' % (name))
+            refids.append(refid)
+        return refids
+
     ##############################
     # XML processing
     #
@@ -131,35 +205,45 @@ class PFSenseHaproxyFrontendModule(PFSenseModuleBase):
         server_elt = self.pfsense.new_element('item')
         return server_elt
 
-    def _find_target(self):
-        """ find the XML target_elt """
-        for item_elt in self.root_elt:
-            if item_elt.tag != 'item':
-                continue
-            name_elt = item_elt.find('name')
-            if name_elt is not None and name_elt.text == self.obj['name']:
-                return item_elt
-        return None
-
-    def _get_next_id(self):
-        """ get next free haproxy id  """
-        max_id = 99
-        id_elts = self.haproxy.findall('.//id')
-        for id_elt in id_elts:
-            if id_elt.text is None:
-                continue
-            ha_id = int(id_elt.text)
-            if ha_id > max_id:
-                max_id = ha_id
-        return str(max_id + 1)
+    @staticmethod
+    def _get_certificates(frontend_elt):
+        """ return the refids of the additional certificates of frontend_elt """
+        certs_elt = frontend_elt.find('ha_certificates')
+        if certs_elt is None:
+            return []
+        return [item_elt.findtext('ssl_certificate') for item_elt in certs_elt.findall('item')]
+
+    def _set_certificates(self):
+        """ set the additional certificates of target_elt, return True if they changed """
+        if self.certificates is None or self._get_certificates(self.target_elt) == self.certificates:
+            return False
 
-    ##############################
-    # run
-    #
-    def _update(self):
-        """ make the target pfsense reload haproxy """
-        return self.pfsense.phpshell('''require_once("haproxy/haproxy.inc");
-$result = haproxy_check_and_run($savemsg, true); if ($result) unlink_if_exists($d_haproxyconfdirty_path);''')
+        certs_elt = self.target_elt.find('ha_certificates')
+        if certs_elt is None:
+            certs_elt = self.pfsense.new_element('ha_certificates')
+            self.target_elt.append(certs_elt)
+        for item_elt in certs_elt.findall('item'):
+            certs_elt.remove(item_elt)
+        for refid in self.certificates:
+            item_elt = self.pfsense.new_element('item')
+            cert_elt = self.pfsense.new_element('ssl_certificate')
+            cert_elt.text = refid
+            item_elt.append(cert_elt)
+            certs_elt.append(item_elt)
+        return True
+
+    def _copy_and_add_target(self):
+        """ populate the XML target_elt """
+        super(PFSenseHaproxyFrontendModule, self)._copy_and_add_target()
+        self._set_certificates()
+
+    def _copy_and_update_target(self):
+        """ update the XML target_elt """
+        (before, changed) = super(PFSenseHaproxyFrontendModule, self)._copy_and_update_target()
+        before['certificates'] = self._get_certificates(self.target_elt)
+        if self._set_certificates():
+            changed = True
+        return (before, changed)
 
     ##############################
     # Logging
@@ -172,17 +256,30 @@ $result = haproxy_check_and_run($savemsg, true); if ($result) unlink_if_exists($
             values += self.format_cli_field(self.params, 'type')
             values += self.format_cli_field(self.params, 'httpclose')
             values += self.format_cli_field(self.params, 'backend_serverpool')
-            values += self.format_cli_field(self.params, 'ssloffloadcert')
+            if self.params['ssloffloadcert']:
+                values += self.format_cli_field(dict(ssloffloadcert=','.join(self._certificate_names())), 'ssloffloadcert')
             values += self.format_cli_field(self.params, 'ssloffloadacl_an')
             values += self.format_cli_field(self.params, 'max_connections')
+            if self.params.get('alpn'):
+                values += self.format_cli_field(dict(alpn=','.join(self.params['alpn'])), 'alpn')
+            values += self.format_cli_field(self.params, 'ocsp_stapling', fvalue=self.fvalue_bool)
         else:
             values += self.format_updated_cli_field(self.obj, before, 'desc', add_comma=(values))
             values += self.format_updated_cli_field(self.obj, before, 'type', add_comma=(values))
             values += self.format_updated_cli_field(self.obj, before, 'httpclose', add_comma=(values))
             values += self.format_updated_cli_field(self.obj, before, 'backend_serverpool', add_comma=(values))
-            values += self.format_updated_cli_field(self.obj, before, 'ssloffloadcert', add_comma=(values))
+            # the additional certificates are logged with the default one, by refid
+            after_certs = dict(ssloffloadcert=','.join([self.target_elt.findtext('ssloffloadcert') or ''] + self._get_certificates(self.target_elt)))
+            before_certs = dict(ssloffloadcert=','.join([before.get('ssloffloadcert') or ''] + before['certificates']))
+            values += self.format_updated_cli_field(after_certs, before_certs, 'ssloffloadcert', add_comma=(values))
             values += self.format_updated_cli_field(self.obj, before, 'ssloffloadacl_an', add_comma=(values))
             values += self.format_updated_cli_field(self.obj, before, 'max_connections', add_comma=(values))
+            (before_options, dummy) = split_inline_options(before.get('dcertadv'), ['alpn', 'ocsp-update'])
+            (after_options, dummy) = split_inline_options(self.target_elt.findtext('dcertadv'), ['alpn', 'ocsp-update'])
+            values += self.format_updated_cli_field(after_options, before_options, 'alpn', add_comma=(values))
+            before_options['ocsp_stapling'] = before_options.get('ocsp-update') == 'on'
+            after_options['ocsp_stapling'] = after_options.get('ocsp-update') == 'on'
+            values += self.format_updated_cli_field(after_options, before_options, 'ocsp_stapling', add_comma=(values), fvalue=self.fvalue_bool)
         return values
 
     def _get_obj_name(self):
@@ -5,7 +5,7 @@
 
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
-from ansible_collections.pfsensible.core.plugins.module_utils.module_base import PFSenseModuleBase
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_base import PFSenseHaproxyBase
 
 HAPROXY_FRONTEND_ACL_ARGUMENT_SPEC = dict(
     state=dict(default='present', choices=['present', 'absent']),
@@ -22,13 +22,31 @@ HAPROXY_FRONTEND_ACL_ARGUMENT_SPEC = dict(
             'ssl_sni_regex',
         ]
     ),
-    value=dict(required=True, type='str'),
+    # a string or a list, the list type would split the regexes on their commas
+    value=dict(required=True, type='raw'),
     casesensitive=dict(required=False, type='bool', default=False),
     negate=dict(required=False, type='bool', default=False),
+    reload=dict(default='immediate', choices=['immediate', 'deferred']),
+    render_only=dict(default=False, required=False, type='bool'),
+    profile=dict(default=False, required=False, type='bool'),
 )
 
 
-class PFSenseHaproxyFrontendAclModule(PFSenseModuleBase):
+def acl_patterns(value):
+    """ return the patterns of an ACL value, given as a list or as a space separated string, without duplicates """
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        value = [value]
+    patterns = []
+    for item in value:
+        for pattern in str(item or '').split():
+            if pattern not in patterns:
+                patterns.append(pattern)
+    return patterns
+
+
+class PFSenseHaproxyFrontendAclModule(PFSenseHaproxyBase):
     """ module managing pfsense haproxy frontend ACLs """
 
     @staticmethod
@@ -42,14 +60,6 @@ class PFSenseHaproxyFrontendAclModule(PFSenseModuleBase):
     def __init__(self, module, pfsense=None):
         super(PFSenseHaproxyFrontendAclModule, self).__init__(module, pfsense)
         self.name = "pfsense_haproxy_frontend_acl"
-        self.root_elt = None
-        self.obj = dict()
-
-        pkgs_elt = self.pfsense.get_element('installedpackages')
-        self.haproxy = pkgs_elt.find('haproxy') if pkgs_elt is not None else None
-        self.frontends = self.haproxy.find('ha_backends') if self.haproxy is not None else None
-        if self.frontends is None:
-            self.module.fail_json(msg='Unable to find frontends (ha_backends) XML configuration entry. Are you sure haproxy is installed ?')
 
         self.frontend = None
         self.ha_acls_elt = None
@@ -62,7 +72,15 @@ class PFSenseHaproxyFrontendAclModule(PFSenseModuleBase):
         obj = dict()
         obj['name'] = self.params['name']
         self._get_ansible_param(obj, 'expression')
-        self._get_ansible_param(obj, 'value')
+
+        # haproxy matches all the patterns of the value, keep the order of the ones already there
+        # so that giving the same patterns in another order does not rewrite the ACL
+        patterns = acl_patterns(self.params['value'])
+        acl_elt = self.index.find(self.root_elt, obj['name'])
+        if acl_elt is not None:
+            current = acl_patterns(acl_elt.findtext('value'))
+            patterns = [pattern for pattern in current if pattern in patterns] + [pattern for pattern in patterns if pattern not in current]
+        obj['value'] = ' '.join(patterns)
 
         # Handle boolean fields - pfSense uses empty string or 'yes'
         if self.params.get('casesensitive'):
@@ -113,56 +131,13 @@ class PFSenseHaproxyFrontendAclModule(PFSenseModuleBase):
         acl_elt = self.pfsense.new_element('item')
         return acl_elt
 
-    def _find_frontend(self, name):
-        """ return the target frontend_elt if found """
-        for item_elt in self.frontends:
-            if item_elt.tag != 'item':
-                continue
-            name_elt = item_elt.find('name')
-            if name_elt is not None and name_elt.text == name:
-                return item_elt
-        return None
-
-    def _find_target(self):
-        """ find the XML target_elt by ACL name """
-        for item_elt in self.root_elt:
-            if item_elt.tag != 'item':
-                continue
-            name_elt = item_elt.find('name')
-            if name_elt is not None and name_elt.text == self.obj['name']:
-                return item_elt
-        return None
-
     def _find_ha_acl_target(self):
         """ find the XML target in ha_acls section """
-        for item_elt in self.ha_acls_elt:
-            if item_elt.tag != 'item':
-                continue
-            name_elt = item_elt.find('name')
-            if name_elt is not None and name_elt.text == self.obj['name']:
-                return item_elt
-        return None
-
-    def _get_next_id(self):
-        """ get next free haproxy id  """
-        max_id = 99
-        id_elts = self.haproxy.findall('.//id')
-        for id_elt in id_elts:
-            if id_elt.text is None:
-                continue
-            ha_id = int(id_elt.text)
-            if ha_id > max_id:
-                max_id = ha_id
-        return str(max_id + 1)
+        return self.index.find(self.ha_acls_elt, self.obj['name'])
 
     ##############################
     # run
     #
-    def _update(self):
-        """ make the target pfsense reload haproxy """
-        return self.pfsense.phpshell('''require_once("haproxy/haproxy.inc");
-$result = haproxy_check_and_run($savemsg, true); if ($result) unlink_if_exists($d_haproxyconfdirty_path);''')
-
     def _add(self):
         """ add the ACL to both a_acl and ha_acls sections """
         # Let parent class handle a_acl section
@@ -172,10 +147,12 @@ $result = haproxy_check_and_run($savemsg, true); if ($result) unlink_if_exists($
         ha_acl_elt = self._find_ha_acl_target()
         if ha_acl_elt is None:
             ha_acl_elt = self.pfsense.new_element('item')
+            self.pfsense.copy_dict_to_element(self.obj, ha_acl_elt)
             self.ha_acls_elt.append(ha_acl_elt)
-
-        # Copy relevant fields to ha_acls item
-        self.pfsense.copy_dict_to_element(self.obj, ha_acl_elt)
+            self.index.add(self.ha_acls_elt, ha_acl_elt)
+        else:
+            # Copy relevant fields to ha_acls item
+            self.pfsense.copy_dict_to_element(self.obj, ha_acl_elt)
 
     def _copy_and_update_target(self):
         """ update both a_acl and ha_acls sections """
@@ -195,6 +172,7 @@ $result = haproxy_check_and_run($savemsg, true); if ($result) unlink_if_exists($
         ha_acl_elt = self._find_ha_acl_target()
         if ha_acl_elt is not None:
             self.ha_acls_elt.remove(ha_acl_elt)
+            self.index.remove(self.ha_acls_elt, ha_acl_elt)
 
         # Let parent handle a_acl removal
         super(PFSenseHaproxyFrontendAclModule, self)._remove()
@@ -208,7 +186,7 @@ $result = haproxy_check_and_run($savemsg, true); if ($result) unlink_if_exists($
         if before is None:
             values += self.format_cli_field(self.params, 'name')
             values += self.format_cli_field(self.params, 'expression')
-            values += self.format_cli_field(self.params, 'value')
+            values += self.format_cli_field(self.obj, 'value')
             values += self.format_cli_field(self.params, 'casesensitive')
             values += self.format_cli_field(self.params, 'negate')
         else:
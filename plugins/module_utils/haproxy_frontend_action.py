@@ -5,7 +5,8 @@
 
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
-from ansible_collections.pfsensible.core.plugins.module_utils.module_base import PFSenseModuleBase
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_base import PFSenseHaproxyBase
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_index import action_key
 
 HAPROXY_FRONTEND_ACTION_ARGUMENT_SPEC = dict(
     state=dict(default='present', choices=['present', 'absent']),
@@ -14,12 +15,17 @@ HAPROXY_FRONTEND_ACTION_ARGUMENT_SPEC = dict(
     backend=dict(required=False, type='str'),
     acl=dict(required=False, type='str'),
     custom_action=dict(required=False, type='str'),
+    reload=dict(default='immediate', choices=['immediate', 'deferred']),
+    render_only=dict(default=False, required=False, type='bool'),
+    profile=dict(default=False, required=False, type='bool'),
 )
 
 
-class PFSenseHaproxyFrontendActionModule(PFSenseModuleBase):
+class PFSenseHaproxyFrontendActionModule(PFSenseHaproxyBase):
     """ module managing pfsense haproxy frontend actions """
 
+    index_key = staticmethod(action_key)
+
     @staticmethod
     def get_argument_spec():
         """ return argument spec """
@@ -31,14 +37,6 @@ class PFSenseHaproxyFrontendActionModule(PFSenseModuleBase):
     def __init__(self, module, pfsense=None):
         super(PFSenseHaproxyFrontendActionModule, self).__init__(module, pfsense)
         self.name = "pfsense_haproxy_frontend_action"
-        self.root_elt = None
-        self.obj = dict()
-
-        pkgs_elt = self.pfsense.get_element('installedpackages')
-        self.haproxy = pkgs_elt.find('haproxy') if pkgs_elt is not None else None
-        self.frontends = self.haproxy.find('ha_backends') if self.haproxy is not None else None
-        if self.frontends is None:
-            self.module.fail_json(msg='Unable to find frontends (ha_backends) XML configuration entry. Are you sure haproxy is installed ?')
 
         self.frontend = None
 
@@ -96,65 +94,15 @@ class PFSenseHaproxyFrontendActionModule(PFSenseModuleBase):
         action_elt = self.pfsense.new_element('item')
         return action_elt
 
-    def _find_frontend(self, name):
-        """ return the target frontend_elt if found """
-        for item_elt in self.frontends:
-            if item_elt.tag != 'item':
-                continue
-            name_elt = item_elt.find('name')
-            if name_elt is not None and name_elt.text == name:
-                return item_elt
-        return None
-
     def _find_target(self):
-        """ find the XML target_elt by action type and backend/custom_action """
-        for item_elt in self.root_elt:
-            if item_elt.tag != 'item':
-                continue
-
-            action_elt = item_elt.find('action')
-            if action_elt is None or action_elt.text != self.obj['action']:
-                continue
-
-            # For use_backend, also match by backend name
-            if self.obj['action'] == 'use_backend':
-                backend_elt = item_elt.find('use_backendbackend')
-                if backend_elt is not None and backend_elt.text == self.obj.get('use_backendbackend'):
-                    # Also check ACL matches
-                    acl_elt = item_elt.find('acl')
-                    acl_text = acl_elt.text if acl_elt is not None else ''
-                    if acl_text == self.obj.get('acl', ''):
-                        return item_elt
-            # For custom, match by custom action
-            elif self.obj['action'] == 'custom':
-                custom_elt = item_elt.find('customcustomaction')
-                if custom_elt is not None and custom_elt.text == self.obj.get('customcustomaction'):
-                    acl_elt = item_elt.find('acl')
-                    acl_text = acl_elt.text if acl_elt is not None else ''
-                    if acl_text == self.obj.get('acl', ''):
-                        return item_elt
-
-        return None
-
-    def _get_next_id(self):
-        """ get next free haproxy id  """
-        max_id = 99
-        id_elts = self.haproxy.findall('.//id')
-        for id_elt in id_elts:
-            if id_elt.text is None:
-                continue
-            ha_id = int(id_elt.text)
-            if ha_id > max_id:
-                max_id = ha_id
-        return str(max_id + 1)
-
-    ##############################
-    # run
-    #
-    def _update(self):
-        """ make the target pfsense reload haproxy """
-        return self.pfsense.phpshell('''require_once("haproxy/haproxy.inc");
-$result = haproxy_check_and_run($savemsg, true); if ($result) unlink_if_exists($d_haproxyconfdirty_path);''')
+        """ find the XML target_elt by action type, backend/custom_action and ACL """
+        if self.obj['action'] == 'use_backend':
+            target = self.obj.get('use_backendbackend')
+        elif self.obj['action'] == 'custom':
+            target = self.obj.get('customcustomaction')
+        else:
+            return None
+        return self.index.find(self.root_elt, (self.obj['action'], target, self.obj.get('acl', '')), key=self.index_key)
 
     ##############################
     # Logging
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey, nicholas@morey.tech
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+import base64
+import binascii
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_apply import haproxy_update, remember_haproxy_fingerprint
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_base import get_haproxy_section
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_frontend_action import PFSenseHaproxyFrontendActionModule
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_index import get_haproxy_index
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_profile import get_haproxy_profiler, haproxy_phase, load_haproxy_pfsense
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_render import backend_cfg_name, render_haproxy_cfg, set_rendered_result
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_runtime import HAPROXY_RUNTIME_SOCKET, HaproxyRuntime, HaproxyRuntimeError
+
+HAPROXY_FRONTEND_MAP_HOST_ARGUMENT_SPEC = dict(
+    state=dict(default='present', choices=['present', 'absent']),
+    host=dict(required=True, type='str'),
+    backend=dict(required=False, type='str'),
+)
+
+HAPROXY_FRONTEND_MAP_ARGUMENT_SPEC = dict(
+    frontend=dict(required=True, type='str'),
+    hosts=dict(required=True, type='list', elements='dict', options=HAPROXY_FRONTEND_MAP_HOST_ARGUMENT_SPEC),
+    map=dict(required=False, type='str'),
+    fetch=dict(required=False, choices=['host', 'sni']),
+    exclusive=dict(default=False, required=False, type='bool'),
+    apply_via=dict(default='reload', choices=['reload', 'runtime']),
+    runtime_socket=dict(default=HAPROXY_RUNTIME_SOCKET, required=False, type='path'),
+    reload=dict(default='immediate', choices=['immediate', 'deferred']),
+    render_only=dict(default=False, required=False, type='bool'),
+    profile=dict(default=False, required=False, type='bool'),
+)
+
+# where pfsense writes the haproxy files of type writetodisk
+HAPROXY_FILES_DIR = '/var/etc/haproxy'
+
+# fetch -> sample expression giving the map key
+HAPROXY_MAP_FETCHES = dict(
+    host='req.hdr(host),lower,word(1,:)',
+    sni='req.ssl_sni,lower',
+)
+
+# the SNI is only known once the client hello has been received
+HAPROXY_SNI_INSPECT_ACTIONS = [
+    'tcp-request inspect-delay 5s',
+    'tcp-request content accept if { req.ssl_hello_type 1 }',
+]
+
+
+def decode_map(content):
+    """ return key -> value of a base64 encoded map file, in file order, raise ValueError if it can not be decoded """
+    entries = dict()
+    if not content:
+        return entries
+    for line in base64.b64decode(''.join(content.split()), validate=True).decode('utf-8').splitlines():
+        fields = line.split()
+        if len(fields) == 2 and not fields[0].startswith('#'):
+            entries[fields[0]] = fields[1]
+    return entries
+
+
+def encode_map(entries):
+    """ return the base64 encoded map file of entries, sorted so that the same entries always give the same file """
+    text = ''.join('{0} {1}\n'.format(key, entries[key]) for key in sorted(entries))
+    return base64.b64encode(text.encode('utf-8')).decode('ascii')
+
+
+class PFSenseHaproxyFrontendMapModule(object):
+    """ module managing the map file based host routing of a pfsense haproxy frontend """
+
+    @staticmethod
+    def get_argument_spec():
+        """ return argument spec """
+        return HAPROXY_FRONTEND_MAP_ARGUMENT_SPEC
+
+    ##############################
+    # init
+    #
+    def __init__(self, module, pfsense=None):
+        self.module = module
+        self.pfsense = load_haproxy_pfsense(module, pfsense)
+        self.pfsense_actions = PFSenseHaproxyFrontendActionModule(module, self.pfsense)
+        self.index = get_haproxy_index(self.pfsense)
+        self.result = dict(changed=False, commands=[], reloaded=False)
+        self.rendered_before = None
+
+        # (verb, key, value) of the map entries changed, pushed through the runtime API if nothing else changed
+        self.runtime_changes = []
+        self.reload_required = False
+        self.map_path = None
+
+        profiler = get_haproxy_profiler(self.pfsense)
+        if profiler is not None:
+            self.result['timings'] = profiler.report()
+
+    ##############################
+    # params processing
+    #
+    def _validate_hosts(self, hosts):
+        """ check the hosts and return host -> backend name in haproxy.cfg, or None for the hosts to remove """
+        backends_elt = get_haproxy_section(self.pfsense, 'ha_pools')
+        wanted = dict()
+        for idx, host in enumerate(hosts):
+            name = host['host'].strip().lower()
+            if not name or len(name.split()) != 1:
+                self.module.fail_json(msg="hosts[{0}]: invalid host '{1}'".format(idx, host['host']))
+            if name in wanted:
+                self.module.fail_json(msg="hosts[{0}]: duplicate host '{1}'".format(idx, name))
+            if host['state'] == 'absent':
+                wanted[name] = None
+                continue
+            if not host['backend']:
+                self.module.fail_json(msg="hosts[{0}]: backend is required when state is 'present'".format(idx))
+            if backends_elt is None or self.index.find(backends_elt, host['backend']) is None:
+                self.module.fail_json(msg="hosts[{0}]: the backend named '{1}' does not exist".format(idx, host['backend']))
+            wanted[name] = backend_cfg_name(host['backend'])
+        return wanted
+
+    ##############################
+    # XML processing
+    #
+    def _find_file(self, name):
+        """ return the haproxy file item named name, creating the files container if needed """
+        haproxy_elt = get_haproxy_section(self.pfsense)
+        files_elt = haproxy_elt.find('files')
+        if files_elt is None:
+            files_elt = self.pfsense.new_element('files')
+            haproxy_elt.append(files_elt)
+        for file_elt in files_elt.findall('item'):
+            if file_elt.findtext('name') == name:
+                return (files_elt, file_elt)
+        return (files_elt, None)
+
+    def _update_map(self, params, name, wanted):
+        """ update the entries of the map file, logging and recording the changed ones """
+        (files_elt, file_elt) = self._find_file(name)
+        if file_elt is None:
+            file_elt = self.pfsense.new_element('item')
+            for tag, text in [('name', name), ('type', 'writetodisk'), ('content', '')]:
+                elt = self.pfsense.new_element(tag)
+                elt.text = text
+                file_elt.append(elt)
+            files_elt.append(file_elt)
+            self.result['commands'].append("create haproxy_file '{0}', type='writetodisk'".format(name))
+            self.result['changed'] = True
+            self.reload_required = True
+
+        try:
+            before = decode_map(file_elt.findtext('content'))
+        except (binascii.Error, ValueError):
+            self.module.fail_json(msg="The content of the haproxy file '{0}' is not a base64 encoded UTF-8 map".format(name))
+        after = dict((key, value) for key, value in before.items() if not params['exclusive'] or wanted.get(key) is not None)
+        for key, value in wanted.items():
+            if value is None:
+                after.pop(key, None)
+            else:
+                after[key] = value
+
+        prefix = "haproxy_frontend_map '{0}' on '{1}'"
+        for key in sorted(set(before) | set(after)):
+            target = prefix.format(key, params['frontend'])
+            if key not in after:
+                self.result['commands'].append('delete ' + target)
+                self.runtime_changes.append(('del', key, None))
+            elif key not in before:
+                self.result['commands'].append("create {0}, backend='{1}'".format(target, after[key]))
+                self.runtime_changes.append(('add', key, after[key]))
+            elif before[key] != after[key]:
+                self.result['commands'].append("update {0} set backend='{1}'".format(target, after[key]))
+                self.runtime_changes.append(('set', key, after[key]))
+
+        if self.runtime_changes:
+            file_elt.find('content').text = encode_map(after)
+            self.result['changed'] = True
+
+    ##############################
+    # run
+    #
+    def _run_action(self, params, custom_action):
+        """ make sure the frontend has custom_action, without condition """
+        action_params = dict(
+            state='present',
+            frontend=params['frontend'],
+            action='custom',
+            backend=None,
+            acl=None,
+            custom_action=custom_action,
+            reload=params['reload'],
+        )
+        count = len(self.pfsense_actions.result['commands'])
+        self.pfsense_actions.run(action_params)
+        self.result['commands'] += self.pfsense_actions.result['commands'][count:]
+        if self.pfsense_actions.result['changed']:
+            self.result['changed'] = True
+            self.reload_required = True
+
+    def run(self, params):
+        """ reconcile the map file of the frontend with the hosts and route the frontend with it """
+        haproxy_elt = get_haproxy_section(self.pfsense)
+        if haproxy_elt is None:
+            self.module.fail_json(msg='Unable to find haproxy XML configuration entry. Are you sure haproxy is installed ?')
+        remember_haproxy_fingerprint(self.pfsense, haproxy_elt)
+        if params['render_only']:
+            with haproxy_phase(self.pfsense, 'render'):
+                self.rendered_before = render_haproxy_cfg(haproxy_elt)
+
+        frontend_elt = self.pfsense_actions._find_frontend(params['frontend'])
+        if frontend_elt is None:
+            self.module.fail_json(msg="The frontend named '{0}' does not exist".format(params['frontend']))
+
+        wanted = self._validate_hosts(params['hosts'])
+        frontend_type = frontend_elt.findtext('type') or 'http'
+        fetch = params['fetch'] or ('host' if frontend_type == 'http' else 'sni')
+        if fetch == 'host' and frontend_type != 'http':
+            self.module.fail_json(msg="fetch 'host' requires an http frontend, the type of '{0}' is {1}".format(params['frontend'], frontend_type))
+
+        name = params['map'] or '{0}.map'.format(params['frontend'])
+        self.map_path = '{0}/{1}'.format(HAPROXY_FILES_DIR, name)
+        self.result['map_file'] = self.map_path
+
+        self._update_map(params, name, wanted)
+        if fetch == 'sni' and frontend_type != 'http':
+            for action in HAPROXY_SNI_INSPECT_ACTIONS:
+                self._run_action(params, action)
+        self._run_action(params, 'use_backend %[{0},map({1})]'.format(HAPROXY_MAP_FETCHES[fetch], self.map_path))
+
+    def _update(self):
+        """ push the map changes through the runtime API when nothing else changed, reload haproxy otherwise """
+        if self.module.params['apply_via'] == 'runtime' and not self.reload_required:
+            self.result['runtime_commands'] = []
+            runtime = HaproxyRuntime(self.module.params['runtime_socket'])
+            try:
+                for (verb, key, value) in self.runtime_changes:
+                    self.result['runtime_commands'].append(runtime.update_map(verb, self.map_path, key, value))
+                return (0, '', '')
+            except HaproxyRuntimeError as exc:
+                # the reload loads the whole map file anyway
+                self.result['runtime_error'] = str(exc)
+        return haproxy_update(self.pfsense, self.module.params['reload'], self.result, get_haproxy_section(self.pfsense))
+
+    def commit_changes(self):
+        """ apply changes and exit module """
+        stdout = ''
+        stderr = ''
+        if self.rendered_before is not None:
+            with haproxy_phase(self.pfsense, 'render'):
+                rendered = render_haproxy_cfg(get_haproxy_section(self.pfsense))
+            set_rendered_result(self.result, self.rendered_before, rendered)
+        elif self.result['changed'] and not self.module.check_mode:
+            self.pfsense.write_config(descr='haproxy frontend map change')
+            (dummy, stdout, stderr) = self._update()
+
+        self.result['stdout'] = stdout
+        self.result['stderr'] = stderr
+        self.module.exit_json(**self.result)
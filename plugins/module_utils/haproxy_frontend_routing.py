@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey, nicholas@morey.tech
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_apply import haproxy_update
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_base import get_haproxy_section
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_frontend_acl import (
+    PFSenseHaproxyFrontendAclModule,
+    HAPROXY_FRONTEND_ACL_ARGUMENT_SPEC,
+)
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_frontend_action import PFSenseHaproxyFrontendActionModule
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_profile import get_haproxy_profiler, haproxy_phase, load_haproxy_pfsense
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_render import render_haproxy_cfg, set_rendered_result
+
+HAPROXY_FRONTEND_ROUTING_RULE_ARGUMENT_SPEC = dict(
+    acl=dict(required=True, type='str'),
+    expression=HAPROXY_FRONTEND_ACL_ARGUMENT_SPEC['expression'],
+    value=HAPROXY_FRONTEND_ACL_ARGUMENT_SPEC['value'],
+    casesensitive=HAPROXY_FRONTEND_ACL_ARGUMENT_SPEC['casesensitive'],
+    negate=HAPROXY_FRONTEND_ACL_ARGUMENT_SPEC['negate'],
+    backend=dict(required=True, type='str'),
+)
+
+HAPROXY_FRONTEND_ROUTING_ARGUMENT_SPEC = dict(
+    frontend=dict(required=True, type='str'),
+    rules=dict(required=True, type='list', elements='dict', options=HAPROXY_FRONTEND_ROUTING_RULE_ARGUMENT_SPEC),
+    exclusive=dict(default=False, required=False, type='bool'),
+    reload=dict(default='immediate', choices=['immediate', 'deferred']),
+    render_only=dict(default=False, required=False, type='bool'),
+    profile=dict(default=False, required=False, type='bool'),
+)
+
+
+def _action_acls(action_elt):
+    """ return the names of the ACLs used by an action """
+    return (action_elt.findtext('acl') or '').split()
+
+
+class PFSenseHaproxyFrontendRoutingModule(object):
+    """ module managing the ACL based routing of a pfsense haproxy frontend """
+
+    @staticmethod
+    def get_argument_spec():
+        """ return argument spec """
+        return HAPROXY_FRONTEND_ROUTING_ARGUMENT_SPEC
+
+    ##############################
+    # init
+    #
+    def __init__(self, module, pfsense=None):
+        self.module = module
+        self.pfsense = load_haproxy_pfsense(module, pfsense)
+
+        # both modules share the same pfsense object, and so the same XML tree
+        self.pfsense_acls = PFSenseHaproxyFrontendAclModule(module, self.pfsense)
+        self.pfsense_actions = PFSenseHaproxyFrontendActionModule(module, self.pfsense)
+        self.result = dict(changed=False, commands=[], reloaded=False)
+        self.rendered_before = None
+
+        profiler = get_haproxy_profiler(self.pfsense)
+        if profiler is not None:
+            self.result['timings'] = profiler.report()
+
+    ##############################
+    # params processing
+    #
+    def _validate_rules(self, rules):
+        """ check that an ACL is used by only one rule """
+        acls = set()
+        for idx, rule in enumerate(rules):
+            if rule['acl'] in acls:
+                self.module.fail_json(msg="rules[{0}]: duplicate acl '{1}'".format(idx, rule['acl']))
+            acls.add(rule['acl'])
+
+    @staticmethod
+    def _acl_params(params, state, name, rule=None):
+        """ return the params of the ACL module """
+        acl_params = dict(
+            state=state,
+            frontend=params['frontend'],
+            name=name,
+            expression=None,
+            value=None,
+            casesensitive=False,
+            negate=False,
+            reload=params['reload'],
+        )
+        if rule is not None:
+            for param in ['expression', 'value', 'casesensitive', 'negate']:
+                acl_params[param] = rule[param]
+        return acl_params
+
+    @staticmethod
+    def _action_params(params, state, acl, backend):
+        """ return the params of the action module """
+        return dict(
+            state=state,
+            frontend=params['frontend'],
+            action='use_backend',
+            backend=backend,
+            acl=acl,
+            custom_action=None,
+            reload=params['reload'],
+        )
+
+    ##############################
+    # run
+    #
+    def _run(self, pfmodule, params):
+        """ run pfmodule and gather its commands """
+        count = len(pfmodule.result['commands'])
+        pfmodule.run(params)
+        self.result['commands'] += pfmodule.result['commands'][count:]
+        if pfmodule.result['changed']:
+            self.result['changed'] = True
+
+    def _remove_stale(self, params, frontend_elt, rules):
+        """ delete the use_backend actions which do not match the rules and, if exclusive, the ACLs not listed """
+        backends = dict((rule['acl'], rule['backend']) for rule in rules)
+
+        todel = []
+        kept_acls = set()
+        for action_elt in frontend_elt.findall('a_actionitems/item'):
+            acl = action_elt.findtext('acl') or ''
+            backend = action_elt.findtext('use_backendbackend')
+            if action_elt.findtext('action') == 'use_backend':
+                if (acl in backends and backends[acl] != backend) or (acl not in backends and params['exclusive']):
+                    todel.append(self._action_params(params, 'absent', acl, backend))
+                    continue
+            kept_acls.update(_action_acls(action_elt))
+
+        for action_params in todel:
+            self._run(self.pfsense_actions, action_params)
+
+        if not params['exclusive']:
+            return
+
+        # ACLs still used by the actions we do not manage are kept
+        todel = []
+        for acl_elt in frontend_elt.findall('a_acl/item'):
+            name = acl_elt.findtext('name')
+            if name not in backends and name not in kept_acls:
+                todel.append(self._acl_params(params, 'absent', name))
+        for acl_params in todel:
+            self._run(self.pfsense_acls, acl_params)
+
+    def _order_actions(self, params, frontend_elt, rules):
+        """ sort the use_backend actions of the rules in the order of the rules, in the slots they already use """
+        wanted = [(rule['acl'], rule['backend']) for rule in rules]
+        actions_elt = frontend_elt.find('a_actionitems')
+        if actions_elt is None:
+            return
+
+        managed = dict()
+        slots = []
+        for idx, action_elt in enumerate(actions_elt):
+            if action_elt.tag != 'item' or action_elt.findtext('action') != 'use_backend':
+                continue
+            key = (action_elt.findtext('acl') or '', action_elt.findtext('use_backendbackend'))
+            if key in wanted and key not in managed:
+                managed[key] = action_elt
+                slots.append(idx)
+
+        ordered = [managed[key] for key in wanted if key in managed]
+        if all(actions_elt[idx] is action_elt for idx, action_elt in zip(slots, ordered)):
+            return
+
+        for idx, action_elt in zip(slots, ordered):
+            actions_elt[idx] = action_elt
+        self.result['commands'].append("update haproxy_frontend_routing '{0}' set order='{1}'".format(
+            params['frontend'], ','.join(key[0] for key in wanted if key in managed)))
+        self.result['changed'] = True
+
+    def run(self, params):
+        """ reconcile the ACLs and use_backend actions of the frontend with the rules """
+        rules = params['rules']
+        self._validate_rules(rules)
+        if params['render_only']:
+            with haproxy_phase(self.pfsense, 'render'):
+                self.rendered_before = render_haproxy_cfg(get_haproxy_section(self.pfsense))
+
+        frontend_elt = self.pfsense_acls._find_frontend(params['frontend'])
+        if frontend_elt is None:
+            self.module.fail_json(msg="The frontend named '{0}' does not exist".format(params['frontend']))
+
+        self._remove_stale(params, frontend_elt, rules)
+
+        for rule in rules:
+            self._run(self.pfsense_acls, self._acl_params(params, 'present', rule['acl'], rule))
+            self._run(self.pfsense_actions, self._action_params(params, 'present', rule['acl'], rule['backend']))
+
+        self._order_actions(params, frontend_elt, rules)
+
+    def commit_changes(self):
+        """ apply changes and exit module """
+        stdout = ''
+        stderr = ''
+        if self.rendered_before is not None:
+            with haproxy_phase(self.pfsense, 'render'):
+                rendered = render_haproxy_cfg(get_haproxy_section(self.pfsense))
+            set_rendered_result(self.result, self.rendered_before, rendered)
+        elif self.result['changed'] and not self.module.check_mode:
+            self.pfsense.write_config(descr='haproxy frontend routing change')
+            (dummy, stdout, stderr) = haproxy_update(self.pfsense, self.module.params['reload'], self.result, get_haproxy_section(self.pfsense))
+
+        self.result['stdout'] = stdout
+        self.result['stderr'] = stderr
+        self.module.exit_json(**self.result)
@@ -7,7 +7,8 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 import re
 import socket
-from ansible_collections.pfsensible.core.plugins.module_utils.module_base import PFSenseModuleBase
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_advanced import set_inline_options, split_inline_options
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_base import PFSenseHaproxyBase
 
 # Standard pfSense address choices for external addresses
 EXTADDR_STANDARD_CHOICES = [
@@ -30,10 +31,25 @@ HAPROXY_FRONTEND_SERVER_ARGUMENT_SPEC = dict(
     extaddr=dict(required=False, type='str'),
     extaddr_port=dict(required=False, type='int'),
     extaddr_ssl=dict(required=False, type='str'),
+    thread=dict(required=False, type='str'),
+    shards=dict(required=False, type='str'),
+    tfo=dict(required=False, type='bool'),
+    backlog=dict(required=False, type='int'),
+    alpn=dict(required=False, type='list', elements='str', choices=['h2', 'http/1.1', 'http/1.0']),
+    reload=dict(default='immediate', choices=['immediate', 'deferred']),
+    render_only=dict(default=False, required=False, type='bool'),
+    profile=dict(default=False, required=False, type='bool'),
 )
 
+# bind keywords without a field in the webgui, written in the pass thru of the bind line (extaddr_advanced)
+HAPROXY_BIND_OPTIONS = ['thread', 'shards', 'tfo', 'backlog', 'alpn']
+HAPROXY_BIND_FLAGS = ['tfo']
 
-class PFSenseHaproxyFrontendServerModule(PFSenseModuleBase):
+# a set of threads, optionally of a thread group, like 1-4, 2/all or odd
+HAPROXY_THREAD_SET_RE = re.compile(r'^(\d+/)?(all|odd|even|\d+(-\d+)?)$')
+
+
+class PFSenseHaproxyFrontendServerModule(PFSenseHaproxyBase):
     """ module managing pfsense haproxy frontends """
 
     @staticmethod
@@ -47,14 +63,6 @@ class PFSenseHaproxyFrontendServerModule(PFSenseModuleBase):
     def __init__(self, module, pfsense=None):
         super(PFSenseHaproxyFrontendServerModule, self).__init__(module, pfsense)
         self.name = "pfsense_haproxy_frontend_server"
-        self.root_elt = None
-        self.obj = dict()
-
-        pkgs_elt = self.pfsense.get_element('installedpackages')
-        self.haproxy = pkgs_elt.find('haproxy') if pkgs_elt is not None else None
-        self.frontends = self.haproxy.find('ha_backends') if self.haproxy is not None else None
-        if self.frontends is None:
-            self.module.fail_json(msg='Unable to find frontends (ha_backends) XML configuration entry. Are you sure haproxy is installed ?')
 
         self.frontend = None
 
@@ -122,6 +130,29 @@ class PFSenseHaproxyFrontendServerModule(PFSenseModuleBase):
             self.root_elt = self.pfsense.new_element('a_extaddr')
             self.frontend.append(self.root_elt)
 
+        self._validate_bind_options()
+
+    def _validate_bind_options(self):
+        """ check the bind options """
+        thread = self.params.get('thread')
+        if thread is not None and not all(HAPROXY_THREAD_SET_RE.match(part) for part in thread.split(',')):
+            self.module.fail_json(msg="thread must be a set of threads, like 1-4, odd or 1/all")
+        shards = self.params.get('shards')
+        if shards is not None and shards not in ['by-thread', 'by-group'] and not (shards.isdigit() and int(shards) > 0):
+            self.module.fail_json(msg="shards must be a positive number, by-thread or by-group")
+        if self.params.get('backlog') is not None and self.params['backlog'] < 1:
+            self.module.fail_json(msg="backlog must be positive")
+
+        if self.params.get('alpn'):
+            frontend_type = self.frontend.findtext('type') or 'http'
+            if frontend_type != 'http':
+                self.module.fail_json(
+                    msg=f"Parameter 'alpn' cannot be used with frontend type '{frontend_type}'. "
+                        "ALPN is only negotiated by 'http' type frontends offloading SSL."
+                )
+            if self.params.get('extaddr_ssl') not in [None, 'yes']:
+                self.module.fail_json(msg="Parameter 'alpn' requires SSL offloading on the bind (extaddr_ssl='yes').")
+
     ##############################
     # XML processing
     #
@@ -130,45 +161,24 @@ class PFSenseHaproxyFrontendServerModule(PFSenseModuleBase):
         server_elt = self.pfsense.new_element('item')
         return server_elt
 
-    def _find_frontend(self, name):
-        """ return the target frontend_elt if found """
-        for item_elt in self.frontends:
-            if item_elt.tag != 'item':
-                continue
-            name_elt = item_elt.find('name')
-            if name_elt is not None and name_elt.text == name:
-                return item_elt
-        return None
-
-    def _find_target(self):
-        """ find the XML target_elt """
-        for item_elt in self.root_elt:
-            if item_elt.tag != 'item':
-                continue
-            name_elt = item_elt.find('name')
-            if name_elt is not None and name_elt.text == self.obj['name']:
-                return item_elt
-        return None
-
-    def _get_next_id(self):
-        """ get next free haproxy id  """
-        max_id = 99
-        id_elts = self.haproxy.findall('.//id')
-        for id_elt in id_elts:
-            if id_elt.text is None:
-                continue
-            ha_id = int(id_elt.text)
-            if ha_id > max_id:
-                max_id = ha_id
-        return str(max_id + 1)
-
-    ##############################
-    # run
-    #
-    def _update(self):
-        """ make the target pfsense reload haproxy """
-        return self.pfsense.phpshell('''require_once("haproxy/haproxy.inc");
-$result = haproxy_check_and_run($savemsg, true); if ($result) unlink_if_exists($d_haproxyconfdirty_path);''')
+    def _set_bind_options(self, advanced):
+        """ set the bind options in the pass thru of the bind line, keeping the rest of it """
+        options = dict((option, self.params.get(option)) for option in HAPROXY_BIND_OPTIONS)
+        if options['alpn'] is not None:
+            options['alpn'] = ','.join(options['alpn']) or False
+        advanced = set_inline_options(advanced, options, HAPROXY_BIND_FLAGS)
+        if advanced is not None:
+            self.obj['extaddr_advanced'] = advanced
+
+    def _copy_and_add_target(self):
+        """ populate the XML target_elt """
+        self._set_bind_options(None)
+        super(PFSenseHaproxyFrontendServerModule, self)._copy_and_add_target()
+
+    def _copy_and_update_target(self):
+        """ update the XML target_elt """
+        self._set_bind_options(self.target_elt.findtext('extaddr_advanced'))
+        return super(PFSenseHaproxyFrontendServerModule, self)._copy_and_update_target()
 
     ##############################
     # Logging
@@ -180,10 +190,23 @@ $result = haproxy_check_and_run($savemsg, true); if ($result) unlink_if_exists($
             values += self.format_cli_field(self.params, 'extaddr')
             values += self.format_cli_field(self.params, 'extaddr_port')
             values += self.format_cli_field(self.params, 'extaddr_ssl')
+            values += self.format_cli_field(self.params, 'thread')
+            values += self.format_cli_field(self.params, 'shards')
+            values += self.format_cli_field(self.params, 'tfo', fvalue=self.fvalue_bool)
+            values += self.format_cli_field(self.params, 'backlog')
+            if self.params.get('alpn'):
+                values += self.format_cli_field(dict(alpn=','.join(self.params['alpn'])), 'alpn')
         else:
             values += self.format_updated_cli_field(self.obj, before, 'extaddr', add_comma=(values))
             values += self.format_updated_cli_field(self.obj, before, 'extaddr_port', add_comma=(values))
             values += self.format_updated_cli_field(self.obj, before, 'extaddr_ssl', add_comma=(values))
+            (before_options, dummy) = split_inline_options(before.get('extaddr_advanced'), HAPROXY_BIND_OPTIONS, HAPROXY_BIND_FLAGS)
+            (after_options, dummy) = split_inline_options(self.target_elt.findtext('extaddr_advanced'), HAPROXY_BIND_OPTIONS, HAPROXY_BIND_FLAGS)
+            before_options.setdefault('tfo', False)
+            after_options.setdefault('tfo', False)
+            for option in HAPROXY_BIND_OPTIONS:
+                fvalue = self.fvalue_bool if option in HAPROXY_BIND_FLAGS else None
+                values += self.format_updated_cli_field(after_options, before_options, option, add_comma=(values), fvalue=fvalue)
         return values
 
     def _get_obj_name(self):
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey, nicholas@morey.tech
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_profile import get_haproxy_profiler
+
+
+def get_haproxy_index(pfsense):
+    """ return the index shared by all the haproxy modules working on the pfsense XML tree """
+    index = getattr(pfsense, 'haproxy_index', None)
+    if index is None:
+        index = HaproxyIndex(get_haproxy_profiler(pfsense))
+        pfsense.haproxy_index = index
+    return index
+
+
+def item_name(item_elt):
+    """ return the name of a haproxy item, the key of most haproxy containers """
+    name_elt = item_elt.find('name')
+    if name_elt is None:
+        return None
+    return name_elt.text
+
+
+def action_key(item_elt):
+    """ return the key of a frontend action item: (action, backend or custom action, acl) """
+    def _text(tag):
+        elt = item_elt.find(tag)
+        return elt.text if elt is not None else None
+
+    action = _text('action')
+    if action == 'use_backend':
+        target = _text('use_backendbackend')
+    elif action == 'custom':
+        target = _text('customcustomaction')
+    else:
+        target = None
+    return (action, target, _text('acl') or '')
+
+
+class HaproxyIndex(object):
+    """ key -> item maps of the haproxy containers (ha_pools, ha_backends, ha_servers, a_acl, ha_acls, a_actionitems, a_extaddr)
+
+    Each container is scanned once, the first time it is searched. Modules adding or removing items must
+    call add() or remove() to keep the map in sync; a container whose size changed behind our back is rescanned.
+    """
+
+    def __init__(self, profiler=None):
+        # id(container_elt) -> _ContainerMap
+        self._maps = dict()
+        self.profiler = profiler
+
+    def _get_map(self, container_elt, key):
+        """ return the map of container_elt, (re)building it if required """
+        cmap = self._maps.get(id(container_elt))
+        if cmap is None or cmap.container_elt is not container_elt or cmap.key is not key or cmap.size != len(container_elt):
+            cmap = _ContainerMap(container_elt, key)
+            self._maps[id(container_elt)] = cmap
+            if self.profiler is not None:
+                self.profiler.visit('index', cmap.size)
+        return cmap
+
+    def find(self, container_elt, value, key=item_name):
+        """ return the first item of container_elt whose key is value, or None """
+        if container_elt is None:
+            return None
+        return self._get_map(container_elt, key).items.get(value)
+
+    def add(self, container_elt, item_elt, key=item_name):
+        """ register item_elt, which has just been appended to container_elt """
+        cmap = self._maps.get(id(container_elt))
+        if cmap is None or cmap.container_elt is not container_elt or cmap.key is not key or cmap.size + 1 != len(container_elt):
+            # never searched or out of sync: it will be (re)built on the next search
+            self._maps.pop(id(container_elt), None)
+            return
+        cmap.size += 1
+        if item_elt.tag == 'item':
+            value = key(item_elt)
+            if value in cmap.items:
+                cmap.duplicates = True
+            else:
+                cmap.items[value] = item_elt
+
+    def remove(self, container_elt, item_elt, key=item_name):
+        """ unregister item_elt, which has just been removed from container_elt """
+        cmap = self._maps.get(id(container_elt))
+        if cmap is None or cmap.container_elt is not container_elt or cmap.key is not key or cmap.size - 1 != len(container_elt):
+            self._maps.pop(id(container_elt), None)
+            return
+        cmap.size -= 1
+        value = key(item_elt)
+        if cmap.items.get(value) is not item_elt:
+            return
+        del cmap.items[value]
+        if cmap.duplicates:
+            # another item may have the same key, it becomes the first one
+            for other_elt in container_elt:
+                if other_elt.tag == 'item' and key(other_elt) == value:
+                    cmap.items[value] = other_elt
+                    break
+
+
+class _ContainerMap(object):
+    """ key -> item map of one container """
+
+    def __init__(self, container_elt, key):
+        self.container_elt = container_elt
+        self.key = key
+        self.size = len(container_elt)
+        self.duplicates = False
+        self.items = dict()
+        for item_elt in container_elt:
+            if item_elt.tag != 'item':
+                continue
+            value = key(item_elt)
+            if value in self.items:
+                # like a linear scan, we return the first one
+                self.duplicates = True
+            else:
+                self.items[value] = item_elt
+
+
+def get_haproxy_cert_index(pfsense):
+    """ return the certificate index shared by all the haproxy modules working on the pfsense XML tree """
+    cert_index = getattr(pfsense, 'haproxy_cert_index', None)
+    if cert_index is None or cert_index.root_elt is not pfsense.root:
+        cert_index = HaproxyCertIndex(pfsense.root, profiler=get_haproxy_profiler(pfsense))
+        pfsense.haproxy_cert_index = cert_index
+    return cert_index
+
+
+class HaproxyCertIndex(object):
+    """ field -> element maps of the certificates, CAs and CRLs (cert, ca and crl elements of the config root)
+
+    Each (tag, field) map is built with one scan of the elements of tag, the first time it is searched, so that
+    refids can be found from descrs and descrs from refids without walking the certificate store again.
+    The haproxy modules do not add nor remove certificates, the maps are kept for the whole run.
+    """
+
+    def __init__(self, root_elt, profiler=None):
+        self.root_elt = root_elt
+        self.profiler = profiler
+        # (tag, field) -> field value -> element
+        self._maps = dict()
+
+    def _get_map(self, tag, field):
+        """ return the map of the elements of tag by field, building it if required """
+        fmap = self._maps.get((tag, field))
+        if fmap is None:
+            fmap = dict()
+            visited = 0
+            for elt in self.root_elt.findall(tag):
+                visited += 1
+                value = elt.findtext(field)
+                # like a linear scan, we return the first one
+                if value is not None and value not in fmap:
+                    fmap[value] = elt
+            self._maps[(tag, field)] = fmap
+            if self.profiler is not None:
+                self.profiler.visit('certs', visited)
+        return fmap
+
+    def find(self, tag, value, field='descr'):
+        """ return the first element of tag (cert, ca or crl) whose field is value, or None """
+        return self._get_map(tag, field).get(value)
+
+    def refid(self, tag, value, field='descr'):
+        """ return the refid of the first element of tag whose field is value, or None """
+        elt = self.find(tag, value, field)
+        return elt.findtext('refid') if elt is not None else None
+
+    def descr(self, tag, refid):
+        """ return the descr of the element of tag whose refid is refid, or None """
+        elt = self.find(tag, refid, 'refid')
+        return elt.findtext('descr') if elt is not None else None
+
+
+def get_haproxy_ids(pfsense, haproxy_elt):
+    """ return the id allocator shared by all the haproxy modules working on the pfsense XML tree """
+    ids = getattr(pfsense, 'haproxy_ids', None)
+    if ids is None or ids.haproxy_elt is not haproxy_elt:
+        ids = HaproxyIdAllocator(haproxy_elt, profiler=get_haproxy_profiler(pfsense))
+        pfsense.haproxy_ids = ids
+    return ids
+
+
+class HaproxyIdAllocator(object):
+    """ allocator of the haproxy item ids
+
+    Like the webgui, ids are unique across the whole haproxy subtree and a new item gets the highest id + 1.
+    The subtree is scanned once, on the first allocation; ids released by deleted items are not reused.
+    """
+
+    def __init__(self, haproxy_elt, first_id=100, profiler=None):
+        self.haproxy_elt = haproxy_elt
+        self.max_id = first_id - 1
+        self.profiler = profiler
+        self._scanned = False
+
+    def _scan(self):
+        """ find the highest id in use """
+        self._scanned = True
+        if self.haproxy_elt is None:
+            return
+        visited = 0
+        for id_elt in self.haproxy_elt.iter('id'):
+            self.reserve(id_elt.text)
+            visited += 1
+        if self.profiler is not None:
+            self.profiler.visit('ids', visited)
+
+    def reserve(self, ha_id):
+        """ record an id assigned without the allocator, non-numeric ids are ignored """
+        try:
+            ha_id = int(ha_id)
+        except (TypeError, ValueError):
+            return
+        if ha_id > self.max_id:
+            self.max_id = ha_id
+
+    def next_id(self):
+        """ return a new id, as a string """
+        if not self._scanned:
+            self._scan()
+        self.max_id += 1
+        return str(self.max_id)
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey, nicholas@morey.tech
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+from fnmatch import fnmatchcase
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_base import get_haproxy_section
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_profile import get_haproxy_profiler, haproxy_phase, load_haproxy_pfsense
+
+HAPROXY_INFO_SUBSETS = ['backends', 'backend_servers', 'frontends', 'frontend_servers', 'acls', 'actions']
+
+HAPROXY_INFO_ARGUMENT_SPEC = dict(
+    gather=dict(required=False, type='list', elements='str', choices=HAPROXY_INFO_SUBSETS, default=HAPROXY_INFO_SUBSETS),
+    backends=dict(required=False, type='list', elements='str'),
+    frontends=dict(required=False, type='list', elements='str'),
+    profile=dict(default=False, required=False, type='bool'),
+)
+
+
+def _items(container_elt):
+    """ return the items of a haproxy container, which may be missing """
+    if container_elt is None:
+        return []
+    return container_elt.findall('item')
+
+
+def item_to_dict(item_elt, **parents):
+    """ return the non empty scalar fields of a haproxy item, the nested containers are skipped """
+    obj = dict(parents)
+    for elt in item_elt:
+        if len(elt) or not elt.text:
+            continue
+        obj[elt.tag] = elt.text
+    return obj
+
+
+class PFSenseHaproxyInfoModule(object):
+    """ module reporting the pfsense haproxy configuration """
+
+    @staticmethod
+    def get_argument_spec():
+        """ return argument spec """
+        return HAPROXY_INFO_ARGUMENT_SPEC
+
+    ##############################
+    # init
+    #
+    def __init__(self, module, pfsense=None):
+        self.module = module
+        self.pfsense = load_haproxy_pfsense(module, pfsense)
+        self.result = dict(changed=False)
+        self.gather = None
+
+        profiler = get_haproxy_profiler(self.pfsense)
+        if profiler is not None:
+            self.result['timings'] = profiler.report()
+
+    @staticmethod
+    def _match(name, patterns):
+        """ return True if name matches one of the patterns, or if there is no pattern """
+        if not patterns:
+            return True
+        return any(fnmatchcase(name or '', pattern) for pattern in patterns)
+
+    ##############################
+    # run
+    #
+    def _gather_backends(self, haproxy_elt, patterns):
+        """ walk the backends and their servers """
+        for backend_elt in _items(haproxy_elt.find('ha_pools')):
+            name = backend_elt.findtext('name')
+            if not self._match(name, patterns):
+                continue
+            if 'backends' in self.gather:
+                self.result['backends'].append(item_to_dict(backend_elt))
+            if 'backend_servers' in self.gather:
+                for server_elt in _items(backend_elt.find('ha_servers')):
+                    self.result['backend_servers'].append(item_to_dict(server_elt, backend=name))
+
+    def _gather_frontends(self, haproxy_elt, patterns):
+        """ walk the frontends, their bind addresses, ACLs and actions """
+        for frontend_elt in _items(haproxy_elt.find('ha_backends')):
+            name = frontend_elt.findtext('name')
+            if not self._match(name, patterns):
+                continue
+            if 'frontends' in self.gather:
+                self.result['frontends'].append(item_to_dict(frontend_elt))
+            if 'frontend_servers' in self.gather:
+                for server_elt in _items(frontend_elt.find('a_extaddr')):
+                    self.result['frontend_servers'].append(item_to_dict(server_elt, frontend=name))
+            if 'acls' in self.gather:
+                # the ACLs are stored twice, in a_acl and ha_acls, report each one once
+                acl_names = set()
+                for acl_elt in _items(frontend_elt.find('a_acl')) + _items(frontend_elt.find('ha_acls')):
+                    acl_name = acl_elt.findtext('name')
+                    if acl_name in acl_names:
+                        continue
+                    acl_names.add(acl_name)
+                    self.result['acls'].append(item_to_dict(acl_elt, frontend=name))
+            if 'actions' in self.gather:
+                for action_elt in _items(frontend_elt.find('a_actionitems')):
+                    self.result['actions'].append(item_to_dict(action_elt, frontend=name))
+
+    def run(self, params):
+        """ walk the haproxy configuration once, skipping what has not been asked """
+        haproxy_elt = get_haproxy_section(self.pfsense)
+        if haproxy_elt is None:
+            self.module.fail_json(msg='Unable to find haproxy XML configuration entry. Are you sure haproxy is installed ?')
+
+        self.gather = set(params['gather'])
+        for subset in HAPROXY_INFO_SUBSETS:
+            if subset in self.gather:
+                self.result[subset] = list()
+
+        with haproxy_phase(self.pfsense, 'gather'):
+            if self.gather.intersection(['backends', 'backend_servers']):
+                self._gather_backends(haproxy_elt, params['backends'])
+
+            if self.gather.intersection(['frontends', 'frontend_servers', 'acls', 'actions']):
+                self._gather_frontends(haproxy_elt, params['frontends'])
+
+    def commit_changes(self):
+        """ exit module """
+        self.module.exit_json(**self.result)
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey, nicholas@morey.tech
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+import functools
+import os
+import time
+from contextlib import contextmanager
+from ansible_collections.pfsensible.core.plugins.module_utils.pfsense import PFSenseModule
+
+# profiling can also be enabled on the target, without changing the tasks
+HAPROXY_PROFILE_ENV = 'PFSENSIBLE_HAPROXY_PROFILE'
+
+# phase -> methods of the haproxy modules timed in that phase, the phases do not nest
+HAPROXY_PROFILED_METHODS = [
+    ('validate', ['_validate_params']),
+    ('params', ['_params_to_obj']),
+    ('lookup', ['_find_target']),
+    ('id_allocation', ['_get_next_id']),
+    ('xml_update', ['_copy_and_add_target', '_copy_and_update_target', '_remove_target_elt']),
+]
+
+
+def haproxy_profiling(params):
+    """ return True if profiling has been asked for, by the profile option or by the environment """
+    if params.get('profile'):
+        return True
+    return os.environ.get(HAPROXY_PROFILE_ENV, '').lower() in ['1', 'true', 'yes', 'on']
+
+
+def get_haproxy_profiler(pfsense):
+    """ return the profiler of the pfsense XML tree, or None when not profiling """
+    return getattr(pfsense, 'haproxy_profiler', None)
+
+
+def load_haproxy_pfsense(module, pfsense=None):
+    """ return pfsense, loading config.xml if it is None, with a profiler attached when profiling has been asked for """
+    if not haproxy_profiling(module.params):
+        return pfsense if pfsense is not None else PFSenseModule(module)
+
+    start = time.monotonic()
+    loaded = pfsense is None
+    if loaded:
+        pfsense = PFSenseModule(module)
+
+    profiler = get_haproxy_profiler(pfsense)
+    if profiler is None:
+        profiler = HaproxyProfiler()
+        pfsense.haproxy_profiler = profiler
+        pfsense.write_config = profiler.timed('write_config', pfsense.write_config)
+        pfsense.phpshell = profiler.timed('phpshell', pfsense.phpshell)
+    if loaded:
+        profiler.add('load_config', time.monotonic() - start)
+    return pfsense
+
+
+@contextmanager
+def _no_phase():
+    yield
+
+
+def haproxy_phase(pfsense, phase):
+    """ return a context manager timing phase when profiling, doing nothing otherwise """
+    profiler = get_haproxy_profiler(pfsense)
+    if profiler is None:
+        return _no_phase()
+    return profiler.phase(phase)
+
+
+def haproxy_visit(pfsense, what, count):
+    """ count XML elements visited when profiling """
+    profiler = get_haproxy_profiler(pfsense)
+    if profiler is not None:
+        profiler.visit(what, count)
+
+
+class HaproxyProfiler(object):
+    """ time spent in each phase of the haproxy modules and number of XML elements they visit
+
+    Durations are monotonic seconds summed over all the calls of a phase. The dicts are filled as the modules run,
+    so the report put in the result before the run is complete when the module exits.
+    """
+
+    def __init__(self):
+        self.phases = dict()
+        self.calls = dict()
+        self.visited = dict()
+
+    def add(self, phase, duration):
+        """ account duration to phase """
+        self.phases[phase] = self.phases.get(phase, 0.0) + duration
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+
+    def visit(self, what, count):
+        """ account count XML elements visited to what """
+        self.visited[what] = self.visited.get(what, 0) + count
+
+    @contextmanager
+    def phase(self, phase):
+        """ time the enclosed block in phase """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(phase, time.monotonic() - start)
+
+    def timed(self, phase, func):
+        """ return func, timed in phase """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.phase(phase):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def instrument(self, pfmodule):
+        """ time the methods of pfmodule run in each phase """
+        for phase, methods in HAPROXY_PROFILED_METHODS:
+            for method in methods:
+                setattr(pfmodule, method, self.timed(phase, getattr(pfmodule, method)))
+
+    def report(self):
+        """ return the timings to put in the module result """
+        return dict(phases=self.phases, calls=self.calls, visited=self.visited)
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey, nicholas@morey.tech
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+import base64
+import binascii
+
+# the addresses pfsense resolves itself, the interface addresses are left as they are
+EXTADDR_ADDRESSES = dict(
+    any_ipv4='0.0.0.0',
+    any_ipv6='::',
+    localhost_ipv4='127.0.0.1',
+    localhost_ipv6='::1',
+)
+
+# ACL expression -> haproxy fetch and match method
+ACL_EXPRESSIONS = dict(
+    ssl_sni_matches='req.ssl_sni',
+    ssl_sni_contains='req.ssl_sni -m sub',
+    ssl_sni_starts_with='req.ssl_sni -m beg',
+    ssl_sni_ends_with='req.ssl_sni -m end',
+    ssl_sni_regex='req.ssl_sni -m reg',
+)
+
+# check_type -> backend option
+CHECK_OPTIONS = dict(
+    LDAP='ldap-check',
+    Redis='redis-check',
+    SSL='ssl-hello-chk',
+)
+
+DEFAULT_TIMEOUT = '30000'
+DEFAULT_RETRIES = '3'
+DEFAULT_CHECK_INTER = '1000'
+
+
+def backend_cfg_name(name):
+    """ return the name of a backend in haproxy.cfg """
+    return '{0}_ipvANY'.format(name)
+
+
+def _text(elt, tag):
+    """ return the stripped text of the tag child of elt, or None if it is missing or empty """
+    if elt is None:
+        return None
+    text = elt.findtext(tag)
+    if text is None or text.strip() == '':
+        return None
+    return text.strip()
+
+
+def _items(elt, tag):
+    """ return the items of the tag container of elt """
+    if elt is None:
+        return []
+    return elt.findall(tag + '/item')
+
+
+def _decode(text):
+    """ return the lines of a base64 encoded pass thru field, like the webgui stores them """
+    if text is None:
+        return []
+    try:
+        text = base64.b64decode(text, validate=True).decode('utf-8')
+    except (binascii.Error, ValueError):
+        pass
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def _render_global(haproxy_elt, lines):
+    """ render the global section """
+    lines.append('global')
+    for tag, keyword in [('maxconn', 'maxconn'), ('nbthread', 'nbthread'), ('hard_stop_after', 'hard-stop-after')]:
+        value = _text(haproxy_elt, tag)
+        if value is not None:
+            lines.append('\t{0}\t\t\t{1}'.format(keyword, value))
+    lines.append('\tstats socket /tmp/haproxy.socket level admin expose-fd listeners')
+    lines.append('\tuid\t\t\t80')
+    lines.append('\tgid\t\t\t80')
+    lines.append('\tchroot\t\t\t/tmp/haproxy_chroot')
+    lines.append('\tdaemon')
+    lines.append('\tserver-state-file /tmp/haproxy_server_state')
+    for line in _decode(_text(haproxy_elt, 'advanced')):
+        lines.append('\t' + line)
+    lines.append('')
+
+
+def _acl_conditions(frontend_elt):
+    """ return ACL name -> condition used by the actions """
+    conditions = dict()
+    for acl_elt in _items(frontend_elt, 'ha_acls') or _items(frontend_elt, 'a_acl'):
+        name = _text(acl_elt, 'name')
+        conditions[name] = '!' + name if _text(acl_elt, 'not') == 'yes' else name
+    return conditions
+
+
+def _condition(action_elt, conditions):
+    """ return the ' if ...' suffix of an action """
+    acls = (_text(action_elt, 'acl') or '').split()
+    if not acls:
+        return ''
+    return '  if ' + ' '.join(conditions.get(acl, acl) for acl in acls)
+
+
+def _render_frontend(frontend_elt, lines):
+    """ render a frontend section """
+    name = _text(frontend_elt, 'name')
+    frontend_type = _text(frontend_elt, 'type') or 'http'
+    lines.append('frontend {0}'.format(name))
+
+    for extaddr_elt in _items(frontend_elt, 'a_extaddr'):
+        extaddr = _text(extaddr_elt, 'extaddr')
+        if extaddr is None:
+            # without an address there is nothing to bind to
+            continue
+        address = EXTADDR_ADDRESSES.get(extaddr, extaddr)
+        port = _text(extaddr_elt, 'extaddr_port')
+        if port is not None:
+            address += ':' + port
+        bind = '\tbind\t\t\t{0} name {0}'.format(address)
+        if _text(extaddr_elt, 'extaddr_ssl') == 'yes':
+            bind += ' ssl crt-list /var/etc/haproxy/{0}.crt_list'.format(name)
+        advanced = _text(extaddr_elt, 'extaddr_advanced')
+        if advanced is not None:
+            bind += ' ' + advanced
+        lines.append(bind)
+
+    lines.append('\tmode\t\t\t{0}'.format('http' if frontend_type == 'http' else 'tcp'))
+    lines.append('\tlog\t\t\tglobal')
+    max_connections = _text(frontend_elt, 'max_connections')
+    if max_connections is not None:
+        lines.append('\tmaxconn\t\t\t{0}'.format(max_connections))
+    httpclose = _text(frontend_elt, 'httpclose')
+    if frontend_type == 'http' and httpclose is not None:
+        lines.append('\toption\t\t\t{0}'.format(httpclose))
+    lines.append('\ttimeout client\t\t{0}'.format(_text(frontend_elt, 'client_timeout') or DEFAULT_TIMEOUT))
+
+    acl_elts = _items(frontend_elt, 'ha_acls') or _items(frontend_elt, 'a_acl')
+    if frontend_type != 'http' and any((_text(acl_elt, 'expression') or '').startswith('ssl_sni') for acl_elt in acl_elts):
+        lines.append('\ttcp-request inspect-delay 5s')
+        lines.append('\ttcp-request content accept if { req.ssl_hello_type 1 }')
+    for acl_elt in acl_elts:
+        fetch = ACL_EXPRESSIONS.get(_text(acl_elt, 'expression'), _text(acl_elt, 'expression'))
+        if _text(acl_elt, 'casesensitive') != 'yes':
+            fetch += ' -i'
+        lines.append('\tacl\t\t\t{0}\t{1} {2}'.format(_text(acl_elt, 'name'), fetch, _text(acl_elt, 'value')))
+
+    conditions = _acl_conditions(frontend_elt)
+    for action_elt in _items(frontend_elt, 'a_actionitems'):
+        action = _text(action_elt, 'action')
+        if action == 'use_backend':
+            line = 'use_backend {0}'.format(backend_cfg_name(_text(action_elt, 'use_backendbackend')))
+        elif action == 'custom':
+            line = _text(action_elt, 'customcustomaction')
+        elif action == 'http-request_redirect':
+            line = 'http-request redirect {0}'.format(_text(action_elt, 'http-request_redirectrule'))
+        else:
+            continue
+        lines.append('\t{0}{1}'.format(line, _condition(action_elt, conditions)))
+
+    for line in _decode(_text(frontend_elt, 'advanced')):
+        lines.append('\t' + line)
+
+    backend = _text(frontend_elt, 'backend_serverpool')
+    if backend is not None:
+        lines.append('\tdefault_backend {0}'.format(backend_cfg_name(backend)))
+    lines.append('')
+
+
+def _render_server(server_elt, check, server_advanced, lines):
+    """ render a server line of a backend, server_advanced being the per server pass thru of the backend """
+    status = _text(server_elt, 'status') or 'active'
+    if status == 'inactive':
+        return
+    forwardto = _text(server_elt, 'forwardto')
+    if forwardto is not None:
+        address = 'abns@haproxy-frontend-{0}'.format(forwardto)
+    else:
+        # like the package, the port is appended to an empty address
+        address = _text(server_elt, 'address') or ''
+        if _text(server_elt, 'port') is not None:
+            address += ':' + _text(server_elt, 'port')
+
+    line = '\tserver\t\t\t{0} {1} id {2}'.format(_text(server_elt, 'name'), address, _text(server_elt, 'id'))
+    if _text(server_elt, 'ssl') == 'yes':
+        line += ' ssl'
+        line += ' verify required' if _text(server_elt, 'sslserververify') == 'yes' else ' verify none'
+    if check is not None:
+        line += ' ' + check
+        if _text(server_elt, 'checkssl') == 'yes':
+            line += ' check-ssl'
+    for tag in ['weight', 'maxconn', 'cookie']:
+        value = _text(server_elt, tag)
+        if value is not None:
+            line += ' {0} {1}'.format(tag, value)
+    if status == 'backup':
+        line += ' backup'
+    elif status == 'disabled':
+        line += ' disabled'
+    if server_advanced:
+        line += ' ' + server_advanced
+    advanced = _text(server_elt, 'advanced')
+    if advanced is not None:
+        line += ' ' + advanced
+    lines.append(line)
+
+
+def _render_backend(backend_elt, mode, lines):
+    """ render a backend section """
+    lines.append('backend {0}'.format(backend_cfg_name(_text(backend_elt, 'name'))))
+    lines.append('\tmode\t\t\t{0}'.format(mode))
+    lines.append('\tid\t\t\t{0}'.format(_text(backend_elt, 'id')))
+    lines.append('\tlog\t\t\tglobal')
+    if _text(backend_elt, 'log-health-checks') == 'yes':
+        lines.append('\toption\t\t\tlog-health-checks')
+    lines.append('\ttimeout connect\t\t{0}'.format(_text(backend_elt, 'connection_timeout') or DEFAULT_TIMEOUT))
+    lines.append('\ttimeout server\t\t{0}'.format(_text(backend_elt, 'server_timeout') or DEFAULT_TIMEOUT))
+    lines.append('\tretries\t\t\t{0}'.format(_text(backend_elt, 'retries') or DEFAULT_RETRIES))
+
+    balance = _text(backend_elt, 'balance')
+    if balance is not None:
+        if balance == 'uri':
+            for tag, keyword in [('balance_urilen', 'len'), ('balance_uridepth', 'depth')]:
+                if _text(backend_elt, tag) is not None:
+                    balance += ' {0} {1}'.format(keyword, _text(backend_elt, tag))
+            if _text(backend_elt, 'balance_uriwhole') == 'yes':
+                balance += ' whole'
+        lines.append('\tbalance\t\t\t{0}'.format(balance))
+
+    check_type = _text(backend_elt, 'check_type') or 'none'
+    if check_type == 'HTTP':
+        httpchk = ' '.join(value for value in [
+            _text(backend_elt, 'httpcheck_method') or 'OPTIONS',
+            _text(backend_elt, 'monitor_uri') or '/',
+            _text(backend_elt, 'monitor_httpversion'),
+        ] if value is not None)
+        lines.append('\toption\t\t\thttpchk {0}'.format(httpchk))
+    elif check_type in ['MySQL', 'PostgreSQL']:
+        option = 'mysql-check' if check_type == 'MySQL' else 'pgsql-check'
+        lines.append('\toption\t\t\t{0} user {1}'.format(option, _text(backend_elt, 'monitor_username') or ''))
+    elif check_type in ['SMTP', 'ESMTP']:
+        hello = 'HELO' if check_type == 'SMTP' else 'EHLO'
+        lines.append('\toption\t\t\tsmtpchk {0} {1}'.format(hello, _text(backend_elt, 'monitor_domain') or ''))
+    elif check_type in CHECK_OPTIONS:
+        lines.append('\toption\t\t\t{0}'.format(CHECK_OPTIONS[check_type]))
+
+    # advanced_backend is the backend pass thru, advanced the per server pass thru
+    for line in _decode(_text(backend_elt, 'advanced_backend')):
+        lines.append('\t' + line)
+    server_advanced = ' '.join(_decode(_text(backend_elt, 'advanced')))
+
+    check = None
+    if check_type != 'none':
+        check = 'check inter {0}'.format(_text(backend_elt, 'checkinter') or DEFAULT_CHECK_INTER)
+    for server_elt in _items(backend_elt, 'ha_servers'):
+        _render_server(server_elt, check, server_advanced, lines)
+    lines.append('')
+
+
+def render_haproxy_cfg(haproxy_elt):
+    """ return the haproxy.cfg text for the installedpackages/haproxy XML configuration
+
+    The output follows the layout of the file generated by the haproxy package closely enough to preview and diff
+    changes offline. The interface addresses are not resolved and the certificates are not written.
+    """
+    if haproxy_elt is None:
+        return ''
+
+    lines = []
+    _render_global(haproxy_elt, lines)
+
+    # backends are http when used by an http frontend, tcp otherwise
+    modes = dict()
+    for frontend_elt in _items(haproxy_elt, 'ha_backends'):
+        if _text(frontend_elt, 'status') == 'disabled':
+            continue
+        _render_frontend(frontend_elt, lines)
+        mode = 'http' if (_text(frontend_elt, 'type') or 'http') == 'http' else 'tcp'
+        backends = [_text(frontend_elt, 'backend_serverpool')]
+        backends += [_text(action_elt, 'use_backendbackend') for action_elt in _items(frontend_elt, 'a_actionitems')]
+        for backend in backends:
+            if backend is not None:
+                modes.setdefault(backend, mode)
+
+    for backend_elt in _items(haproxy_elt, 'ha_pools'):
+        _render_backend(backend_elt, modes.get(_text(backend_elt, 'name'), 'http'), lines)
+
+    return '\n'.join(lines)
+
+
+def set_rendered_result(result, before, after):
+    """ report the rendered haproxy.cfg, and its changes, in result """
+    result['haproxy_cfg'] = after
+    result['diff'] = dict(before=before, after=after, before_header='haproxy.cfg', after_header='haproxy.cfg')
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey, nicholas@morey.tech
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+import codecs
+import csv
+import socket
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_render import backend_cfg_name
+
+# the stats socket of the haproxy.cfg generated by pfsense
+HAPROXY_RUNTIME_SOCKET = '/tmp/haproxy.socket'
+
+# server status -> runtime server state, for the servers haproxy is running with
+HAPROXY_RUNTIME_SERVER_STATES = dict(
+    active='ready',
+    disabled='maint',
+    inactive='maint',
+)
+
+
+# svname of the rows of show stat which are not servers
+STAT_PROXY_ROWS = frozenset(['FRONTEND', 'BACKEND'])
+
+
+def iter_stat(lines, keep=None, fields=None):
+    """ yield the rows of a show stat CSV output as field -> value dicts
+
+    lines can be any iterable, like the lines read from the stats socket as they arrive: rows are parsed one at a time.
+    Only the rows for which keep(pxname, svname) is True are parsed into fields and, when fields is given,
+    only these fields are returned along with pxname and svname.
+    """
+    lines = iter(lines)
+    header = next(lines, '').rstrip('\r\n')
+    if not header.startswith('#'):
+        raise HaproxyRuntimeError('unexpected show stat output: {0}'.format(header.strip()))
+
+    names = header.lstrip('# ').split(',')
+    if fields is None:
+        columns = [(idx, name) for idx, name in enumerate(names) if name]
+    else:
+        wanted = ['pxname', 'svname'] + [field for field in fields if field not in ['pxname', 'svname']]
+        columns = [(names.index(name), name) for name in wanted if name in names]
+
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if not line:
+            continue
+        if keep is not None:
+            head = line.split(',', 2)
+            if len(head) < 2 or not keep(head[0], head[1]):
+                continue
+        values = next(csv.reader([line]))
+        yield dict((name, values[idx]) for idx, name in columns if idx < len(values))
+
+
+def iter_info(lines):
+    """ yield the (name, value) pairs of a show info output """
+    for line in lines:
+        (name, sep, value) = line.partition(':')
+        if sep:
+            yield (name.strip(), value.strip())
+
+
+class HaproxyRuntimeError(Exception):
+    """ error returned by the HAProxy runtime API, or raised while talking to it """
+
+
+class HaproxyRuntime(object):
+    """ client of the HAProxy runtime API, on the stats socket
+
+    The socket is used in non-interactive mode: one connection per command, closed by HAProxy once it has answered.
+    """
+
+    def __init__(self, path=HAPROXY_RUNTIME_SOCKET, timeout=10.0):
+        self.path = path
+        self.timeout = timeout
+
+    def _recv(self, command):
+        """ run command and yield its output, in chunks of bytes as they are received """
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+            sock.sendall((command + '\n').encode('utf-8'))
+            while True:
+                data = sock.recv(65536)
+                if not data:
+                    break
+                yield data
+        except (socket.error, OSError) as exc:
+            raise HaproxyRuntimeError("unable to run '{0}' on {1}: {2}".format(command, self.path, exc))
+        finally:
+            sock.close()
+
+    def execute(self, command):
+        """ run command and return its output """
+        return b''.join(self._recv(command)).decode('utf-8', 'replace')
+
+    def execute_lines(self, command):
+        """ run command and yield the lines of its output as they are received, without holding the whole output """
+        decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        pending = ''
+        for data in self._recv(command):
+            lines = (pending + decoder.decode(data)).split('\n')
+            pending = lines.pop()
+            for line in lines:
+                yield line
+        pending += decoder.decode(b'', final=True)
+        if pending:
+            yield pending
+
+    def set_server(self, backend, server, field, value):
+        """ set the weight or state of the server of the pfsense backend, the command is returned """
+        command = 'set server {0}/{1} {2} {3}'.format(backend_cfg_name(backend), server, field, value)
+        output = self.execute(command).strip()
+        # set server only answers when something went wrong
+        if output:
+            raise HaproxyRuntimeError("'{0}' failed: {1}".format(command, output))
+        return command
+
+    def update_map(self, verb, path, key, value=None):
+        """ add, set or del the key of the map file loaded from path, the command is returned """
+        command = '{0} map {1} {2}'.format(verb, path, key)
+        if value is not None:
+            command += ' ' + value
+        output = self.execute(command).strip()
+        # the map commands only answer when something went wrong
+        if output:
+            raise HaproxyRuntimeError("'{0}' failed: {1}".format(command, output))
+        return command
+
+    def server_sessions(self, backend):
+        """ return server name -> current sessions of the servers of the pfsense backend """
+        proxy = backend_cfg_name(backend)
+        rows = iter_stat(
+            self.execute_lines('show stat {0} 4 -1'.format(proxy)),
+            keep=lambda pxname, svname: pxname == proxy and svname not in STAT_PROXY_ROWS,
+            fields=['scur'],
+        )
+        return dict((row['svname'], int(row.get('scur') or 0)) for row in rows)
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey, nicholas@morey.tech
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_advanced import HAPROXY_TIME_RE, get_advanced_options, set_advanced_options
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_base import PFSenseHaproxyBase
+
+HAPROXY_SETTINGS_ARGUMENT_SPEC = dict(
+    maxconn=dict(required=False, type='int'),
+    nbthread=dict(required=False, type='int'),
+    hard_stop_after=dict(required=False, type='str'),
+    ssl_cache_size=dict(required=False, type='int'),
+    bufsize=dict(required=False, type='int'),
+    maxrewrite=dict(required=False, type='int'),
+    spread_checks=dict(required=False, type='int'),
+    reload=dict(default='immediate', choices=['immediate', 'deferred']),
+    render_only=dict(default=False, required=False, type='bool'),
+    profile=dict(default=False, required=False, type='bool'),
+)
+
+# param -> field of installedpackages/haproxy, set in the webgui global settings
+HAPROXY_SETTINGS_FIELDS = dict(
+    maxconn='maxconn',
+    nbthread='nbthread',
+    hard_stop_after='hard_stop_after',
+)
+
+# param -> global keyword, without a field in the webgui, written in the global advanced pass thru
+HAPROXY_SETTINGS_KEYWORDS = dict(
+    ssl_cache_size='tune.ssl.cachesize',
+    bufsize='tune.bufsize',
+    maxrewrite='tune.maxrewrite',
+    spread_checks='spread-checks',
+)
+
+
+class PFSenseHaproxySettingsModule(PFSenseHaproxyBase):
+    """ module managing the pfsense haproxy global settings """
+
+    @staticmethod
+    def get_argument_spec():
+        """ return argument spec """
+        return HAPROXY_SETTINGS_ARGUMENT_SPEC
+
+    ##############################
+    # init
+    #
+    def __init__(self, module, pfsense=None):
+        super(PFSenseHaproxySettingsModule, self).__init__(module, pfsense)
+        self.name = "pfsense_haproxy_settings"
+        self.before_settings = None
+
+    ##############################
+    # params processing
+    #
+    def _params_to_obj(self):
+        """ return the fields of the haproxy element to change from module params, the other fields are left as they are """
+        obj = dict()
+        for param, field in HAPROXY_SETTINGS_FIELDS.items():
+            self._get_ansible_param(obj, param, fname=field)
+
+        keywords = dict((keyword, self.params[param]) for param, keyword in HAPROXY_SETTINGS_KEYWORDS.items())
+        advanced = set_advanced_options(self.root_elt.findtext('advanced'), keywords)
+        if advanced is not None:
+            obj['advanced'] = advanced
+
+        return obj
+
+    def _validate_params(self):
+        """ do some extra checks on input parameters """
+        self.root_elt = self.haproxy
+        if self.root_elt is None:
+            self.module.fail_json(msg='Unable to find haproxy XML configuration entry. Are you sure haproxy is installed ?')
+
+        for param in ['maxconn', 'nbthread', 'ssl_cache_size', 'bufsize', 'maxrewrite']:
+            if self.params[param] is not None and self.params[param] < (0 if param == 'ssl_cache_size' else 1):
+                self.module.fail_json(msg="{0} must be {1}".format(param, 'positive or 0' if param == 'ssl_cache_size' else 'positive'))
+        if self.params['nbthread'] is not None and self.params['nbthread'] > 64:
+            self.module.fail_json(msg='nbthread must be between 1 and 64')
+        if self.params['spread_checks'] is not None and not 0 <= self.params['spread_checks'] <= 50:
+            self.module.fail_json(msg='spread_checks must be between 0 and 50')
+        if self.params['hard_stop_after'] is not None and not HAPROXY_TIME_RE.match(self.params['hard_stop_after']):
+            self.module.fail_json(msg="hard_stop_after must be a haproxy time, like 30s or 15m")
+
+        # haproxy lowers a rewrite reserve of more than half a buffer to half a buffer; by choice, such a value is refused
+        # rather than written to the config where it would not be the one in effect
+        settings = self._settings(self.root_elt)
+        bufsize = self.params['bufsize'] or int(settings.get('bufsize', 16384))
+        maxrewrite = self.params['maxrewrite'] or int(settings.get('maxrewrite', 0))
+        if maxrewrite > bufsize // 2:
+            self.module.fail_json(msg='maxrewrite must not be more than half of bufsize ({0}), haproxy would lower it to {1}'.format(bufsize, bufsize // 2))
+        self.before_settings = settings
+
+    ##############################
+    # XML processing
+    #
+    @staticmethod
+    def _settings(haproxy_elt):
+        """ return the settings set in haproxy_elt """
+        settings = dict()
+        for param, field in HAPROXY_SETTINGS_FIELDS.items():
+            value = haproxy_elt.findtext(field)
+            if value:
+                settings[param] = value.strip()
+        keywords = get_advanced_options(haproxy_elt.findtext('advanced'), HAPROXY_SETTINGS_KEYWORDS.values())
+        for param, keyword in HAPROXY_SETTINGS_KEYWORDS.items():
+            if keyword in keywords:
+                settings[param] = keywords[keyword]
+        return settings
+
+    def _find_target(self):
+        """ the settings are the fields of the haproxy element itself """
+        return self.root_elt
+
+    def _copy_and_update_target(self):
+        """ update the managed fields only, without walking the whole haproxy configuration """
+        before = dict((field, self.target_elt.findtext(field)) for field in self.obj)
+        changed = self.pfsense.copy_dict_to_element(self.obj, self.target_elt)
+        return (before, changed)
+
+    ##############################
+    # run
+    #
+    def run(self, params):
+        """ update the global settings, which always exist """
+        super(PFSenseHaproxySettingsModule, self).run(dict(params, state='present'))
+        settings = self._settings(self.root_elt)
+        self.result['settings'] = dict((param, int(value) if value.isdigit() else value) for param, value in settings.items())
+
+    ##############################
+    # Logging
+    #
+    def _log_fields(self, before=None):
+        """ generate pseudo-CLI command fields parameters to update the settings """
+        values = ''
+        after = self._settings(self.target_elt)
+        for param in ['maxconn', 'nbthread', 'hard_stop_after', 'ssl_cache_size', 'bufsize', 'maxrewrite', 'spread_checks']:
+            values += self.format_updated_cli_field(after, self.before_settings, param, add_comma=(values))
+        return values
+
+    def _get_obj_name(self):
+        """ return obj's name """
+        return "'global'"
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey, nicholas@morey.tech
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+import re
+from fnmatch import fnmatchcase
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_profile import (
+    HaproxyProfiler,
+    get_haproxy_profiler,
+    haproxy_phase,
+    haproxy_profiling,
+    load_haproxy_pfsense,
+)
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_render import backend_cfg_name
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_runtime import (
+    HAPROXY_RUNTIME_SOCKET,
+    STAT_PROXY_ROWS,
+    HaproxyRuntime,
+    HaproxyRuntimeError,
+    iter_info,
+    iter_stat,
+)
+
+HAPROXY_STATS_SUBSETS = ['frontends', 'backends', 'servers', 'info']
+
+# the session, queue, latency and error counters returned by default
+HAPROXY_STATS_FIELDS = [
+    'status', 'weight', 'scur', 'smax', 'slim', 'qcur', 'qmax', 'stot', 'rate', 'qtime', 'ctime', 'rtime', 'ttime',
+    'ereq', 'econ', 'eresp', 'wretr', 'wredis', 'hrsp_4xx', 'hrsp_5xx', 'chkfail', 'lastchg',
+]
+
+HAPROXY_STATS_INFO_FIELDS = [
+    'Version', 'Uptime_sec', 'Nbthread', 'Maxconn', 'CurrConns', 'CumConns', 'ConnRate', 'SessRate', 'Run_queue', 'Idle_pct',
+]
+
+HAPROXY_STATS_ARGUMENT_SPEC = dict(
+    gather=dict(required=False, type='list', elements='str', choices=HAPROXY_STATS_SUBSETS, default=['backends', 'servers']),
+    backends=dict(required=False, type='list', elements='str'),
+    servers=dict(required=False, type='list', elements='str'),
+    frontends=dict(required=False, type='list', elements='str'),
+    fields=dict(required=False, type='list', elements='str', default=HAPROXY_STATS_FIELDS),
+    info_fields=dict(required=False, type='list', elements='str', default=HAPROXY_STATS_INFO_FIELDS),
+    source=dict(required=False, type='str', choices=['socket', 'phpshell'], default='socket'),
+    runtime_socket=dict(required=False, type='path', default=HAPROXY_RUNTIME_SOCKET),
+    profile=dict(default=False, required=False, type='bool'),
+)
+
+# show stat type mask bits
+HAPROXY_STATS_TYPES = dict(frontends=1, backends=2, servers=4)
+
+# run runtime API commands through the socket helpers of the haproxy package, each output follows a marker line
+HAPROXY_STATS_CMD = '''require_once("haproxy/haproxy_socketinfo.inc");
+foreach ({commands} as $command) {{
+echo "@@@ " . $command . "\\n";
+foreach (haproxy_socket_command($command) as $line) echo rtrim($line, "\\r\\n") . "\\n";
+}}'''
+
+# the suffix pfsense adds to the backend names in haproxy.cfg
+PROXY_SUFFIX_RE = re.compile(r'_ipv(?:ANY|4|6)$')
+
+INT_RE = re.compile(r'^-?\d+$')
+
+
+def _value(value):
+    """ return value as an int if it is one """
+    if INT_RE.match(value):
+        return int(value)
+    return value
+
+
+def _literal(patterns):
+    """ return the only name of patterns if it is not a glob, None otherwise """
+    if patterns and len(patterns) == 1 and not any(c in patterns[0] for c in '*?['):
+        return patterns[0]
+    return None
+
+
+class PFSenseHaproxyStatsModule(object):
+    """ module reporting the runtime statistics of haproxy """
+
+    @staticmethod
+    def get_argument_spec():
+        """ return argument spec """
+        return HAPROXY_STATS_ARGUMENT_SPEC
+
+    ##############################
+    # init
+    #
+    def __init__(self, module, pfsense=None):
+        self.module = module
+        self.result = dict(changed=False)
+        self.gather = None
+
+        # config.xml is only needed to run php, the stats socket can be read directly
+        if module.params['source'] == 'phpshell':
+            self.pfsense = load_haproxy_pfsense(module, pfsense)
+            self.profiler = get_haproxy_profiler(self.pfsense)
+        else:
+            self.pfsense = None
+            self.profiler = HaproxyProfiler() if haproxy_profiling(module.params) else None
+
+        if self.profiler is not None:
+            self.result['timings'] = self.profiler.report()
+
+    def _phase(self, phase):
+        """ return a context manager timing phase when profiling """
+        if self.pfsense is not None or self.profiler is None:
+            return haproxy_phase(self.pfsense, phase)
+        return self.profiler.phase(phase)
+
+    @staticmethod
+    def _match(name, patterns):
+        """ return True if name matches one of the patterns, or if there is no pattern """
+        if not patterns:
+            return True
+        return any(fnmatchcase(name or '', pattern) for pattern in patterns)
+
+    ##############################
+    # fetching
+    #
+    def _stat_command(self, params):
+        """ return the show stat command, asking haproxy only for the rows which have been gathered """
+        mask = sum(HAPROXY_STATS_TYPES[subset] for subset in self.gather if subset in HAPROXY_STATS_TYPES)
+        proxy = '-1'
+        backend = _literal(params['backends'])
+        if backend is not None and 'frontends' not in self.gather:
+            proxy = backend_cfg_name(backend)
+        return 'show stat {0} {1} -1'.format(proxy, mask)
+
+    def _fetch(self, commands, params):
+        """ yield the output lines of each command, as (command, lines) """
+        if self.pfsense is None:
+            runtime = HaproxyRuntime(params['runtime_socket'])
+            for command in commands:
+                yield (command, runtime.execute_lines(command))
+            return
+
+        php_commands = 'array(' + ', '.join('"{0}"'.format(command) for command in commands) + ')'
+        (rc, stdout, stderr) = self.pfsense.phpshell(HAPROXY_STATS_CMD.format(commands=php_commands))
+        outputs = dict((command, []) for command in commands)
+        lines = None
+        for line in stdout.splitlines():
+            if line.startswith('@@@ '):
+                lines = outputs.get(line[4:])
+            elif lines is not None:
+                lines.append(line)
+        for command in commands:
+            if not outputs[command]:
+                raise HaproxyRuntimeError("no output for '{0}': {1}".format(command, stderr.strip()))
+            yield (command, outputs[command])
+
+    ##############################
+    # parsing
+    #
+    def _keep(self, params):
+        """ return the row filter of show stat, checking only pxname and svname """
+        backends = params['backends']
+        servers = params['servers']
+        frontends = params['frontends']
+
+        def keep(pxname, svname):
+            if svname == 'FRONTEND':
+                return 'frontends' in self.gather and self._match(pxname, frontends)
+            if not self._match(PROXY_SUFFIX_RE.sub('', pxname), backends):
+                return False
+            if svname == 'BACKEND':
+                return 'backends' in self.gather
+            return 'servers' in self.gather and self._match(svname, servers)
+
+        return keep
+
+    def _add_stat(self, lines, params):
+        """ parse the show stat output into the frontends, backends and servers lists """
+        for row in iter_stat(lines, keep=self._keep(params), fields=params['fields']):
+            pxname = row.pop('pxname')
+            svname = row.pop('svname')
+            obj = dict((field, _value(value)) for field, value in row.items() if value != '')
+            if svname == 'FRONTEND':
+                obj['name'] = pxname
+                self.result['frontends'].append(obj)
+            elif svname == 'BACKEND':
+                obj['name'] = PROXY_SUFFIX_RE.sub('', pxname)
+                self.result['backends'].append(obj)
+            elif svname not in STAT_PROXY_ROWS:
+                obj['backend'] = PROXY_SUFFIX_RE.sub('', pxname)
+                obj['name'] = svname
+                self.result['servers'].append(obj)
+
+    def _add_info(self, lines, params):
+        """ parse the show info output into the info dict """
+        fields = set(params['info_fields'] or [])
+        for name, value in iter_info(lines):
+            if not fields or name in fields:
+                self.result['info'][name] = _value(value)
+
+    ##############################
+    # run
+    #
+    def run(self, params):
+        """ read the statistics once, parsing only what has been asked """
+        self.gather = set(params['gather'])
+        commands = []
+        if self.gather.intersection(HAPROXY_STATS_TYPES):
+            for subset in HAPROXY_STATS_TYPES:
+                if subset in self.gather:
+                    self.result[subset] = list()
+            commands.append(self._stat_command(params))
+        if 'info' in self.gather:
+            self.result['info'] = dict()
+            commands.append('show info')
+
+        try:
+            with self._phase('gather'):
+                for command, lines in self._fetch(commands, params):
+                    if command == 'show info':
+                        self._add_info(lines, params)
+                    else:
+                        self._add_stat(lines, params)
+        except HaproxyRuntimeError as exc:
+            self.module.fail_json(msg=str(exc))
+
+    def commit_changes(self):
+        """ exit module """
+        self.module.exit_json(**self.result)
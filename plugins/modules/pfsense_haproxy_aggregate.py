@@ -0,0 +1,207 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey <nicholas@morey.tech>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = """
+---
+module: pfsense_haproxy_aggregate
+version_added: 0.3.0
+author: Nicholas Morey (@morey-tech)
+short_description: Manage a whole pfSense HAProxy configuration in one task
+description:
+  - Manage pfSense HAProxy backends, backend servers, frontends, frontend servers, ACLs and actions in one task.
+  - The configuration is written and HAProxy is reloaded only once, whatever the number of objects.
+notes:
+  - Each item accepts the same options as the matching single object module.
+  - Objects are deleted from the leaves to the roots (actions first, backends last) and then created or updated
+    from the roots to the leaves (backends first, actions last).
+options:
+  aggregated_backends:
+    description: List of backends to apply, see M(pfsensible.haproxy.pfsense_haproxy_backend) for the item options.
+    required: false
+    type: list
+    elements: dict
+  aggregated_backend_servers:
+    description: List of backend servers to apply, see M(pfsensible.haproxy.pfsense_haproxy_backend_server) for the item options.
+    required: false
+    type: list
+    elements: dict
+  aggregated_frontends:
+    description: List of frontends to apply, see M(pfsensible.haproxy.pfsense_haproxy_frontend) for the item options.
+    required: false
+    type: list
+    elements: dict
+  aggregated_frontend_servers:
+    description: List of frontend servers to apply, see M(pfsensible.haproxy.pfsense_haproxy_frontend_server) for the item options.
+    required: false
+    type: list
+    elements: dict
+  aggregated_frontend_acls:
+    description: List of frontend ACLs to apply, see M(pfsensible.haproxy.pfsense_haproxy_frontend_acl) for the item options.
+    required: false
+    type: list
+    elements: dict
+  aggregated_frontend_actions:
+    description: List of frontend actions to apply, see M(pfsensible.haproxy.pfsense_haproxy_frontend_action) for the item options.
+    required: false
+    type: list
+    elements: dict
+  purge_backends:
+    description: Delete all the backends that are not defined in aggregated_backends.
+    required: false
+    default: false
+    type: bool
+  purge_backend_servers:
+    description: Delete all the backend servers that are not defined in aggregated_backend_servers.
+    required: false
+    default: false
+    type: bool
+  purge_frontends:
+    description: Delete all the frontends that are not defined in aggregated_frontends.
+    required: false
+    default: false
+    type: bool
+  purge_frontend_servers:
+    description: Delete all the frontend servers that are not defined in aggregated_frontend_servers.
+    required: false
+    default: false
+    type: bool
+  purge_frontend_acls:
+    description: Delete all the frontend ACLs that are not defined in aggregated_frontend_acls.
+    required: false
+    default: false
+    type: bool
+  purge_frontend_actions:
+    description: Delete all the frontend actions that are not defined in aggregated_frontend_actions.
+    required: false
+    default: false
+    type: bool
+  reload:
+    description:
+      - When to reload HAProxy after a change.
+      - C(immediate) checks and reloads HAProxy at the end of the task.
+      - C(deferred) only flags HAProxy as dirty, use M(pfsensible.haproxy.pfsense_haproxy_apply) to reload it once for all the deferred changes.
+    required: false
+    default: immediate
+    choices: [ "immediate", "deferred" ]
+    type: str
+  render_only:
+    description:
+      - Only render the resulting haproxy.cfg, without writing config.xml nor reloading HAProxy.
+      - The rendered configuration is returned in I(haproxy_cfg), and its changes in the task diff.
+    required: false
+    default: false
+    type: bool
+  profile:
+    description:
+      - Return in I(timings) the time spent in each phase of the task and the number of XML elements walked.
+      - Profiling can also be enabled by setting the C(PFSENSIBLE_HAPROXY_PROFILE) environment variable to C(1) on the target.
+    required: false
+    default: false
+    type: bool
+"""
+
+EXAMPLES = """
+- name: Apply a complete HAProxy topology
+  pfsensible.haproxy.pfsense_haproxy_aggregate:
+    aggregated_backends:
+      - { name: web, balance: roundrobin }
+    aggregated_backend_servers:
+      - { backend: web, name: web1, address: 10.0.0.11, port: 80 }
+      - { backend: web, name: web2, address: 10.0.0.12, port: 80 }
+    aggregated_frontends:
+      - { name: sni-frontend, type: https }
+    aggregated_frontend_servers:
+      - { frontend: sni-frontend, extaddr: wan_ipv4, extaddr_port: 443 }
+    aggregated_frontend_acls:
+      - { frontend: sni-frontend, name: is_web, expression: ssl_sni_matches, value: www.example.com }
+    aggregated_frontend_actions:
+      - { frontend: sni-frontend, action: use_backend, backend: web, acl: is_web }
+    purge_backend_servers: true
+"""
+
+RETURN = """
+result_backends:
+    description: the set of backend commands that would be pushed to the remote device (if pfSense had a CLI)
+    returned: always
+    type: list
+    sample: ["create haproxy_backend 'web', balance='roundrobin'", "delete haproxy_backend 'old'"]
+result_backend_servers:
+    description: the set of backend server commands that would be pushed to the remote device (if pfSense had a CLI)
+    returned: always
+    type: list
+    sample: ["create haproxy_backend_server 'web1' on 'web', status='active', address='10.0.0.11', port=80"]
+result_frontends:
+    description: the set of frontend commands that would be pushed to the remote device (if pfSense had a CLI)
+    returned: always
+    type: list
+    sample: ["create haproxy_frontend 'sni-frontend', type='https', max_connections=100"]
+result_frontend_servers:
+    description: the set of frontend server commands that would be pushed to the remote device (if pfSense had a CLI)
+    returned: always
+    type: list
+    sample: ["create haproxy_frontend_server 'wan_ipv4_443', extaddr='wan_ipv4', extaddr_port=443"]
+result_frontend_acls:
+    description: the set of frontend ACL commands that would be pushed to the remote device (if pfSense had a CLI)
+    returned: always
+    type: list
+    sample: ["create haproxy_frontend_acl 'is_web', name='is_web', expression='ssl_sni_matches', value='www.example.com'"]
+result_frontend_actions:
+    description: the set of frontend action commands that would be pushed to the remote device (if pfSense had a CLI)
+    returned: always
+    type: list
+    sample: ["create haproxy_frontend_action 'is_web' -> 'web', action='use_backend', backend='web', acl='is_web'"]
+reloaded:
+    description: True if HAProxy has been reloaded. The reload is skipped when the changes do not affect haproxy.cfg, like a change of description.
+    returned: always
+    type: bool
+    sample: true
+pending_reloads:
+    description: The number of reloads deferred since HAProxy was last reloaded, when I(reload=deferred).
+    returned: when changed with I(reload=deferred)
+    type: int
+    sample: 3
+haproxy_cfg:
+    description: The haproxy.cfg rendered offline from the resulting configuration, interface addresses are not resolved.
+    returned: when I(render_only=true)
+    type: str
+    sample: "global\n\tstats socket /tmp/haproxy.socket level admin expose-fd listeners\n..."
+timings:
+    description:
+      - The monotonic seconds spent in each phase (I(phases)), the number of runs of each phase (I(calls)) and the number of XML elements walked (I(visited)).
+      - The phases include load_config, validate, lookup, id_allocation, xml_update, fingerprint, write_config and phpshell.
+    returned: when profiling
+    type: dict
+    sample: {"phases": {"load_config": 0.412, "phpshell": 1.873}, "calls": {"load_config": 1, "phpshell": 1}, "visited": {"index": 5000}}
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_aggregate import (
+    PFSenseHaproxyAggregateModule,
+    HAPROXY_AGGREGATE_ARGUMENT_SPEC,
+    HAPROXY_AGGREGATE_REQUIRED_ONE_OF,
+)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=HAPROXY_AGGREGATE_ARGUMENT_SPEC,
+        required_one_of=HAPROXY_AGGREGATE_REQUIRED_ONE_OF,
+        supports_check_mode=True)
+
+    pfmodule = PFSenseHaproxyAggregateModule(module)
+    pfmodule.run()
+    pfmodule.commit_changes()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey <nicholas@morey.tech>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = """
+---
+module: pfsense_haproxy_apply
+version_added: 0.3.0
+author: Nicholas Morey (@morey-tech)
+short_description: Apply deferred pfSense HAProxy reloads
+description:
+  - Check and reload the pfSense HAProxy configuration once for all the changes made with I(reload=deferred).
+  - HAProxy is only reloaded when it has been flagged as dirty, either by a deferred reload or by the webgui.
+notes:
+  - Usually called from a handler notified by the tasks using I(reload=deferred).
+options:
+  force:
+    description: Reload HAProxy even if it has not been flagged as dirty.
+    required: false
+    default: false
+    type: bool
+  profile:
+    description:
+      - Return in I(timings) the time spent in each phase of the task and the number of XML elements walked.
+      - Profiling can also be enabled by setting the C(PFSENSIBLE_HAPROXY_PROFILE) environment variable to C(1) on the target.
+    required: false
+    default: false
+    type: bool
+"""
+
+EXAMPLES = """
+- name: Add backend servers without reloading HAProxy
+  pfsensible.haproxy.pfsense_haproxy_backend_server:
+    backend: exchange
+    name: "{{ item }}"
+    address: "{{ item }}"
+    port: 443
+    reload: deferred
+  loop: "{{ exchange_servers }}"
+  notify: Apply HAProxy changes
+
+# handlers
+- name: Apply HAProxy changes
+  pfsensible.haproxy.pfsense_haproxy_apply:
+"""
+
+RETURN = """
+coalesced:
+    description: The number of deferred reloads applied by this single reload.
+    returned: always
+    type: int
+    sample: 10
+reloaded:
+    description: True if HAProxy has been reloaded.
+    returned: always
+    type: bool
+    sample: true
+timings:
+    description:
+      - The monotonic seconds spent in each phase (I(phases)), the number of runs of each phase (I(calls)) and the number of XML elements walked (I(visited)).
+      - The phases include load_config, validate, lookup, id_allocation, xml_update, fingerprint, write_config and phpshell.
+    returned: when profiling
+    type: dict
+    sample: {"phases": {"load_config": 0.412, "phpshell": 1.873}, "calls": {"load_config": 1, "phpshell": 1}, "visited": {"index": 5000}}
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_apply import (
+    PFSenseHaproxyApplyModule,
+    HAPROXY_APPLY_ARGUMENT_SPEC,
+)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=HAPROXY_APPLY_ARGUMENT_SPEC,
+        supports_check_mode=True)
+
+    pfmodule = PFSenseHaproxyApplyModule(module)
+    pfmodule.run(module.params)
+    pfmodule.commit_changes()
+
+
+if __name__ == '__main__':
+    main()
@@ -20,6 +20,8 @@ short_description: Manage pfSense HAProxy backends
 description:
   - Manage pfSense HAProxy backends
 notes:
+  - I(hash_type), I(http_reuse), I(pool_max_conn) and I(pool_purge_delay) have no field in the webgui, their lines are managed in the backend pass thru.
+    They are left as they are when not given, the other lines of the pass thru are kept.
 options:
   name:
     description: The backend name.
@@ -28,10 +30,12 @@ options:
   balance:
     description:
       - The load balancing option.
-      - Note that C(uri) option is only meaningful when used with HTTP/HTTPS frontends.
+      - Note that C(uri), C(hdr) and C(url_param) options are only meaningful when used with HTTP/HTTPS frontends.
+      - C(hdr) hashes the header named I(balance_hdr), C(url_param) the URL parameter named I(balance_url_param).
+      - C(random) picks the least loaded of I(balance_random_draws) random servers, C(first) fills the servers one after the other.
     required: false
     type: str
-    choices: ['none', 'roundrobin', 'static-rr', 'leastconn', 'source', 'uri']
+    choices: ['none', 'roundrobin', 'static-rr', 'leastconn', 'source', 'uri', 'hdr', 'url_param', 'random', 'first']
     default: 'none'
   balance_urilen:
     description: Indicates that the algorithm should only consider that many characters at the beginning of the URI to compute the hash.
@@ -45,6 +49,25 @@ options:
     description: Allow using whole URI including url parameters behind a question mark.
     required: false
     type: bool
+  balance_hdr:
+    description: The name of the HTTP header to hash, required when I(balance=hdr).
+    required: false
+    type: str
+  balance_url_param:
+    description: The name of the URL parameter to hash, required when I(balance=url_param).
+    required: false
+    type: str
+  balance_random_draws:
+    description: The number of servers drawn when I(balance=random), HAProxy defaults to 2.
+    required: false
+    type: int
+  hash_type:
+    description:
+      - How the hash of the request key is mapped to the servers (C(hash-type)), when I(balance) is C(source), C(uri), C(hdr) or C(url_param).
+      - With C(consistent), most keys keep going to the same server when a server is added or removed, HAProxy defaults to C(map-based).
+    required: false
+    type: str
+    choices: ['map-based', 'consistent']
   connection_timeout:
     description: The time (in milliseconds) we give up if the connection does not complete within (default 30000).
     required: false
@@ -97,11 +120,49 @@ options:
     description: Domain used in checks (SMTP and ESMTP)
     required: false
     type: str
+  http_reuse:
+    description:
+      - When idle connections to the servers can be reused by other requests (C(http-reuse)), HAProxy defaults to C(safe).
+      - Only relevant when used with HTTP/HTTPS frontends.
+    required: false
+    type: str
+    choices: ['never', 'safe', 'aggressive', 'always']
+  pool_max_conn:
+    description: The maximum number of idle connections kept open to each server (C(pool-max-conn)), C(-1) for unlimited.
+    required: false
+    type: int
+  pool_purge_delay:
+    description: How often the idle connections to the servers are closed (C(pool-purge-delay)), like C(5s).
+    required: false
+    type: str
   state:
     description: State in which to leave the backend
     choices: [ "present", "absent" ]
     default: present
     type: str
+  reload:
+    description:
+      - When to reload HAProxy after a change.
+      - C(immediate) checks and reloads HAProxy at the end of the task.
+      - C(deferred) only flags HAProxy as dirty, use M(pfsensible.haproxy.pfsense_haproxy_apply) to reload it once for all the deferred changes.
+    required: false
+    default: immediate
+    choices: [ "immediate", "deferred" ]
+    type: str
+  render_only:
+    description:
+      - Only render the resulting haproxy.cfg, without writing config.xml nor reloading HAProxy.
+      - The rendered configuration is returned in I(haproxy_cfg), and its changes in the task diff.
+    required: false
+    default: false
+    type: bool
+  profile:
+    description:
+      - Return in I(timings) the time spent in each phase of the task and the number of XML elements walked.
+      - Profiling can also be enabled by setting the C(PFSENSIBLE_HAPROXY_PROFILE) environment variable to C(1) on the target.
+    required: false
+    default: false
+    type: bool
 """
 
 EXAMPLES = """
@@ -114,6 +175,25 @@ EXAMPLES = """
     monitor_uri: /health
     state: present
 
+- name: Send the requests for the same cache key to the same server
+  pfsensible.haproxy.pfsense_haproxy_backend:
+    name: cache-backend
+    balance: hdr
+    balance_hdr: X-Cache-Key
+    hash_type: consistent
+    state: present
+
+- name: Keep connections to the servers open and share them between requests
+  pfsensible.haproxy.pfsense_haproxy_backend:
+    name: app-backend
+    balance: leastconn
+    check_type: HTTP
+    monitor_uri: /health
+    http_reuse: safe
+    pool_max_conn: 100
+    pool_purge_delay: 10s
+    state: present
+
 - name: Add TCP backend for MySQL with basic health checks
   pfsensible.haproxy.pfsense_haproxy_backend:
     name: mysql-backend
@@ -142,6 +222,28 @@ commands:
     returned: always
     type: list
     sample: ["create haproxy_backend 'exchange', balance='leastconn', httpcheck_method='OPTIONS'", "delete haproxy_backend 'exchange'"]
+reloaded:
+    description: True if HAProxy has been reloaded. The reload is skipped when the changes do not affect haproxy.cfg, like a change of description.
+    returned: always
+    type: bool
+    sample: true
+pending_reloads:
+    description: The number of reloads deferred since HAProxy was last reloaded, when I(reload=deferred).
+    returned: when changed with I(reload=deferred)
+    type: int
+    sample: 3
+haproxy_cfg:
+    description: The haproxy.cfg rendered offline from the resulting configuration, interface addresses are not resolved.
+    returned: when I(render_only=true)
+    type: str
+    sample: "global\n\tstats socket /tmp/haproxy.socket level admin expose-fd listeners\n..."
+timings:
+    description:
+      - The monotonic seconds spent in each phase (I(phases)), the number of runs of each phase (I(calls)) and the number of XML elements walked (I(visited)).
+      - The phases include load_config, validate, lookup, id_allocation, xml_update, fingerprint, write_config and phpshell.
+    returned: when profiling
+    type: dict
+    sample: {"phases": {"load_config": 0.412, "phpshell": 1.873}, "calls": {"load_config": 1, "phpshell": 1}, "visited": {"index": 5000}}
 """
 
 from ansible.module_utils.basic import AnsibleModule
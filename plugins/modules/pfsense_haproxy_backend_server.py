@@ -20,14 +20,16 @@ short_description: Manage pfSense haproxy backend servers
 description:
   - Manage pfSense haproxy servers
 notes:
+  - I(maxqueue), I(slowstart), I(inter), I(fastinter), I(downinter), I(rise), I(fall) and I(http2) have no field in the webgui,
+    they are written in the per server pass thru after I(advanced).
 options:
   backend:
     description: The backend name.
     required: true
     type: str
   name:
-    description: The server name.
-    required: true
+    description: The server name. Required unless I(servers) is set.
+    required: false
     type: str
   mode:
     description: How to use the server.
@@ -89,6 +91,40 @@ options:
     description: Tuning, If the number of incoming concurrent requests goes higher than this value, they will be queued
     required: false
     type: int
+  maxqueue:
+    description: Tuning, The maximum number of requests queued for the server, the other ones are sent to another server. C(0) for unlimited.
+    required: false
+    type: int
+  slowstart:
+    description: Tuning, The time over which the weight of the server grows back to its full value when it comes back up, like C(30s).
+    required: false
+    type: str
+  inter:
+    description: Health check, The interval between two checks of the server, like C(2s). Defaults to the check frequency of the backend.
+    required: false
+    type: str
+  fastinter:
+    description: Health check, The interval between two checks while the server is going up or down. Defaults to I(inter).
+    required: false
+    type: str
+  downinter:
+    description: Health check, The interval between two checks while the server is down. Defaults to I(inter).
+    required: false
+    type: str
+  rise:
+    description: Health check, The number of consecutive successful checks to consider the server up (HAProxy defaults to 2).
+    required: false
+    type: int
+  fall:
+    description: Health check, The number of consecutive failed checks to consider the server down (HAProxy defaults to 3).
+    required: false
+    type: int
+  http2:
+    description:
+      - Speak HTTP/2 to the server. It is negotiated with C(alpn h2) when I(ssl) is set, and used directly with C(proto h2) otherwise.
+      - The server must support HTTP/2, and the backend be used by C(http) type frontends.
+    required: false
+    type: bool
   advanced:
     description: Allows for adding custom HAProxy settings to the server. These are passed as written, use escaping where needed.
     required: false
@@ -97,11 +133,76 @@ options:
     description: If set, configures this server item as a template to provision servers from dns/srv responses.
     required: false
     type: str
+  servers:
+    description:
+      - Manage several servers of the backend in one task, each item accepts the options of a single server (I(name), I(mode),
+        I(address), I(port) and so on) and I(state).
+      - When set, the server options outside of the items are ignored.
+    required: false
+    type: list
+    elements: dict
+  exclusive:
+    description: With I(servers), delete the servers of the backend which are not listed.
+    required: false
+    default: false
+    type: bool
+  apply_via:
+    description:
+      - How to apply the changes to the running HAProxy, config.xml is always updated.
+      - C(reload) reloads HAProxy.
+      - C(runtime) pushes the weight and mode changes through the HAProxy runtime API (stats socket), without reloading HAProxy.
+        HAProxy is reloaded when any other change is made, including the creation or deletion of a server, changes from or to
+        the C(backup) mode or from the C(inactive) mode, or when the runtime API fails.
+    required: false
+    default: reload
+    choices: [ "reload", "runtime" ]
+    type: str
+  runtime_socket:
+    description: Path of the HAProxy stats socket used with I(apply_via=runtime) or I(drain).
+    required: false
+    default: /tmp/haproxy.socket
+    type: path
+  drain:
+    description:
+      - When deleting servers, put them in drain through the HAProxy runtime API (stats socket), and wait until they have no session left
+        or until I(drain_timeout) before reloading HAProxy.
+      - The servers are drained together, and deleted with a single reload.
+    required: false
+    default: false
+    type: bool
+  drain_timeout:
+    description: The maximum time to wait for the sessions of the drained servers to end, in seconds.
+    required: false
+    default: 60
+    type: int
   state:
     description: State in which to leave the backend server
     choices: [ "present", "absent" ]
     default: present
     type: str
+  reload:
+    description:
+      - When to reload HAProxy after a change.
+      - C(immediate) checks and reloads HAProxy at the end of the task.
+      - C(deferred) only flags HAProxy as dirty, use M(pfsensible.haproxy.pfsense_haproxy_apply) to reload it once for all the deferred changes.
+    required: false
+    default: immediate
+    choices: [ "immediate", "deferred" ]
+    type: str
+  render_only:
+    description:
+      - Only render the resulting haproxy.cfg, without writing config.xml nor reloading HAProxy.
+      - The rendered configuration is returned in I(haproxy_cfg), and its changes in the task diff.
+    required: false
+    default: false
+    type: bool
+  profile:
+    description:
+      - Return in I(timings) the time spent in each phase of the task and the number of XML elements walked.
+      - Profiling can also be enabled by setting the C(PFSENSIBLE_HAPROXY_PROFILE) environment variable to C(1) on the target.
+    required: false
+    default: false
+    type: bool
 """
 
 EXAMPLES = """
@@ -113,11 +214,58 @@ EXAMPLES = """
     port: 443
     state: present
 
+- name: Replace all the servers of a backend
+  pfsense_haproxy_backend_server:
+    backend: exchange
+    servers:
+      - { name: exchange1, address: 10.0.1.1, port: 443 }
+      - { name: exchange2, address: 10.0.1.2, port: 443 }
+    exclusive: true
+
+- name: Lower the weight of a backend server without reloading HAProxy
+  pfsense_haproxy_backend_server:
+    backend: exchange
+    name: exchange.acme.org
+    address: exchange.acme.org
+    port: 443
+    weight: 10
+    apply_via: runtime
+
+- name: Bring a recovered server back progressively and check it less often while it is down
+  pfsense_haproxy_backend_server:
+    backend: exchange
+    name: exchange.acme.org
+    address: exchange.acme.org
+    port: 443
+    maxqueue: 100
+    slowstart: 60s
+    inter: 2s
+    downinter: 10s
+    rise: 3
+    fall: 2
+
+- name: Multiplex the requests to an HTTPS server over HTTP/2
+  pfsense_haproxy_backend_server:
+    backend: exchange
+    name: exchange.acme.org
+    address: exchange.acme.org
+    port: 443
+    ssl: true
+    http2: true
+
 - name: Remove backend server
   pfsense_haproxy_backend_server:
     backend: exchange
     name: exchange.acme.org
     state: absent
+
+- name: Remove backend server once its sessions have ended
+  pfsense_haproxy_backend_server:
+    backend: exchange
+    name: exchange.acme.org
+    state: absent
+    drain: true
+    drain_timeout: 300
 """
 
 RETURN = """
@@ -129,6 +277,53 @@ commands:
         "create haproxy_backend_server 'exchange.acme.org' on 'exchange', status='active', address='exchange.acme.org', port=443",
         "delete haproxy_backend_server 'exchange.acme.org' on 'exchange'"
     ]
+reloaded:
+    description: True if HAProxy has been reloaded. The reload is skipped when the changes do not affect haproxy.cfg, like a change of description.
+    returned: always
+    type: bool
+    sample: true
+runtime_commands:
+    description: The runtime API commands pushed to HAProxy, when I(apply_via=runtime).
+    returned: when the changes have been pushed through the runtime API
+    type: list
+    sample: ["set server exchange_ipvANY/exchange.acme.org weight 10"]
+runtime_error:
+    description: Why the runtime API could not apply the changes, HAProxy has been reloaded instead.
+    returned: when the runtime API failed
+    type: str
+    sample: "'set server exchange_ipvANY/exchange.acme.org weight 10' failed: No such server."
+drained:
+    description: True if the drained servers had no session left before HAProxy was reloaded, False on timeout or runtime API error.
+    returned: when servers have been drained
+    type: bool
+    sample: true
+drain_time:
+    description: The time spent waiting for the drained servers, in seconds.
+    returned: when servers have been drained
+    type: float
+    sample: 12.518
+drain_error:
+    description: Why the servers could not be drained, they have been deleted anyway.
+    returned: when the runtime API failed while draining
+    type: str
+    sample: "'set server exchange_ipvANY/exchange.acme.org state drain' failed: No such server."
+pending_reloads:
+    description: The number of reloads deferred since HAProxy was last reloaded, when I(reload=deferred).
+    returned: when changed with I(reload=deferred)
+    type: int
+    sample: 3
+haproxy_cfg:
+    description: The haproxy.cfg rendered offline from the resulting configuration, interface addresses are not resolved.
+    returned: when I(render_only=true)
+    type: str
+    sample: "global\n\tstats socket /tmp/haproxy.socket level admin expose-fd listeners\n..."
+timings:
+    description:
+      - The monotonic seconds spent in each phase (I(phases)), the number of runs of each phase (I(calls)) and the number of XML elements walked (I(visited)).
+      - The phases include load_config, validate, lookup, id_allocation, xml_update, fingerprint, write_config and phpshell.
+    returned: when profiling
+    type: dict
+    sample: {"phases": {"load_config": 0.412, "phpshell": 1.873}, "calls": {"load_config": 1, "phpshell": 1}, "visited": {"index": 5000}}
 """
 
 from ansible.module_utils.basic import AnsibleModule
@@ -136,6 +331,7 @@ from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_backend
     PFSenseHaproxyBackendServerModule,
     HAPROXY_BACKEND_SERVER_ARGUMENT_SPEC,
     HAPROXY_BACKEND_SERVER_MUTUALLY_EXCLUSIVE,
+    HAPROXY_BACKEND_SERVER_REQUIRED_ONE_OF,
 )
 
 
@@ -143,6 +339,7 @@ def main():
     module = AnsibleModule(
         argument_spec=HAPROXY_BACKEND_SERVER_ARGUMENT_SPEC,
         mutually_exclusive=HAPROXY_BACKEND_SERVER_MUTUALLY_EXCLUSIVE,
+        required_one_of=HAPROXY_BACKEND_SERVER_REQUIRED_ONE_OF,
         supports_check_mode=True)
 
     pfmodule = PFSenseHaproxyBackendServerModule(module)
@@ -56,9 +56,12 @@ options:
     required: false
     type: str
   ssloffloadcert:
-    description: SSL certificate for offloading.
+    description:
+      - SSL certificate for offloading.
+      - A list of certificates can be given, the first one is the default certificate and the others are the additional
+        certificates of the frontend, selected by the SNI of the clients. The additional certificates are then set to the list.
     required: false
-    type: str
+    type: raw
   ssloffloadcert_type_search:
     description: Field type to search for SSL certificate.
     required: false
@@ -68,6 +71,24 @@ options:
     description: SSL ACL alternative names.
     required: false
     type: str
+  alpn:
+    description:
+      - Protocols advertised by ALPN to the clients of the SSL offloading, in order of preference.
+      - Only valid for C(http) type frontends.
+      - Requires C(ssloffloadcert), or a frontend which already offloads SSL.
+      - Set in the certificate options of the frontend, an empty list removes them.
+    required: false
+    type: list
+    elements: str
+    choices: [ "h2", "http/1.1", "http/1.0" ]
+  ocsp_stapling:
+    description:
+      - Staple the OCSP responses of the offloading certificates to the handshakes, HAProxy fetching and refreshing them (C(ocsp-update on)).
+      - Only valid for C(http) type frontends. Requires HAProxy 2.8 or later, and certificates with an OCSP responder.
+      - Requires C(ssloffloadcert), or a frontend which already offloads SSL.
+      - Set in the certificate options of the frontend, C(false) removes it.
+    required: false
+    type: bool
   max_connections:
     description: Maximum number of connections.
     required: false
@@ -84,6 +105,29 @@ options:
     choices: [ "present", "absent" ]
     default: present
     type: str
+  reload:
+    description:
+      - When to reload HAProxy after a change.
+      - C(immediate) checks and reloads HAProxy at the end of the task.
+      - C(deferred) only flags HAProxy as dirty, use M(pfsensible.haproxy.pfsense_haproxy_apply) to reload it once for all the deferred changes.
+    required: false
+    default: immediate
+    choices: [ "immediate", "deferred" ]
+    type: str
+  render_only:
+    description:
+      - Only render the resulting haproxy.cfg, without writing config.xml nor reloading HAProxy.
+      - The rendered configuration is returned in I(haproxy_cfg), and its changes in the task diff.
+    required: false
+    default: false
+    type: bool
+  profile:
+    description:
+      - Return in I(timings) the time spent in each phase of the task and the number of XML elements walked.
+      - Profiling can also be enabled by setting the C(PFSENSIBLE_HAPROXY_PROFILE) environment variable to C(1) on the target.
+    required: false
+    default: false
+    type: bool
 """
 
 EXAMPLES = """
@@ -95,6 +139,21 @@ EXAMPLES = """
     type: http
     httpclose: http-keep-alive
     ssloffloadcert: my-certificate
+    alpn:
+      - h2
+      - http/1.1
+    backend_serverpool: web-backend
+    state: present
+
+- name: Serve the certificates of several sites on one frontend, with OCSP stapling
+  pfsensible.haproxy.pfsense_haproxy_frontend:
+    name: tenants-frontend
+    type: http
+    ssloffloadcert:
+      - www.acme.org
+      - shop.acme.org
+      - api.acme.org
+    ocsp_stapling: true
     backend_serverpool: web-backend
     state: present
 
@@ -138,6 +197,28 @@ commands:
     returned: always
     type: list
     sample: ["create haproxy_frontend 'web-frontend', desc='Web frontend', type='https'", "delete haproxy_frontend 'web-frontend'"]
+reloaded:
+    description: True if HAProxy has been reloaded. The reload is skipped when the changes do not affect haproxy.cfg, like a change of description.
+    returned: always
+    type: bool
+    sample: true
+pending_reloads:
+    description: The number of reloads deferred since HAProxy was last reloaded, when I(reload=deferred).
+    returned: when changed with I(reload=deferred)
+    type: int
+    sample: 3
+haproxy_cfg:
+    description: The haproxy.cfg rendered offline from the resulting configuration, interface addresses are not resolved.
+    returned: when I(render_only=true)
+    type: str
+    sample: "global\n\tstats socket /tmp/haproxy.socket level admin expose-fd listeners\n..."
+timings:
+    description:
+      - The monotonic seconds spent in each phase (I(phases)), the number of runs of each phase (I(calls)) and the number of XML elements walked (I(visited)).
+      - The phases include load_config, validate, lookup, id_allocation, xml_update, fingerprint, write_config and phpshell.
+    returned: when profiling
+    type: dict
+    sample: {"phases": {"load_config": 0.412, "phpshell": 1.873}, "calls": {"load_config": 1, "phpshell": 1}, "visited": {"index": 5000}}
 """
 
 from ansible.module_utils.basic import AnsibleModule
@@ -51,9 +51,13 @@ options:
       - ssl_sni_ends_with
       - ssl_sni_regex
   value:
-    description: The value to match against (hostname, pattern, or regex).
+    description:
+      - The value to match against (hostname, pattern, or regex), or a list of values.
+      - The values are written as the patterns of a single ACL, which matches when any of them matches. Exact matches of many
+        values are looked up in a tree by HAProxy, instead of evaluating one ACL per value.
+      - Giving the same values in another order does not change the ACL.
     required: true
-    type: str
+    type: raw
   casesensitive:
     description: Enable case-sensitive matching.
     required: false
@@ -69,6 +73,29 @@ options:
     choices: [ "present", "absent" ]
     default: present
     type: str
+  reload:
+    description:
+      - When to reload HAProxy after a change.
+      - C(immediate) checks and reloads HAProxy at the end of the task.
+      - C(deferred) only flags HAProxy as dirty, use M(pfsensible.haproxy.pfsense_haproxy_apply) to reload it once for all the deferred changes.
+    required: false
+    default: immediate
+    choices: [ "immediate", "deferred" ]
+    type: str
+  render_only:
+    description:
+      - Only render the resulting haproxy.cfg, without writing config.xml nor reloading HAProxy.
+      - The rendered configuration is returned in I(haproxy_cfg), and its changes in the task diff.
+    required: false
+    default: false
+    type: bool
+  profile:
+    description:
+      - Return in I(timings) the time spent in each phase of the task and the number of XML elements walked.
+      - Profiling can also be enabled by setting the C(PFSENSIBLE_HAPROXY_PROFILE) environment variable to C(1) on the target.
+    required: false
+    default: false
+    type: bool
 """
 
 EXAMPLES = """
@@ -80,6 +107,17 @@ EXAMPLES = """
     value: api.example.com
     state: present
 
+- name: Add ACL matching several SNIs
+  pfsensible.haproxy.pfsense_haproxy_frontend_acl:
+    frontend: sni-frontend
+    name: is_tenant
+    expression: ssl_sni_matches
+    value:
+      - tenant1.example.com
+      - tenant2.example.com
+      - tenant3.example.com
+    state: present
+
 - name: Add ACL for SNI ending with domain
   pfsensible.haproxy.pfsense_haproxy_frontend_acl:
     frontend: sni-frontend
@@ -124,6 +162,28 @@ commands:
         "create haproxy_frontend_acl 'is_api' on 'sni-frontend', expression='ssl_sni_matches', value='api.example.com'",
         "delete haproxy_frontend_acl 'is_api' on 'sni-frontend'"
     ]
+reloaded:
+    description: True if HAProxy has been reloaded. The reload is skipped when the changes do not affect haproxy.cfg, like a change of description.
+    returned: always
+    type: bool
+    sample: true
+pending_reloads:
+    description: The number of reloads deferred since HAProxy was last reloaded, when I(reload=deferred).
+    returned: when changed with I(reload=deferred)
+    type: int
+    sample: 3
+haproxy_cfg:
+    description: The haproxy.cfg rendered offline from the resulting configuration, interface addresses are not resolved.
+    returned: when I(render_only=true)
+    type: str
+    sample: "global\n\tstats socket /tmp/haproxy.socket level admin expose-fd listeners\n..."
+timings:
+    description:
+      - The monotonic seconds spent in each phase (I(phases)), the number of runs of each phase (I(calls)) and the number of XML elements walked (I(visited)).
+      - The phases include load_config, validate, lookup, id_allocation, xml_update, fingerprint, write_config and phpshell.
+    returned: when profiling
+    type: dict
+    sample: {"phases": {"load_config": 0.412, "phpshell": 1.873}, "calls": {"load_config": 1, "phpshell": 1}, "visited": {"index": 5000}}
 """
 
 from ansible.module_utils.basic import AnsibleModule
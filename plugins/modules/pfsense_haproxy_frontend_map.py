@@ -0,0 +1,197 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey <nicholas@morey.tech>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = """
+---
+module: pfsense_haproxy_frontend_map
+version_added: 0.3.0
+author: Nicholas Morey (@morey-tech)
+short_description: Manage the map file based host routing of a pfSense HAProxy frontend
+description:
+  - Route the traffic of a pfSense HAProxy frontend to a backend by host name, with a map file instead of one ACL and one use_backend
+    action per host.
+  - The host to backend entries are stored in a HAProxy file of the pfSense configuration, written to disk by pfSense, and the frontend
+    gets a single C(use_backend %[<fetch>,map(<file>)]) action. HAProxy looks the host up in the map instead of evaluating one ACL per host.
+  - The entries can be added, changed and removed through the HAProxy runtime API, without reloading HAProxy.
+notes:
+  - Host names are matched in lower case. Traffic whose host is not in the map is routed by the other actions of the frontend,
+    or to its default backend. The map action is added after the existing actions, so ACL based rules are evaluated first.
+  - With I(fetch=sni) on a https or tcp frontend, the C(tcp-request) actions waiting for the TLS client hello are added too.
+  - With I(apply_via=runtime), the map file on disk is rewritten by pfSense on the next HAProxy reload.
+options:
+  frontend:
+    description: The frontend name.
+    required: true
+    type: str
+  hosts:
+    description: The map entries.
+    required: true
+    type: list
+    elements: dict
+    suboptions:
+      state:
+        description: State in which to leave the entry.
+        required: false
+        default: present
+        choices: [ "present", "absent" ]
+        type: str
+      host:
+        description: The host name, as sent in the Host header or the SNI.
+        required: true
+        type: str
+      backend:
+        description: The backend to route the host to. Required when I(state=present).
+        required: false
+        type: str
+  map:
+    description: The name of the HAProxy file holding the map. Defaults to C(<frontend>.map).
+    required: false
+    type: str
+  fetch:
+    description:
+      - What is looked up in the map.
+      - C(host) uses the Host header, without port, and requires a http frontend.
+      - C(sni) uses the TLS SNI. Defaults to C(host) on http frontends and to C(sni) otherwise.
+    required: false
+    choices: [ "host", "sni" ]
+    type: str
+  exclusive:
+    description: Delete the entries of the map which are not listed in I(hosts).
+    required: false
+    default: false
+    type: bool
+  apply_via:
+    description:
+      - How to apply the changes to the running HAProxy, config.xml is always updated.
+      - C(reload) reloads HAProxy.
+      - C(runtime) pushes the map entry changes through the HAProxy runtime API (stats socket), without reloading HAProxy.
+        HAProxy is reloaded when the map file or the frontend actions are created, or when the runtime API fails.
+    required: false
+    default: reload
+    choices: [ "reload", "runtime" ]
+    type: str
+  runtime_socket:
+    description: Path of the HAProxy stats socket used with I(apply_via=runtime).
+    required: false
+    default: /tmp/haproxy.socket
+    type: path
+  reload:
+    description:
+      - When to reload HAProxy after a change.
+      - C(immediate) checks and reloads HAProxy at the end of the task.
+      - C(deferred) only flags HAProxy as dirty, use M(pfsensible.haproxy.pfsense_haproxy_apply) to reload it once for all the deferred changes.
+    required: false
+    default: immediate
+    choices: [ "immediate", "deferred" ]
+    type: str
+  render_only:
+    description:
+      - Only render the resulting haproxy.cfg, without writing config.xml nor reloading HAProxy.
+      - The rendered configuration is returned in I(haproxy_cfg), and its changes in the task diff. The map file is not rendered.
+    required: false
+    default: false
+    type: bool
+  profile:
+    description:
+      - Return in I(timings) the time spent in each phase of the task and the number of XML elements walked.
+      - Profiling can also be enabled by setting the C(PFSENSIBLE_HAPROXY_PROFILE) environment variable to C(1) on the target.
+    required: false
+    default: false
+    type: bool
+"""
+
+EXAMPLES = """
+- name: Route the tenants by SNI with a map
+  pfsensible.haproxy.pfsense_haproxy_frontend_map:
+    frontend: sni-frontend
+    hosts:
+      - { host: tenant1.example.com, backend: tenant1 }
+      - { host: tenant2.example.com, backend: tenant2 }
+    exclusive: true
+
+- name: Move a tenant to another backend without reloading HAProxy
+  pfsensible.haproxy.pfsense_haproxy_frontend_map:
+    frontend: sni-frontend
+    hosts:
+      - { host: tenant2.example.com, backend: tenant2-new }
+      - { host: tenant3.example.com, state: absent }
+    apply_via: runtime
+"""
+
+RETURN = """
+commands:
+    description: the set of commands that would be pushed to the remote device (if pfSense had a CLI)
+    returned: always
+    type: list
+    sample: [
+        "create haproxy_frontend_map 'tenant1.example.com' on 'sni-frontend', backend='tenant1_ipvANY'",
+        "update haproxy_frontend_map 'tenant2.example.com' on 'sni-frontend' set backend='tenant2-new_ipvANY'"
+    ]
+map_file:
+    description: The path of the map file in haproxy.cfg.
+    returned: always
+    type: str
+    sample: /var/etc/haproxy/sni-frontend.map
+reloaded:
+    description: True if HAProxy has been reloaded.
+    returned: always
+    type: bool
+    sample: false
+runtime_commands:
+    description: The runtime API commands pushed to HAProxy, when I(apply_via=runtime).
+    returned: when the changes have been pushed through the runtime API
+    type: list
+    sample: ["set map /var/etc/haproxy/sni-frontend.map tenant2.example.com tenant2-new_ipvANY"]
+runtime_error:
+    description: Why the runtime API could not apply the changes, HAProxy has been reloaded instead.
+    returned: when the runtime API failed
+    type: str
+    sample: "'del map /var/etc/haproxy/sni-frontend.map tenant3.example.com' failed: Key not found."
+pending_reloads:
+    description: The number of reloads deferred since HAProxy was last reloaded, when I(reload=deferred).
+    returned: when changed with I(reload=deferred)
+    type: int
+    sample: 3
+haproxy_cfg:
+    description: The haproxy.cfg rendered offline from the resulting configuration, interface addresses are not resolved.
+    returned: when I(render_only=true)
+    type: str
+    sample: "global\n\tstats socket /tmp/haproxy.socket level admin expose-fd listeners\n..."
+timings:
+    description:
+      - The monotonic seconds spent in each phase (I(phases)), the number of runs of each phase (I(calls)) and the number of XML elements walked (I(visited)).
+      - The phases include load_config, validate, lookup, id_allocation, xml_update, fingerprint, write_config and phpshell.
+    returned: when profiling
+    type: dict
+    sample: {"phases": {"load_config": 0.412, "phpshell": 1.873}, "calls": {"load_config": 1, "phpshell": 1}, "visited": {"index": 5000}}
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_frontend_map import (
+    PFSenseHaproxyFrontendMapModule,
+    HAPROXY_FRONTEND_MAP_ARGUMENT_SPEC,
+)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=HAPROXY_FRONTEND_MAP_ARGUMENT_SPEC,
+        supports_check_mode=True)
+
+    pfmodule = PFSenseHaproxyFrontendMapModule(module)
+    pfmodule.run(module.params)
+    pfmodule.commit_changes()
+
+
+if __name__ == '__main__':
+    main()
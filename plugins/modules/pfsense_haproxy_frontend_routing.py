@@ -0,0 +1,160 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey <nicholas@morey.tech>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = """
+---
+module: pfsense_haproxy_frontend_routing
+version_added: 0.3.0
+author: Nicholas Morey (@morey-tech)
+short_description: Manage the ACL based routing of a pfSense HAProxy frontend
+description:
+  - Manage the ACLs and the matching use_backend actions of a pfSense HAProxy frontend in one task.
+  - Each rule routes the traffic matching one ACL to one backend. The configuration is written and HAProxy is reloaded only once.
+notes:
+  - The use_backend actions of the rules are kept in the order of the rules, in the positions they already use in the frontend
+    action list. New actions are added after the existing ones.
+  - A use_backend action using the ACL of a rule with another backend is deleted.
+  - Like M(pfsensible.haproxy.pfsense_haproxy_frontend_acl), the frontend type must be https or tcp.
+options:
+  frontend:
+    description: The frontend name.
+    required: true
+    type: str
+  rules:
+    description: The routing rules, in order.
+    required: true
+    type: list
+    elements: dict
+    suboptions:
+      acl:
+        description: The ACL name.
+        required: true
+        type: str
+      expression:
+        description: The ACL expression type.
+        required: true
+        type: str
+        choices: [ "ssl_sni_matches", "ssl_sni_contains", "ssl_sni_starts_with", "ssl_sni_ends_with", "ssl_sni_regex" ]
+      value:
+        description: The value to match, or a list of values matched by the same ACL.
+        required: true
+        type: raw
+      casesensitive:
+        description: Whether the match is case sensitive.
+        required: false
+        default: false
+        type: bool
+      negate:
+        description: Negate the ACL.
+        required: false
+        default: false
+        type: bool
+      backend:
+        description: The backend to use when the ACL matches.
+        required: true
+        type: str
+  exclusive:
+    description:
+      - Delete the ACLs and the use_backend actions of the frontend which are not listed in I(rules).
+      - The ACLs still used by other actions are kept.
+    required: false
+    default: false
+    type: bool
+  reload:
+    description:
+      - When to reload HAProxy after a change.
+      - C(immediate) checks and reloads HAProxy at the end of the task.
+      - C(deferred) only flags HAProxy as dirty, use M(pfsensible.haproxy.pfsense_haproxy_apply) to reload it once for all the deferred changes.
+    required: false
+    default: immediate
+    choices: [ "immediate", "deferred" ]
+    type: str
+  render_only:
+    description:
+      - Only render the resulting haproxy.cfg, without writing config.xml nor reloading HAProxy.
+      - The rendered configuration is returned in I(haproxy_cfg), and its changes in the task diff.
+    required: false
+    default: false
+    type: bool
+  profile:
+    description:
+      - Return in I(timings) the time spent in each phase of the task and the number of XML elements walked.
+      - Profiling can also be enabled by setting the C(PFSENSIBLE_HAPROXY_PROFILE) environment variable to C(1) on the target.
+    required: false
+    default: false
+    type: bool
+"""
+
+EXAMPLES = """
+- name: Route the tenants by SNI
+  pfsensible.haproxy.pfsense_haproxy_frontend_routing:
+    frontend: sni-frontend
+    rules:
+      - { acl: tenant1, expression: ssl_sni_matches, value: tenant1.example.com, backend: tenant1 }
+      - { acl: tenant2, expression: ssl_sni_matches, value: tenant2.example.com, backend: tenant2 }
+    exclusive: true
+"""
+
+RETURN = """
+commands:
+    description: the set of commands that would be pushed to the remote device (if pfSense had a CLI)
+    returned: always
+    type: list
+    sample: [
+        "create haproxy_frontend_acl 'tenant1', name='tenant1', expression='ssl_sni_matches', value='tenant1.example.com'",
+        "create haproxy_frontend_action 'tenant1' -> 'tenant1', action='use_backend', backend='tenant1', acl='tenant1'",
+        "update haproxy_frontend_routing 'sni-frontend' set order='tenant1,tenant2'"
+    ]
+reloaded:
+    description: True if HAProxy has been reloaded. The reload is skipped when the changes do not affect haproxy.cfg, like a change of description.
+    returned: always
+    type: bool
+    sample: true
+pending_reloads:
+    description: The number of reloads deferred since HAProxy was last reloaded, when I(reload=deferred).
+    returned: when changed with I(reload=deferred)
+    type: int
+    sample: 3
+haproxy_cfg:
+    description: The haproxy.cfg rendered offline from the resulting configuration, interface addresses are not resolved.
+    returned: when I(render_only=true)
+    type: str
+    sample: "global\n\tstats socket /tmp/haproxy.socket level admin expose-fd listeners\n..."
+timings:
+    description:
+      - The monotonic seconds spent in each phase (I(phases)), the number of runs of each phase (I(calls)) and the number of XML elements walked (I(visited)).
+      - The phases include load_config, validate, lookup, id_allocation, xml_update, fingerprint, write_config and phpshell.
+    returned: when profiling
+    type: dict
+    sample: {"phases": {"load_config": 0.412, "phpshell": 1.873}, "calls": {"load_config": 1, "phpshell": 1}, "visited": {"index": 5000}}
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_frontend_routing import (
+    PFSenseHaproxyFrontendRoutingModule,
+    HAPROXY_FRONTEND_ROUTING_ARGUMENT_SPEC,
+)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=HAPROXY_FRONTEND_ROUTING_ARGUMENT_SPEC,
+        supports_check_mode=True)
+
+    pfmodule = PFSenseHaproxyFrontendRoutingModule(module)
+    pfmodule.run(module.params)
+    pfmodule.commit_changes()
+
+
+if __name__ == '__main__':
+    main()
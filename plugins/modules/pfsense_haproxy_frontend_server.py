@@ -20,6 +20,8 @@ short_description: Manage pfSense HAProxy frontend servers
 description:
   - Manage pfSense HAProxy frontend bind addresses/ports
 notes:
+  - I(thread), I(shards), I(tfo), I(backlog) and I(alpn) have no field in the webgui, they are written in the pass thru of the bind line.
+    They are left as they are when not given, the rest of the pass thru is kept.
 options:
   frontend:
     description: The frontend name.
@@ -42,11 +44,62 @@ options:
     description: SSL configuration for external address.
     required: false
     type: str
+  thread:
+    description:
+      - The threads accepting the connections of the bind line (C(thread)), like C(1-4), C(odd) or C(1/all).
+      - Binding the listeners of a frontend to different threads spreads the accept load over the cores.
+    required: false
+    type: str
+  shards:
+    description: The number of listening sockets the bind line is split into (C(shards)), a number, C(by-thread) or C(by-group).
+    required: false
+    type: str
+  tfo:
+    description:
+      - Enable TCP Fast Open on the bind line (C(tfo)), C(false) removes it.
+      - TCP Fast Open must also be enabled in the kernel, with the C(net.inet.tcp.fastopen.server_enable) tunable.
+    required: false
+    type: bool
+  backlog:
+    description: The maximum number of pending connections in the accept queue of the bind line (C(backlog)).
+    required: false
+    type: int
+  alpn:
+    description:
+      - Protocols advertised by ALPN on the bind line (C(alpn)), in order of preference, an empty list removes them.
+      - Only valid on the SSL offloading binds (I(extaddr_ssl=yes)) of C(http) type frontends.
+    required: false
+    type: list
+    elements: str
+    choices: [ "h2", "http/1.1", "http/1.0" ]
   state:
     description: State in which to leave the frontend server
     choices: [ "present", "absent" ]
     default: present
     type: str
+  reload:
+    description:
+      - When to reload HAProxy after a change.
+      - C(immediate) checks and reloads HAProxy at the end of the task.
+      - C(deferred) only flags HAProxy as dirty, use M(pfsensible.haproxy.pfsense_haproxy_apply) to reload it once for all the deferred changes.
+    required: false
+    default: immediate
+    choices: [ "immediate", "deferred" ]
+    type: str
+  render_only:
+    description:
+      - Only render the resulting haproxy.cfg, without writing config.xml nor reloading HAProxy.
+      - The rendered configuration is returned in I(haproxy_cfg), and its changes in the task diff.
+    required: false
+    default: false
+    type: bool
+  profile:
+    description:
+      - Return in I(timings) the time spent in each phase of the task and the number of XML elements walked.
+      - Profiling can also be enabled by setting the C(PFSENSIBLE_HAPROXY_PROFILE) environment variable to C(1) on the target.
+    required: false
+    default: false
+    type: bool
 """
 
 EXAMPLES = """
@@ -73,6 +126,28 @@ EXAMPLES = """
     extaddr_ssl: "yes"
     state: present
 
+- name: Spread the accept load of a busy listener over the cores
+  pfsensible.haproxy.pfsense_haproxy_frontend_server:
+    frontend: web-frontend
+    extaddr: wan_ipv4
+    extaddr_port: 443
+    extaddr_ssl: "yes"
+    shards: by-thread
+    tfo: true
+    backlog: 4096
+    state: present
+
+- name: Offer HTTP/2 to the clients of the offloading bind
+  pfsensible.haproxy.pfsense_haproxy_frontend_server:
+    frontend: web-frontend
+    extaddr: wan_ipv4
+    extaddr_port: 443
+    extaddr_ssl: "yes"
+    alpn:
+      - h2
+      - http/1.1
+    state: present
+
 - name: Bind to optional interface (e.g., LAB network)
   pfsensible.haproxy.pfsense_haproxy_frontend_server:
     frontend: internal-frontend
@@ -104,6 +179,28 @@ commands:
         "create haproxy_frontend_server '0.0.0.0_443' on 'web-frontend', extaddr='0.0.0.0', port=443",
         "delete haproxy_frontend_server '0.0.0.0_443' on 'web-frontend'"
     ]
+reloaded:
+    description: True if HAProxy has been reloaded. The reload is skipped when the changes do not affect haproxy.cfg, like a change of description.
+    returned: always
+    type: bool
+    sample: true
+pending_reloads:
+    description: The number of reloads deferred since HAProxy was last reloaded, when I(reload=deferred).
+    returned: when changed with I(reload=deferred)
+    type: int
+    sample: 3
+haproxy_cfg:
+    description: The haproxy.cfg rendered offline from the resulting configuration, interface addresses are not resolved.
+    returned: when I(render_only=true)
+    type: str
+    sample: "global\n\tstats socket /tmp/haproxy.socket level admin expose-fd listeners\n..."
+timings:
+    description:
+      - The monotonic seconds spent in each phase (I(phases)), the number of runs of each phase (I(calls)) and the number of XML elements walked (I(visited)).
+      - The phases include load_config, validate, lookup, id_allocation, xml_update, fingerprint, write_config and phpshell.
+    returned: when profiling
+    type: dict
+    sample: {"phases": {"load_config": 0.412, "phpshell": 1.873}, "calls": {"load_config": 1, "phpshell": 1}, "visited": {"index": 5000}}
 """
 
 from ansible.module_utils.basic import AnsibleModule
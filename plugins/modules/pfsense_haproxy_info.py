@@ -0,0 +1,130 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey <nicholas@morey.tech>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = """
+---
+module: pfsense_haproxy_info
+version_added: 0.3.0
+author: Nicholas Morey (@morey-tech)
+short_description: Gather the pfSense HAProxy configuration
+description:
+  - Return the pfSense HAProxy backends, backend servers, frontends, frontend servers, ACLs and actions as flat lists.
+  - The configuration is read once and never modified.
+notes:
+  - Items are reported with their non empty fields, named as in config.xml. Servers, ACLs and actions also get the name of their
+    backend or frontend in a C(backend) or C(frontend) field.
+  - The subtrees of the backends and frontends which are filtered out or not gathered are not walked.
+options:
+  gather:
+    description: The lists to return.
+    required: false
+    type: list
+    elements: str
+    choices: [ "backends", "backend_servers", "frontends", "frontend_servers", "acls", "actions" ]
+    default: [ "backends", "backend_servers", "frontends", "frontend_servers", "acls", "actions" ]
+  backends:
+    description: Only report the backends, and their servers, whose name matches one of these names or shell-style globs.
+    required: false
+    type: list
+    elements: str
+  frontends:
+    description: Only report the frontends, and their servers, ACLs and actions, whose name matches one of these names or shell-style globs.
+    required: false
+    type: list
+    elements: str
+  profile:
+    description:
+      - Return in I(timings) the time spent in each phase of the task and the number of XML elements walked.
+      - Profiling can also be enabled by setting the C(PFSENSIBLE_HAPROXY_PROFILE) environment variable to C(1) on the target.
+    required: false
+    default: false
+    type: bool
+"""
+
+EXAMPLES = """
+- name: Gather the whole HAProxy configuration
+  pfsensible.haproxy.pfsense_haproxy_info:
+  register: haproxy
+
+- name: Gather the servers of the web backends
+  pfsensible.haproxy.pfsense_haproxy_info:
+    gather: [ backend_servers ]
+    backends: [ "web*" ]
+  register: web_servers
+"""
+
+RETURN = """
+backends:
+    description: The backends.
+    returned: when gathered
+    type: list
+    elements: dict
+    sample: [{"name": "web", "id": "102", "balance": "roundrobin", "check_type": "none"}]
+backend_servers:
+    description: The backend servers.
+    returned: when gathered
+    type: list
+    elements: dict
+    sample: [{"backend": "web", "name": "web1", "id": "103", "status": "active", "address": "10.0.0.11", "port": "80"}]
+frontends:
+    description: The frontends.
+    returned: when gathered
+    type: list
+    elements: dict
+    sample: [{"name": "sni-frontend", "id": "101", "type": "https"}]
+frontend_servers:
+    description: The frontend bind addresses.
+    returned: when gathered
+    type: list
+    elements: dict
+    sample: [{"frontend": "sni-frontend", "name": "'wan_ipv4_443'", "extaddr": "wan_ipv4", "extaddr_port": "443"}]
+acls:
+    description: The frontend ACLs.
+    returned: when gathered
+    type: list
+    elements: dict
+    sample: [{"frontend": "sni-frontend", "name": "is_web", "expression": "ssl_sni_matches", "value": "www.example.com"}]
+actions:
+    description: The frontend actions, in order.
+    returned: when gathered
+    type: list
+    elements: dict
+    sample: [{"frontend": "sni-frontend", "action": "use_backend", "use_backendbackend": "web", "acl": "is_web"}]
+timings:
+    description:
+      - The monotonic seconds spent in each phase (I(phases)), the number of runs of each phase (I(calls)) and the number of XML elements walked (I(visited)).
+      - The phases include load_config, validate, lookup, id_allocation, xml_update, fingerprint, write_config and phpshell.
+    returned: when profiling
+    type: dict
+    sample: {"phases": {"load_config": 0.412, "phpshell": 1.873}, "calls": {"load_config": 1, "phpshell": 1}, "visited": {"index": 5000}}
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_info import (
+    PFSenseHaproxyInfoModule,
+    HAPROXY_INFO_ARGUMENT_SPEC,
+)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=HAPROXY_INFO_ARGUMENT_SPEC,
+        supports_check_mode=True)
+
+    pfmodule = PFSenseHaproxyInfoModule(module)
+    pfmodule.run(module.params)
+    pfmodule.commit_changes()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey <nicholas@morey.tech>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = """
+---
+module: pfsense_haproxy_settings
+version_added: 0.3.0
+author: Nicholas Morey (@morey-tech)
+short_description: Manage the pfSense HAProxy global performance settings
+description:
+  - Manage the global settings of the pfSense HAProxy package which size HAProxy, like the maximum number of connections and threads.
+  - Only the given settings are changed, the other global settings are left as they are.
+notes:
+  - I(maxconn), I(nbthread) and I(hard_stop_after) are the fields of the webgui global settings.
+  - I(ssl_cache_size), I(bufsize), I(maxrewrite) and I(spread_checks) have no field in the webgui, their lines are managed in the global
+    advanced pass thru. The other lines of the pass thru are kept.
+options:
+  maxconn:
+    description: The maximum number of concurrent connections of the HAProxy process.
+    required: false
+    type: int
+  nbthread:
+    description: The number of threads HAProxy runs, from 1 to 64.
+    required: false
+    type: int
+  hard_stop_after:
+    description: The maximum time the old HAProxy process is kept after a reload to finish its connections, like C(15m).
+    required: false
+    type: str
+  ssl_cache_size:
+    description: The number of entries of the SSL session cache (C(tune.ssl.cachesize)), C(0) disables the cache.
+    required: false
+    type: int
+  bufsize:
+    description: The size of the buffers in bytes (C(tune.bufsize)).
+    required: false
+    type: int
+  maxrewrite:
+    description:
+      - The space reserved in the buffers for header rewrites in bytes (C(tune.maxrewrite)).
+      - At most half of I(bufsize). HAProxy lowers a larger value to half of the buffer, the module refuses it instead.
+    required: false
+    type: int
+  spread_checks:
+    description:
+      - The percentage of random jitter added to the interval between two health checks (C(spread-checks)), from 0 to 50.
+      - It spreads the checks of the servers sharing the same interval over time, HAProxy does not add any jitter by default.
+    required: false
+    type: int
+  reload:
+    description:
+      - When to reload HAProxy after a change.
+      - C(immediate) checks and reloads HAProxy at the end of the task.
+      - C(deferred) only flags HAProxy as dirty, use M(pfsensible.haproxy.pfsense_haproxy_apply) to reload it once for all the deferred changes.
+    required: false
+    default: immediate
+    choices: [ "immediate", "deferred" ]
+    type: str
+  render_only:
+    description:
+      - Only render the resulting haproxy.cfg, without writing config.xml nor reloading HAProxy.
+      - The rendered configuration is returned in I(haproxy_cfg), and its changes in the task diff.
+    required: false
+    default: false
+    type: bool
+  profile:
+    description:
+      - Return in I(timings) the time spent in each phase of the task and the number of XML elements walked.
+      - Profiling can also be enabled by setting the C(PFSENSIBLE_HAPROXY_PROFILE) environment variable to C(1) on the target.
+    required: false
+    default: false
+    type: bool
+"""
+
+EXAMPLES = """
+- name: Size HAProxy for a 8 cores firewall
+  pfsensible.haproxy.pfsense_haproxy_settings:
+    maxconn: 50000
+    nbthread: 8
+    hard_stop_after: 15m
+    ssl_cache_size: 100000
+    spread_checks: 5
+
+- name: Use larger buffers
+  pfsensible.haproxy.pfsense_haproxy_settings:
+    bufsize: 32768
+    maxrewrite: 8192
+"""
+
+RETURN = """
+commands:
+    description: the set of commands that would be pushed to the remote device (if pfSense had a CLI)
+    returned: always
+    type: list
+    sample: ["update haproxy_settings 'global' set maxconn='50000', nbthread='8'"]
+settings:
+    description: The global settings in effect after the task. The settings which are not set are omitted, HAProxy uses its defaults for them.
+    returned: always
+    type: dict
+    sample: {"maxconn": 50000, "nbthread": 8, "hard_stop_after": "15m", "ssl_cache_size": 100000}
+reloaded:
+    description: True if HAProxy has been reloaded.
+    returned: always
+    type: bool
+    sample: true
+pending_reloads:
+    description: The number of reloads deferred since HAProxy was last reloaded, when I(reload=deferred).
+    returned: when changed with I(reload=deferred)
+    type: int
+    sample: 3
+haproxy_cfg:
+    description: The haproxy.cfg rendered offline from the resulting configuration, interface addresses are not resolved.
+    returned: when I(render_only=true)
+    type: str
+    sample: "global\n\tmaxconn\t\t\t50000\n\tnbthread\t\t\t8\n..."
+timings:
+    description:
+      - The monotonic seconds spent in each phase (I(phases)), the number of runs of each phase (I(calls)) and the number of XML elements walked (I(visited)).
+      - The phases include load_config, validate, lookup, id_allocation, xml_update, fingerprint, write_config and phpshell.
+    returned: when profiling
+    type: dict
+    sample: {"phases": {"load_config": 0.412, "phpshell": 1.873}, "calls": {"load_config": 1, "phpshell": 1}, "visited": {"index": 5000}}
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_settings import PFSenseHaproxySettingsModule, HAPROXY_SETTINGS_ARGUMENT_SPEC
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=HAPROXY_SETTINGS_ARGUMENT_SPEC,
+        supports_check_mode=True)
+
+    pfmodule = PFSenseHaproxySettingsModule(module)
+    pfmodule.run(module.params)
+    pfmodule.commit_changes()
+
+
+if __name__ == '__main__':
+    main()
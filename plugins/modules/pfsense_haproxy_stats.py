@@ -0,0 +1,153 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey <nicholas@morey.tech>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = """
+---
+module: pfsense_haproxy_stats
+version_added: 0.3.0
+author: Nicholas Morey (@morey-tech)
+short_description: Gather the HAProxy runtime statistics
+description:
+  - Return the session, queue, latency and error counters of the running HAProxy frontends, backends and servers,
+    read with the C(show stat) and C(show info) commands of the HAProxy runtime API.
+  - Nothing is modified.
+notes:
+  - The statistics are parsed as they are read and only the rows of the selected frontends, backends and servers are split into fields,
+    so the cost of a task filtered on a few backends stays low on large configurations.
+  - When I(backends) is a single name, only the statistics of this backend are asked to HAProxy.
+  - Counters are returned as integers. Empty counters are omitted.
+options:
+  gather:
+    description: The statistics to return.
+    required: false
+    type: list
+    elements: str
+    choices: [ "frontends", "backends", "servers", "info" ]
+    default: [ "backends", "servers" ]
+  backends:
+    description: Only report the backends, and their servers, whose name matches one of these names or shell-style globs.
+    required: false
+    type: list
+    elements: str
+  servers:
+    description: Only report the servers whose name matches one of these names or shell-style globs.
+    required: false
+    type: list
+    elements: str
+  frontends:
+    description: Only report the frontends whose name matches one of these names or shell-style globs.
+    required: false
+    type: list
+    elements: str
+  fields:
+    description: The C(show stat) fields to return for the frontends, backends and servers.
+    required: false
+    type: list
+    elements: str
+    default: [ "status", "weight", "scur", "smax", "slim", "qcur", "qmax", "stot", "rate", "qtime", "ctime", "rtime", "ttime",
+               "ereq", "econ", "eresp", "wretr", "wredis", "hrsp_4xx", "hrsp_5xx", "chkfail", "lastchg" ]
+  info_fields:
+    description: The C(show info) fields to return in I(info). All the fields are returned if empty.
+    required: false
+    type: list
+    elements: str
+    default: [ "Version", "Uptime_sec", "Nbthread", "Maxconn", "CurrConns", "CumConns", "ConnRate", "SessRate", "Run_queue", "Idle_pct" ]
+  source:
+    description:
+      - How to reach the runtime API.
+      - C(socket) connects to I(runtime_socket) directly, without loading config.xml.
+      - C(phpshell) runs the commands through the socket helpers of the HAProxy package, in a single pfSense PHP shell call.
+    required: false
+    type: str
+    choices: [ "socket", "phpshell" ]
+    default: socket
+  runtime_socket:
+    description: The path of the HAProxy stats socket used by I(source=socket).
+    required: false
+    type: path
+    default: /tmp/haproxy.socket
+  profile:
+    description:
+      - Return in I(timings) the time spent in each phase of the task.
+      - Profiling can also be enabled by setting the C(PFSENSIBLE_HAPROXY_PROFILE) environment variable to C(1) on the target.
+    required: false
+    default: false
+    type: bool
+"""
+
+EXAMPLES = """
+- name: Gather the statistics of the servers of the web backend
+  pfsensible.haproxy.pfsense_haproxy_stats:
+    gather: [ servers ]
+    backends: [ web ]
+    fields: [ status, scur, qcur, econ, eresp ]
+  register: web_stats
+
+- name: Gather the frontends statistics and the process information
+  pfsensible.haproxy.pfsense_haproxy_stats:
+    gather: [ frontends, info ]
+  register: haproxy_stats
+"""
+
+RETURN = """
+frontends:
+    description: The frontends statistics.
+    returned: when gathered
+    type: list
+    elements: dict
+    sample: [{"name": "sni-frontend", "status": "OPEN", "scur": 3, "smax": 10, "slim": 2000, "stot": 100}]
+backends:
+    description: The backends statistics, named as in pfSense.
+    returned: when gathered
+    type: list
+    elements: dict
+    sample: [{"name": "web", "status": "UP", "weight": 2, "scur": 3, "qcur": 0, "stot": 70}]
+servers:
+    description: The servers statistics, with the pfSense name of their backend in C(backend).
+    returned: when gathered
+    type: list
+    elements: dict
+    sample: [{"backend": "web", "name": "web1", "status": "UP", "weight": 1, "scur": 2, "qcur": 0, "stot": 40}]
+info:
+    description: The HAProxy process information.
+    returned: when gathered
+    type: dict
+    sample: {"Version": "2.8.3", "Nbthread": 4, "CurrConns": 3}
+timings:
+    description:
+      - The monotonic seconds spent in each phase (I(phases)) and the number of runs of each phase (I(calls)).
+      - The phases include gather and, with I(source=phpshell), load_config and phpshell.
+    returned: when profiling
+    type: dict
+    sample: {"phases": {"gather": 0.012}, "calls": {"gather": 1}, "visited": {}}
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_stats import (
+    PFSenseHaproxyStatsModule,
+    HAPROXY_STATS_ARGUMENT_SPEC,
+)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=HAPROXY_STATS_ARGUMENT_SPEC,
+        supports_check_mode=True)
+
+    pfmodule = PFSenseHaproxyStatsModule(module)
+    pfmodule.run(module.params)
+    pfmodule.commit_changes()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey, nicholas@morey.tech
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+""" benchmark of the pfsense_haproxy_* modules on generated configurations
+
+Run it from the collection directory, with the collections (pfsensible.core included) in PYTHONPATH:
+
+    PYTHONPATH=~/.ansible/collections python tests/benchmarks/bench_haproxy.py --sizes 100x10 1000x20 5000x20 --json bench.json
+
+Like an ansible task, each operation runs in a fresh module working on a freshly parsed config.xml.
+Only the run of the module is timed: parsing and writing config.xml and reloading haproxy are left out.
+The peak memory is measured with tracemalloc, on an extra run which is not timed.
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.community.internal_test_tools.tests.unit.plugins.modules.utils import set_module_args
+from ansible_collections.pfsensible.core.plugins.module_utils.pfsense import PFSenseModule
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_backend import PFSenseHaproxyBackendModule
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_backend_server import PFSenseHaproxyBackendServerModule
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_frontend import PFSenseHaproxyFrontendModule
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_frontend_acl import PFSenseHaproxyFrontendAclModule
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_frontend_action import PFSenseHaproxyFrontendActionModule
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_frontend_server import PFSenseHaproxyFrontendServerModule
+from ansible_collections.pfsensible.haproxy.tests.benchmarks.haproxy_config import (
+    HaproxyConfigGenerator,
+    acl_name,
+    acl_value,
+    backend_name,
+    extaddr_port,
+    frontend_name,
+    server_name,
+)
+
+OPERATIONS = ['create', 'update', 'noop', 'delete']
+
+
+def _scenarios(gen):
+    """ return module -> (class, operation -> params), the existing items used are the last ones, the slowest to find """
+    backend = backend_name(gen.backends - 1)
+    server = server_name(gen.backends - 1, gen.servers - 1)
+    frontend = frontend_name(gen.frontends - 1)
+    port = extaddr_port(gen.extaddrs - 1)
+    acl = acl_name(gen.acls - 1)
+
+    backend_update = dict(name=backend, balance='leastconn')
+    server_update = dict(backend=backend, name=server, address='10.255.255.1', port=80, weight=10)
+    frontend_update = dict(name=frontend, type='https', max_connections=500)
+    frontend_server_update = dict(frontend=frontend, extaddr='wan_ipv4', extaddr_port=port, extaddr_ssl='yes')
+    acl_update = dict(frontend=frontend, name=acl, expression='ssl_sni_ends_with', value='.example.org')
+    action = dict(frontend=frontend, action='use_backend', backend=backend_name(0), acl=acl)
+
+    return dict(
+        pfsense_haproxy_backend=(PFSenseHaproxyBackendModule, dict(
+            create=dict(name='bench_new', balance='roundrobin'),
+            update=backend_update,
+            noop=backend_update,
+            delete=dict(name=backend, state='absent'),
+        )),
+        pfsense_haproxy_backend_server=(PFSenseHaproxyBackendServerModule, dict(
+            create=dict(backend=backend, name='bench_new', address='10.255.255.2', port=80),
+            update=server_update,
+            noop=server_update,
+            delete=dict(backend=backend, name=server, state='absent'),
+        )),
+        pfsense_haproxy_frontend=(PFSenseHaproxyFrontendModule, dict(
+            create=dict(name='bench_new', type='https'),
+            update=frontend_update,
+            noop=frontend_update,
+            delete=dict(name=frontend, state='absent'),
+        )),
+        pfsense_haproxy_frontend_server=(PFSenseHaproxyFrontendServerModule, dict(
+            create=dict(frontend=frontend, extaddr='wan_ipv4', extaddr_port=9999),
+            update=frontend_server_update,
+            noop=frontend_server_update,
+            delete=dict(frontend=frontend, extaddr='wan_ipv4', extaddr_port=port, state='absent'),
+        )),
+        pfsense_haproxy_frontend_acl=(PFSenseHaproxyFrontendAclModule, dict(
+            create=dict(frontend=frontend, name='bench_new', expression='ssl_sni_matches', value='bench.example.com'),
+            update=acl_update,
+            noop=acl_update,
+            delete=dict(frontend=frontend, name=acl, expression='ssl_sni_matches', value=acl_value(gen.frontends - 1, gen.acls - 1), state='absent'),
+        )),
+        # all the fields of an action are part of its key, so an action can not be updated
+        pfsense_haproxy_frontend_action=(PFSenseHaproxyFrontendActionModule, dict(
+            create=dict(frontend=frontend, action='use_backend', backend=backend, acl='bench_new'),
+            noop=dict(action, backend=backend_name((gen.frontends - 1) * gen.acls % gen.backends), acl=acl_name(0)),
+            delete=dict(action, backend=backend_name((gen.frontends - 1) * gen.acls % gen.backends), acl=acl_name(0), state='absent'),
+        )),
+    )
+
+
+def _load(module_class, config, params):
+    """ return a fresh module working on config, like an ansible task """
+    set_module_args(params)
+    module = AnsibleModule(argument_spec=module_class.get_argument_spec(), supports_check_mode=True)
+    return module_class(module, PFSenseModule(module, config))
+
+
+def _run(module_class, config, params, expect_changed):
+    """ run a module once and return its duration in seconds """
+    pfmodule = _load(module_class, config, params)
+    start = time.perf_counter()
+    pfmodule.run(pfmodule.module.params)
+    duration = time.perf_counter() - start
+    if pfmodule.result['changed'] != expect_changed:
+        raise RuntimeError('{0} {1}: changed is {2}'.format(module_class.__name__, params, pfmodule.result['changed']))
+    return duration
+
+
+def _peak_memory(module_class, config, params):
+    """ run a module once and return the peak memory it allocated, in bytes """
+    pfmodule = _load(module_class, config, params)
+    tracemalloc.start()
+    try:
+        pfmodule.run(pfmodule.module.params)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _changed_config(module_class, config, params, path):
+    """ write to path the configuration config once changed by params, to run no-op operations on it """
+    pfmodule = _load(module_class, config, params)
+    pfmodule.run(pfmodule.module.params)
+    pfmodule.pfsense.tree.write(path)
+    return path
+
+
+def run_benchmark(gen, repeat, tmpdir):
+    """ benchmark all the operations of all the modules on the configuration generated by gen """
+    config = os.path.join(tmpdir, 'config.xml')
+    gen.write(config)
+
+    results = []
+    for name, (module_class, operations) in sorted(_scenarios(gen).items()):
+        for operation in OPERATIONS:
+            params = operations.get(operation)
+            if params is None:
+                continue
+
+            target = config
+            if operation == 'noop':
+                target = _changed_config(module_class, config, params, os.path.join(tmpdir, 'noop.xml'))
+            durations = [_run(module_class, target, params, operation != 'noop') for dummy in range(repeat)]
+            durations.sort()
+            results.append(dict(
+                module=name,
+                operation=operation,
+                backends=gen.backends,
+                servers=gen.servers,
+                frontends=gen.frontends,
+                median_ms=round(durations[len(durations) // 2] * 1000, 3),
+                min_ms=round(durations[0] * 1000, 3),
+                peak_kib=round(_peak_memory(module_class, target, params) / 1024.0, 1),
+            ))
+    return results
+
+
+def _size(value):
+    """ parse a <backends>x<servers> size """
+    try:
+        backends, servers = value.split('x')
+        return (int(backends), int(servers))
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid size '{0}', expected <backends>x<servers>".format(value))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='benchmark the pfsense_haproxy_* modules on generated configurations')
+    parser.add_argument('--sizes', nargs='+', type=_size, default=[(100, 10), (1000, 20)], metavar='BACKENDSxSERVERS')
+    parser.add_argument('--frontends', type=int, help='number of frontends, one for ten backends by default')
+    parser.add_argument('--extaddrs', type=int, default=2, help='number of listen addresses per frontend')
+    parser.add_argument('--acls', type=int, default=10, help='number of ACLs, and use_backend actions, per frontend')
+    parser.add_argument('--repeat', type=int, default=5, help='number of timed runs per operation')
+    parser.add_argument('--json', help='file to write the results to')
+    args = parser.parse_args()
+
+    results = []
+    tmpdir = tempfile.mkdtemp()
+    try:
+        for backends, servers in args.sizes:
+            gen = HaproxyConfigGenerator(backends, servers, args.frontends, args.extaddrs, args.acls)
+            results += run_benchmark(gen, args.repeat, tmpdir)
+    finally:
+        shutil.rmtree(tmpdir)
+
+    print('{0:>8} {1:>8} {2:<32} {3:<8} {4:>12} {5:>12} {6:>12}'.format(
+        'backends', 'servers', 'module', 'op', 'median ms', 'min ms', 'peak KiB'))
+    for result in results:
+        print('{backends:>8} {servers:>8} {module:<32} {operation:<8} {median_ms:>12} {min_ms:>12} {peak_kib:>12}'.format(**result))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2025, Nicholas Morey, nicholas@morey.tech
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from xml.etree.ElementTree import Element, SubElement, ElementTree
+
+# haproxy ids start at 100 on pfsense
+FIRST_ID = 100
+
+# the part of config.xml which is not haproxy
+BASE_CONFIG = [
+    ('version', '18.9'),
+    ('system', [('optimization', 'normal'), ('hostname', 'pfSense'), ('domain', 'acme.com')]),
+    ('interfaces', [
+        ('wan', [('enable', ''), ('if', 'vmx0'), ('descr', 'wan'), ('ipaddr', '192.168.240.137'), ('subnet', '24')]),
+        ('lan', [('enable', ''), ('if', 'vmx1'), ('descr', 'lan'), ('ipaddr', '192.168.1.242'), ('subnet', '24')]),
+    ]),
+]
+
+
+def backend_name(idx):
+    """ return the name of the generated backend idx """
+    return 'backend_{0}'.format(idx)
+
+
+def server_name(backend_idx, idx):
+    """ return the name of the generated server idx of backend backend_idx """
+    return 'backend_{0}_server_{1}'.format(backend_idx, idx)
+
+
+def frontend_name(idx):
+    """ return the name of the generated frontend idx """
+    return 'frontend_{0}'.format(idx)
+
+
+def extaddr_port(idx):
+    """ return the port of the generated extaddr idx """
+    return 8000 + idx
+
+
+def acl_name(idx):
+    """ return the name of the generated ACL idx """
+    return 'acl_{0}'.format(idx)
+
+
+def acl_value(frontend_idx, idx):
+    """ return the value of the generated ACL idx of frontend frontend_idx """
+    return 'host{0}.frontend{1}.example.com'.format(idx, frontend_idx)
+
+
+def _add_fields(parent_elt, fields):
+    """ add (tag, text or list of fields) to parent_elt """
+    for tag, value in fields:
+        elt = SubElement(parent_elt, tag)
+        if isinstance(value, list):
+            _add_fields(elt, value)
+        else:
+            elt.text = value
+
+
+class HaproxyConfigGenerator(object):
+    """ generator of pfsense config.xml trees holding a haproxy configuration of a given size
+
+    frontends default to one for ten backends, each frontend routing its ACLs to the backends in turn.
+    """
+
+    def __init__(self, backends=100, servers=10, frontends=None, extaddrs=2, acls=10):
+        self.backends = backends
+        self.servers = servers
+        self.frontends = max(1, backends // 10) if frontends is None else frontends
+        self.extaddrs = extaddrs
+        self.acls = acls
+        self.next_id = FIRST_ID
+
+    def _get_next_id(self):
+        """ return the next haproxy id """
+        ha_id = self.next_id
+        self.next_id += 1
+        return str(ha_id)
+
+    def _add_frontend(self, frontends_elt, idx):
+        """ add the frontend idx with its extaddrs, ACLs and actions """
+        frontend_elt = SubElement(frontends_elt, 'item')
+        _add_fields(frontend_elt, [
+            ('name', frontend_name(idx)),
+            ('id', self._get_next_id()),
+            ('status', 'active'),
+            ('type', 'https'),
+            ('max_connections', '100'),
+        ])
+
+        extaddrs_elt = SubElement(frontend_elt, 'a_extaddr')
+        for extaddr_idx in range(self.extaddrs):
+            port = str(extaddr_port(extaddr_idx))
+            _add_fields(SubElement(extaddrs_elt, 'item'), [
+                ('extaddr', 'wan_ipv4'),
+                ('extaddr_port', port),
+                ('name', "'wan_ipv4_{0}'".format(port)),
+            ])
+
+        for tag in ['a_acl', 'ha_acls']:
+            acls_elt = SubElement(frontend_elt, tag)
+            for acl_idx in range(self.acls):
+                _add_fields(SubElement(acls_elt, 'item'), [
+                    ('name', acl_name(acl_idx)),
+                    ('expression', 'ssl_sni_matches'),
+                    ('value', acl_value(idx, acl_idx)),
+                ])
+
+        actions_elt = SubElement(frontend_elt, 'a_actionitems')
+        for acl_idx in range(self.acls):
+            _add_fields(SubElement(actions_elt, 'item'), [
+                ('action', 'use_backend'),
+                ('use_backendbackend', backend_name((idx * self.acls + acl_idx) % self.backends)),
+                ('acl', acl_name(acl_idx)),
+            ])
+
+    def _add_backend(self, backends_elt, idx):
+        """ add the backend idx with its servers """
+        backend_elt = SubElement(backends_elt, 'item')
+        _add_fields(backend_elt, [
+            ('name', backend_name(idx)),
+            ('id', self._get_next_id()),
+            ('balance', 'roundrobin'),
+            ('check_type', 'none'),
+        ])
+
+        servers_elt = SubElement(backend_elt, 'ha_servers')
+        for server_idx in range(self.servers):
+            _add_fields(SubElement(servers_elt, 'item'), [
+                ('name', server_name(idx, server_idx)),
+                ('id', self._get_next_id()),
+                ('status', 'active'),
+                ('address', '10.{0}.{1}.{2}'.format(idx // 256 % 256, idx % 256, server_idx % 254 + 1)),
+                ('port', '80'),
+            ])
+
+    def generate(self):
+        """ return the root element of the generated config.xml """
+        self.next_id = FIRST_ID
+        root_elt = Element('pfsense')
+        _add_fields(root_elt, BASE_CONFIG)
+
+        haproxy_elt = SubElement(SubElement(root_elt, 'installedpackages'), 'haproxy')
+        _add_fields(haproxy_elt, [('enable', 'yes'), ('maxconn', '1000')])
+        frontends_elt = SubElement(haproxy_elt, 'ha_backends')
+        for idx in range(self.frontends):
+            self._add_frontend(frontends_elt, idx)
+        backends_elt = SubElement(haproxy_elt, 'ha_pools')
+        for idx in range(self.backends):
+            self._add_backend(backends_elt, idx)
+        return root_elt
+
+    def write(self, path):
+        """ write the generated config.xml to path """
+        ElementTree(self.generate()).write(path)
@@ -0,0 +1,163 @@
+# Copyright: (c) 2025, Nicholas Morey <nicholas@morey.tech>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import unittest
+from xml.etree.ElementTree import fromstring
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_index import HaproxyIdAllocator, HaproxyIndex
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_profile import HaproxyProfiler
+
+SERVERS = """<ha_servers>
+<item><name>web1</name><id>103</id></item>
+<item><name>web2</name><id>104</id></item>
+<item><name>web1</name><id>105</id></item>
+</ha_servers>"""
+
+HAPROXY = """<haproxy>
+<ha_pools><item><name>web</name><id>102</id><ha_servers>
+<item><name>web1</name><id>abc</id></item>
+<item><name>web2</name><id></id></item>
+<item><name>web3</name></item>
+<item><name>web4</name><id>104</id></item>
+</ha_servers></item></ha_pools>
+</haproxy>"""
+
+
+def _item(name, item_id):
+    """ return a new haproxy item """
+    return fromstring('<item><name>{0}</name><id>{1}</id></item>'.format(name, item_id))
+
+
+class TestHaproxyIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.profiler = HaproxyProfiler()
+        self.index = HaproxyIndex(self.profiler)
+        self.servers_elt = fromstring(SERVERS)
+
+    def assert_found(self, name, item_id):
+        """ check the item the index finds for name """
+        item_elt = self.index.find(self.servers_elt, name)
+        self.assertIsNotNone(item_elt)
+        self.assertEqual(item_elt.findtext('id'), item_id)
+
+    def scans(self):
+        """ return the number of items walked to build the maps """
+        return self.profiler.visited.get('index', 0)
+
+    ##############
+    # tests
+    #
+    def test_find(self):
+        """ test the container is scanned once for all the searches """
+        self.assert_found('web2', '104')
+        self.assertIsNone(self.index.find(self.servers_elt, 'web3'))
+        self.assertIsNone(self.index.find(None, 'web2'))
+        self.assertEqual(self.scans(), 3)
+
+    def test_find_duplicate(self):
+        """ test the first of two items of the same name is found, like with a linear scan """
+        self.assert_found('web1', '103')
+
+    def test_add(self):
+        """ test an item added and registered is found without scanning the container again """
+        self.assert_found('web2', '104')
+        item_elt = _item('web3', '106')
+        self.servers_elt.append(item_elt)
+        self.index.add(self.servers_elt, item_elt)
+
+        self.assert_found('web3', '106')
+        self.assertEqual(self.scans(), 3)
+
+    def test_remove_and_add(self):
+        """ test deleting an item then creating one of the same name """
+        self.assert_found('web2', '104')
+        item_elt = self.index.find(self.servers_elt, 'web2')
+        self.servers_elt.remove(item_elt)
+        self.index.remove(self.servers_elt, item_elt)
+        self.assertIsNone(self.index.find(self.servers_elt, 'web2'))
+
+        item_elt = _item('web2', '106')
+        self.servers_elt.append(item_elt)
+        self.index.add(self.servers_elt, item_elt)
+        self.assert_found('web2', '106')
+        self.assertEqual(self.scans(), 3)
+
+    def test_remove_first_duplicate(self):
+        """ test the other item of the same name is found once the first one is removed """
+        item_elt = self.index.find(self.servers_elt, 'web1')
+        self.servers_elt.remove(item_elt)
+        self.index.remove(self.servers_elt, item_elt)
+
+        self.assert_found('web1', '105')
+        self.assertEqual(len(self.servers_elt), 2)
+
+    def test_remove_second_duplicate(self):
+        """ test the first item of a name is still found once another item of the same name is removed """
+        self.assert_found('web1', '103')
+        item_elt = self.servers_elt[2]
+        self.servers_elt.remove(item_elt)
+        self.index.remove(self.servers_elt, item_elt)
+
+        self.assert_found('web1', '103')
+
+    def test_append_out_of_band(self):
+        """ test the map is rebuilt when items have been appended without registering them """
+        self.assert_found('web2', '104')
+        self.servers_elt.append(_item('web3', '106'))
+
+        self.assert_found('web3', '106')
+        self.assertEqual(self.scans(), 3 + 4)
+
+    def test_remove_out_of_band(self):
+        """ test the map is rebuilt when an item has been removed without unregistering it """
+        self.assert_found('web2', '104')
+        self.servers_elt.remove(self.servers_elt[1])
+
+        self.assertIsNone(self.index.find(self.servers_elt, 'web2'))
+        self.assertEqual(self.scans(), 3 + 2)
+
+    def test_add_out_of_sync(self):
+        """ test registering an item in a map out of sync drops the map, which is rebuilt on the next search """
+        self.assert_found('web2', '104')
+        self.servers_elt.append(_item('web3', '106'))
+        item_elt = _item('web4', '107')
+        self.servers_elt.append(item_elt)
+        self.index.add(self.servers_elt, item_elt)
+
+        self.assert_found('web3', '106')
+        self.assert_found('web4', '107')
+        self.assertEqual(self.scans(), 3 + 5)
+
+
+class TestHaproxyIdAllocator(unittest.TestCase):
+
+    def setUp(self):
+        self.profiler = HaproxyProfiler()
+        self.ids = HaproxyIdAllocator(fromstring(HAPROXY), profiler=self.profiler)
+
+    ##############
+    # tests
+    #
+    def test_next_id(self):
+        """ test the ids follow the highest one in use, ignoring the ones which are not numbers """
+        self.assertEqual(self.ids.next_id(), '105')
+        self.assertEqual(self.ids.next_id(), '106')
+        self.assertEqual(self.profiler.visited['ids'], 4)
+
+    def test_reserve(self):
+        """ test the ids assigned without the allocator are not given again """
+        self.ids.reserve('110')
+        self.ids.reserve('abc')
+        self.ids.reserve(None)
+        self.assertEqual(self.ids.next_id(), '111')
+        self.ids.reserve('111')
+        self.assertEqual(self.ids.next_id(), '112')
+
+    def test_no_haproxy(self):
+        """ test the first id when there is no haproxy configuration """
+        ids = HaproxyIdAllocator(None)
+        self.assertEqual(ids.next_id(), '100')
+        self.assertEqual(ids.next_id(), '101')
@@ -0,0 +1,150 @@
+# Copyright: (c) 2025, Nicholas Morey <nicholas@morey.tech>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import base64
+import unittest
+from xml.etree.ElementTree import fromstring
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_render import render_haproxy_cfg
+
+FRONTENDS = """<ha_backends>
+<item>
+<name>web-frontend</name><status>active</status><type>http</type><max_connections>500</max_connections><httpclose>http-keep-alive</httpclose>
+<backend_serverpool>web</backend_serverpool>
+<a_extaddr>
+<item><extaddr>any_ipv4</extaddr><extaddr_port>443</extaddr_port><extaddr_ssl>yes</extaddr_ssl><extaddr_advanced>alpn h2,http/1.1</extaddr_advanced></item>
+<item><extaddr>wan_ipv4</extaddr><extaddr_port>80</extaddr_port></item>
+</a_extaddr>
+<ha_acls>
+<item><name>is_api</name><expression>host_starts_with</expression><value>api.</value><casesensitive></casesensitive><not></not></item>
+<item><name>is_internal</name><expression>src</expression><value>10.0.0.0/8</value><casesensitive>yes</casesensitive><not>yes</not></item>
+</ha_acls>
+<a_actionitems>
+<item><action>use_backend</action><use_backendbackend>api</use_backendbackend><acl>is_api</acl></item>
+<item><action>custom</action><customcustomaction>http-request deny</customcustomaction><acl>is_api is_internal</acl></item>
+<item><action>http-request_redirect</action><http-request_redirectrule>scheme https</http-request_redirectrule></item>
+</a_actionitems>
+</item>
+<item><name>off-frontend</name><status>disabled</status><type>tcp</type><backend_serverpool>api</backend_serverpool></item>
+</ha_backends>"""
+
+POOLS = """<ha_pools>
+<item>
+<name>web</name><id>102</id><balance>roundrobin</balance><check_type>HTTP</check_type><checkinter>2000</checkinter>
+<httpcheck_method>GET</httpcheck_method><monitor_uri>/health</monitor_uri><log-health-checks>yes</log-health-checks>
+<advanced>{server_advanced}</advanced>
+<advanced_backend>{backend_advanced}</advanced_backend>
+<ha_servers>
+<item><name>web1</name><id>103</id><status>active</status><address>10.0.0.11</address><port>80</port><weight>10</weight><advanced>maxqueue 5</advanced></item>
+<item><name>web2</name><id>104</id><status>backup</status><address>10.0.0.12</address><port>443</port><ssl>yes</ssl><checkssl>yes</checkssl></item>
+<item><name>web3</name><id>105</id><status>disabled</status><address>10.0.0.13</address><port>80</port></item>
+<item><name>web4</name><id>106</id><status>inactive</status><address>10.0.0.14</address><port>80</port></item>
+</ha_servers>
+</item>
+<item>
+<name>api</name><id>107</id><check_type>none</check_type>
+<ha_servers><item><name>api1</name><id>108</id><address>10.0.1.1</address><port>8080</port></item></ha_servers>
+</item>
+</ha_pools>"""
+
+
+INCOMPLETE = """<haproxy>
+<ha_backends><item>
+<name>partial-frontend</name><type>http</type><backend_serverpool>partial</backend_serverpool>
+<a_extaddr>
+<item><extaddr_port>8080</extaddr_port></item>
+<item><extaddr>lan_ipv4</extaddr><extaddr_port>80</extaddr_port></item>
+</a_extaddr>
+</item></ha_backends>
+<ha_pools><item>
+<name>partial</name><id>110</id><check_type>none</check_type>
+<ha_servers><item><name>noaddr</name><id>111</id><port>8080</port></item></ha_servers>
+</item></ha_pools>
+</haproxy>"""
+
+
+def _b64(text):
+    """ return text encoded like the advanced fields of the webgui """
+    return base64.b64encode(text.encode('utf-8')).decode('ascii')
+
+
+class TestHaproxyRender(unittest.TestCase):
+
+    def setUp(self):
+        pools = POOLS.format(server_advanced=_b64('inter 3s'), backend_advanced=_b64('http-reuse safe\noption forwardfor'))
+        haproxy = '<haproxy><maxconn>2000</maxconn><advanced>{0}</advanced>{1}{2}</haproxy>'.format(_b64('tune.bufsize 32768'), FRONTENDS, pools)
+        self.sections = dict()
+        for section in render_haproxy_cfg(fromstring(haproxy)).strip('\n').split('\n\n'):
+            lines = section.split('\n')
+            self.sections[lines[0]] = lines[1:]
+
+    ##############
+    # tests
+    #
+    def test_render_sections(self):
+        """ test the sections rendered, the disabled frontend being skipped """
+        self.assertEqual(sorted(self.sections.keys()), ['backend api_ipvANY', 'backend web_ipvANY', 'frontend web-frontend', 'global'])
+
+    def test_render_global(self):
+        """ test the global advanced pass-thru is decoded after the global settings """
+        lines = self.sections['global']
+        self.assertEqual(lines[0], '\tmaxconn\t\t\t2000')
+        self.assertEqual(lines[-1], '\ttune.bufsize 32768')
+
+    def test_render_backend(self):
+        """ test a backend with health checks and both advanced pass-thrus """
+        self.assertEqual(self.sections['backend web_ipvANY'], [
+            '\tmode\t\t\thttp',
+            '\tid\t\t\t102',
+            '\tlog\t\t\tglobal',
+            '\toption\t\t\tlog-health-checks',
+            '\ttimeout connect\t\t30000',
+            '\ttimeout server\t\t30000',
+            '\tretries\t\t\t3',
+            '\tbalance\t\t\troundrobin',
+            '\toption\t\t\thttpchk GET /health',
+            '\thttp-reuse safe',
+            '\toption forwardfor',
+            '\tserver\t\t\tweb1 10.0.0.11:80 id 103 check inter 2000 weight 10 inter 3s maxqueue 5',
+            '\tserver\t\t\tweb2 10.0.0.12:443 id 104 ssl verify none check inter 2000 check-ssl backup inter 3s',
+            '\tserver\t\t\tweb3 10.0.0.13:80 id 105 check inter 2000 disabled inter 3s',
+        ])
+
+    def test_render_backend_no_check(self):
+        """ test a backend without health checks nor pass-thru """
+        self.assertEqual(self.sections['backend api_ipvANY'][-1], '\tserver\t\t\tapi1 10.0.1.1:8080 id 108')
+        self.assertFalse([line for line in self.sections['backend api_ipvANY'] if 'httpchk' in line or 'balance' in line])
+
+    def test_render_servers_status(self):
+        """ test a disabled server is rendered disabled and an inactive server is left out """
+        servers = '\n'.join(self.sections['backend web_ipvANY'])
+        self.assertIn('web3 10.0.0.13:80 id 105 check inter 2000 disabled', servers)
+        self.assertNotIn('web4', servers)
+
+    def test_render_frontend(self):
+        """ test a frontend with binds, acls and actions """
+        self.assertEqual(self.sections['frontend web-frontend'], [
+            '\tbind\t\t\t0.0.0.0:443 name 0.0.0.0:443 ssl crt-list /var/etc/haproxy/web-frontend.crt_list alpn h2,http/1.1',
+            '\tbind\t\t\twan_ipv4:80 name wan_ipv4:80',
+            '\tmode\t\t\thttp',
+            '\tlog\t\t\tglobal',
+            '\tmaxconn\t\t\t500',
+            '\toption\t\t\thttp-keep-alive',
+            '\ttimeout client\t\t30000',
+            '\tacl\t\t\tis_api\thost_starts_with -i api.',
+            '\tacl\t\t\tis_internal\tsrc 10.0.0.0/8',
+            '\tuse_backend api_ipvANY  if is_api',
+            '\thttp-request deny  if is_api !is_internal',
+            '\thttp-request redirect scheme https',
+            '\tdefault_backend web_ipvANY',
+        ])
+
+    def test_render_incomplete_items(self):
+        """ test a bind without address is skipped and a server without address is rendered like the package does """
+        lines = render_haproxy_cfg(fromstring(INCOMPLETE)).split('\n')
+        self.assertIn('\tbind\t\t\tlan_ipv4:80 name lan_ipv4:80', lines)
+        self.assertEqual(len([line for line in lines if line.startswith('\tbind')]), 1)
+        self.assertNotIn('None', '\n'.join(lines))
+        self.assertIn('\tserver\t\t\tnoaddr :8080 id 111', lines)
@@ -0,0 +1,56 @@
+# Copyright: (c) 2025, Nicholas Morey <nicholas@morey.tech>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import shutil
+import socketserver
+import tempfile
+import threading
+
+
+class FakeHaproxySocket(object):
+    """ stand-in for the HAProxy stats socket, recording the runtime API commands it gets
+
+    answers maps a command prefix to the output returned for it, either a string or a callable taking the command.
+    Commands without answer get an empty output, like a successful set command.
+    """
+
+    def __init__(self, answers=None):
+        self.answers = answers or dict()
+        self.commands = []
+        self.tmpdir = None
+        self.path = None
+        self.server = None
+        self.thread = None
+
+    def answer(self, command):
+        """ return the output of command """
+        self.commands.append(command)
+        for prefix, output in self.answers.items():
+            if command.startswith(prefix):
+                return output(command) if callable(output) else output
+        return ''
+
+    def __enter__(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'haproxy.socket')
+        fake = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                command = self.rfile.readline().decode('utf-8').strip()
+                self.wfile.write(fake.answer(command).encode('utf-8'))
+
+        self.server = socketserver.ThreadingUnixStreamServer(self.path, Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.tmpdir)
@@ -0,0 +1,216 @@
+# Copyright: (c) 2025, Nicholas Morey <nicholas@morey.tech>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import pytest
+import sys
+
+if sys.version_info < (2, 7):
+    pytestmark = pytest.mark.skip("pfSense Ansible modules require Python >= 2.7")
+
+from xml.etree.ElementTree import fromstring, ElementTree
+from ansible_collections.community.internal_test_tools.tests.unit.plugins.modules.utils import set_module_args
+from ansible_collections.pfsensible.haproxy.plugins.modules import pfsense_haproxy_aggregate
+from ansible_collections.pfsensible.core.tests.unit.plugins.modules.pfsense_module import TestPFSenseModule
+
+# Local fixture path for haproxy tests
+HAPROXY_FIXTURE_PATH = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+class TestPFSenseHaproxyAggregateModule(TestPFSenseModule):
+
+    module = pfsense_haproxy_aggregate
+
+    def __init__(self, *args, **kwargs):
+        super(TestPFSenseHaproxyAggregateModule, self).__init__(*args, **kwargs)
+        self.config_file = 'pfsense_haproxy_aggregate_config.xml'
+
+    def load_fixtures(self):
+        """ loading data from local haproxy fixtures """
+        fixture_file = os.path.join(HAPROXY_FIXTURE_PATH, self.config_file)
+        with open(fixture_file) as f:
+            data = f.read()
+        self.parse.return_value = ElementTree(fromstring(data))
+
+    ##############
+    # tests utils
+    #
+    def find_item(self, container_elt, name):
+        """ return the item named name in container_elt """
+        for item_elt in container_elt:
+            name_elt = item_elt.find('name')
+            if name_elt is not None and name_elt.text == name:
+                return item_elt
+        return None
+
+    def get_haproxy_elt(self):
+        """ return the haproxy element of the generated xml """
+        pkgs_elt = self.assert_find_xml_elt(self.xml_result, 'installedpackages')
+        return self.assert_find_xml_elt(pkgs_elt, 'haproxy')
+
+    def get_backend_elt(self, name):
+        """ return the generated backend named name """
+        pools_elt = self.assert_find_xml_elt(self.get_haproxy_elt(), 'ha_pools')
+        return self.find_item(pools_elt, name)
+
+    def get_frontend_elt(self, name):
+        """ return the generated frontend named name """
+        frontends_elt = self.assert_find_xml_elt(self.get_haproxy_elt(), 'ha_backends')
+        return self.find_item(frontends_elt, name)
+
+    ##############
+    # tests
+    #
+    def test_aggregate_create(self):
+        """ test creation of a backend with its servers in one run """
+        args = dict(
+            aggregated_backends=[dict(name='exchange')],
+            aggregated_backend_servers=[
+                dict(backend='exchange', name='exchange1', address='10.0.1.1', port=443),
+                dict(backend='exchange', name='exchange2', address='10.0.1.2', port=443),
+            ],
+        )
+        set_module_args(args)
+        result = self.execute_module(changed=True)
+
+        self.assertEqual(result['result_backends'], ["create haproxy_backend 'exchange', balance='none', check_type='none'"])
+        self.assertEqual(result['result_backend_servers'], [
+            "create haproxy_backend_server 'exchange1' on 'exchange', status='active', address='10.0.1.1', port=443",
+            "create haproxy_backend_server 'exchange2' on 'exchange', status='active', address='10.0.1.2', port=443",
+        ])
+
+        backend_elt = self.get_backend_elt('exchange')
+        self.assertIsNotNone(backend_elt)
+        self.assert_xml_elt_equal(backend_elt, 'id', '107')
+        servers_elt = self.assert_find_xml_elt(backend_elt, 'ha_servers')
+        self.assert_xml_elt_equal(self.find_item(servers_elt, 'exchange1'), 'id', '108')
+        self.assert_xml_elt_equal(self.find_item(servers_elt, 'exchange2'), 'id', '109')
+
+    def test_aggregate_delete_and_create(self):
+        """ test deleting then creating a server of the same name in one run, the index must follow the XML """
+        args = dict(
+            aggregated_backend_servers=[
+                dict(backend='web', name='web1', state='absent'),
+                dict(backend='web', name='web1', address='10.0.0.31', port=80),
+            ],
+        )
+        set_module_args(args)
+        result = self.execute_module(changed=True)
+
+        self.assertEqual(result['result_backend_servers'], [
+            "delete haproxy_backend_server 'web1' on 'web'",
+            "create haproxy_backend_server 'web1' on 'web', status='active', address='10.0.0.31', port=80",
+        ])
+        servers_elt = self.get_backend_elt('web').find('ha_servers')
+        servers = [item_elt for item_elt in servers_elt if item_elt.findtext('name') == 'web1']
+        self.assertEqual(len(servers), 1)
+        self.assert_xml_elt_equal(servers[0], 'address', '10.0.0.31')
+        self.assert_xml_elt_equal(servers[0], 'id', '107')
+
+    def test_aggregate_create_ids(self):
+        """ test the items created in one run get consecutive ids, the ids which are not numbers being ignored """
+        self.config_file = 'pfsense_haproxy_ids_config.xml'
+        args = dict(
+            aggregated_backends=[dict(name='api')],
+            aggregated_backend_servers=[
+                dict(backend='api', name='api1', address='10.0.1.1', port=80),
+                dict(backend='api', name='api2', address='10.0.1.2', port=80),
+                dict(backend='web', name='web3', address='10.0.0.13', port=80),
+            ],
+        )
+        set_module_args(args)
+        self.execute_module(changed=True)
+
+        backend_elt = self.get_backend_elt('api')
+        self.assert_xml_elt_equal(backend_elt, 'id', '103')
+        servers_elt = self.assert_find_xml_elt(backend_elt, 'ha_servers')
+        self.assert_xml_elt_equal(self.find_item(servers_elt, 'api1'), 'id', '104')
+        self.assert_xml_elt_equal(self.find_item(servers_elt, 'api2'), 'id', '105')
+        servers_elt = self.get_backend_elt('web').find('ha_servers')
+        self.assert_xml_elt_equal(self.find_item(servers_elt, 'web1'), 'id', 'abc')
+        self.assert_xml_elt_equal(self.find_item(servers_elt, 'web3'), 'id', '106')
+
+    def test_aggregate_purge_backend_servers(self):
+        """ test purging backend servers """
+        args = dict(
+            aggregated_backend_servers=[
+                dict(backend='web', name='web1', address='10.0.0.11', port=80),
+                dict(backend='web', name='web2', address='10.0.0.12', port=80),
+            ],
+            purge_backend_servers=True,
+        )
+        set_module_args(args)
+        result = self.execute_module(changed=True)
+
+        self.assertEqual(result['result_backend_servers'], ["delete haproxy_backend_server 'old1' on 'old'"])
+        servers_elt = self.get_backend_elt('old').find('ha_servers')
+        self.assertIsNone(self.find_item(servers_elt, 'old1'))
+
+    def test_aggregate_purge_routing(self):
+        """ test purging frontend actions, ACLs and backends together """
+        args = dict(
+            aggregated_backends=[dict(name='web', balance='roundrobin')],
+            aggregated_frontend_acls=[
+                dict(frontend='sni-frontend', name='is_web', expression='ssl_sni_matches', value='www.example.com'),
+            ],
+            aggregated_frontend_actions=[
+                dict(frontend='sni-frontend', action='use_backend', backend='web', acl='is_web'),
+            ],
+            purge_backends=True,
+            purge_frontend_acls=True,
+            purge_frontend_actions=True,
+        )
+        set_module_args(args)
+        result = self.execute_module(changed=True)
+
+        self.assertIn("delete haproxy_backend 'old'", result['result_backends'])
+        self.assertIn("delete haproxy_frontend_acl 'is_old'", result['result_frontend_acls'])
+        self.assertIn("delete haproxy_frontend_action 'is_old' -> 'old'", result['result_frontend_actions'])
+
+        self.assertIsNone(self.get_backend_elt('old'))
+        frontend_elt = self.get_frontend_elt('sni-frontend')
+        self.assertIsNone(self.find_item(frontend_elt.find('a_acl'), 'is_old'))
+        self.assertIsNone(self.find_item(frontend_elt.find('ha_acls'), 'is_old'))
+        self.assertEqual(len(frontend_elt.find('a_actionitems')), 1)
+
+    def test_aggregate_invalid_item(self):
+        """ test an invalid item is reported with its position """
+        args = dict(
+            aggregated_backend_servers=[
+                dict(backend='web', name='web3', forwardto='test-frontend', address='10.0.0.13'),
+            ],
+        )
+        set_module_args(args)
+        result = self.execute_module(failed=True)
+        self.assertEqual(result['msg'], 'aggregated_backend_servers[0]: parameters are mutually exclusive: forwardto|address')
+
+    def test_aggregate_render_only(self):
+        """ test rendering haproxy.cfg without applying the changes """
+        args = dict(
+            aggregated_backend_servers=[dict(backend='web', name='web3', address='10.0.0.13', port=80)],
+            render_only=True,
+        )
+        set_module_args(args)
+        result = self.execute_module(changed=True)
+
+        self.assertNotIn('web3', result['diff']['before'])
+        self.assertIn('\tserver\t\t\tweb3 10.0.0.13:80 id 107', result['haproxy_cfg'])
+        self.assertIn('\tuse_backend web_ipvANY  if is_web', result['haproxy_cfg'])
+        self.assertEqual(result['diff']['after'], result['haproxy_cfg'])
+
+    def test_aggregate_description_no_reload(self):
+        """ test a change of description does not reload haproxy """
+        args = dict(
+            aggregated_frontends=[dict(name='test-frontend', desc='new description')],
+            reload='deferred',
+        )
+        set_module_args(args)
+        result = self.execute_module(changed=True)
+
+        self.assertEqual(result['result_frontends'], ["update haproxy_frontend 'test-frontend' set, desc='new description'"])
+        self.assertFalse(result['reloaded'])
+        self.assertNotIn('pending_reloads', result)
+        self.assert_xml_elt_equal(self.get_frontend_elt('test-frontend'), 'desc', 'new description')
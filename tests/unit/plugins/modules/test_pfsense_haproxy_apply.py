@@ -0,0 +1,116 @@
+# Copyright: (c) 2025, Nicholas Morey <nicholas@morey.tech>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import pytest
+import sys
+
+if sys.version_info < (2, 7):
+    pytestmark = pytest.mark.skip("pfSense Ansible modules require Python >= 2.7")
+
+from xml.etree.ElementTree import fromstring, ElementTree
+from ansible_collections.community.internal_test_tools.tests.unit.compat.mock import patch
+from ansible_collections.community.internal_test_tools.tests.unit.plugins.modules.utils import AnsibleExitJson, AnsibleFailJson, set_module_args
+from ansible_collections.pfsensible.haproxy.plugins.modules import pfsense_haproxy_apply
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_apply import HAPROXY_APPLY_CMD, HAPROXY_PENDING_CMD
+from ansible_collections.pfsensible.core.tests.unit.plugins.modules.pfsense_module import TestPFSenseModule
+
+# Local fixture path for haproxy tests
+HAPROXY_FIXTURE_PATH = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+class TestPFSenseHaproxyApplyModule(TestPFSenseModule):
+
+    module = pfsense_haproxy_apply
+
+    def __init__(self, *args, **kwargs):
+        super(TestPFSenseHaproxyApplyModule, self).__init__(*args, **kwargs)
+        self.config_file = 'pfsense_haproxy_aggregate_config.xml'
+
+    def setUp(self):
+        """ mocking up the php commands, their output is set by each test """
+        super(TestPFSenseHaproxyApplyModule, self).setUp()
+        self.mock_apply_phpshell = patch('ansible_collections.pfsensible.core.plugins.module_utils.pfsense.PFSenseModule.phpshell')
+        self.apply_phpshell = self.mock_apply_phpshell.start()
+        self.apply_phpshell.return_value = (0, '', '')
+
+    def tearDown(self):
+        """ mocking down """
+        self.mock_apply_phpshell.stop()
+        super(TestPFSenseHaproxyApplyModule, self).tearDown()
+
+    def load_fixtures(self):
+        """ loading data from local haproxy fixtures """
+        fixture_file = os.path.join(HAPROXY_FIXTURE_PATH, self.config_file)
+        with open(fixture_file) as f:
+            data = f.read()
+        self.parse.return_value = ElementTree(fromstring(data))
+
+    def run_apply_test(self, args, stdout, failed=False):
+        """ run the module with the php commands printing stdout, return its result and the php commands run """
+        self.apply_phpshell.return_value = (0, stdout, '')
+        set_module_args(args)
+        self.load_fixtures()
+        with self.assertRaises(AnsibleFailJson if failed else AnsibleExitJson) as exc:
+            self.module.main()
+        commands = [call[0][0] for call in self.apply_phpshell.call_args_list]
+        return (exc.exception.args[0], commands)
+
+    ##############
+    # tests
+    #
+    def test_apply_pending(self):
+        """ test the deferred reloads are applied by one reload """
+        (result, commands) = self.run_apply_test(dict(), 'pending=3\nreloaded=1\n')
+
+        self.assertEqual(commands, [HAPROXY_APPLY_CMD.format(force='false')])
+        self.assertTrue(result['changed'])
+        self.assertTrue(result['reloaded'])
+        self.assertEqual(result['coalesced'], 3)
+
+    def test_apply_nothing_pending(self):
+        """ test nothing is done when no reload has been deferred """
+        (result, commands) = self.run_apply_test(dict(), 'pending=0\n')
+
+        self.assertEqual(commands, [HAPROXY_APPLY_CMD.format(force='false')])
+        self.assertFalse(result['changed'])
+        self.assertFalse(result['reloaded'])
+        self.assertEqual(result['coalesced'], 0)
+
+    def test_apply_force(self):
+        """ test forcing a reload when no reload has been deferred """
+        (result, commands) = self.run_apply_test(dict(force=True), 'pending=0\nreloaded=1\n')
+
+        self.assertEqual(commands, [HAPROXY_APPLY_CMD.format(force='true')])
+        self.assertTrue(result['changed'])
+        self.assertTrue(result['reloaded'])
+        self.assertEqual(result['coalesced'], 0)
+
+    def test_apply_check_failed(self):
+        """ test the module fails when haproxy_check_and_run refuses the configuration """
+        (result, commands) = self.run_apply_test(dict(), 'pending=2\nreloaded=0\nHAProxy: configuration is invalid\n', failed=True)
+
+        self.assertEqual(result['msg'], 'haproxy configuration check failed')
+        self.assertFalse(result['reloaded'])
+        self.assertEqual(result['coalesced'], 2)
+        self.assertIn('configuration is invalid', result['stdout'])
+
+    def test_apply_check_mode(self):
+        """ test check mode only reports the deferred reloads """
+        (result, commands) = self.run_apply_test(dict(_ansible_check_mode=True), 'pending=4\n')
+
+        self.assertEqual(commands, [HAPROXY_PENDING_CMD])
+        self.assertTrue(result['changed'])
+        self.assertFalse(result['reloaded'])
+        self.assertEqual(result['coalesced'], 4)
+
+    def test_apply_check_mode_nothing_pending(self):
+        """ test check mode reports no change when no reload has been deferred """
+        (result, commands) = self.run_apply_test(dict(_ansible_check_mode=True), 'pending=0\n')
+
+        self.assertEqual(commands, [HAPROXY_PENDING_CMD])
+        self.assertFalse(result['changed'])
+        self.assertEqual(result['coalesced'], 0)
@@ -4,16 +4,28 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import os
 import pytest
 import sys
 
 if sys.version_info < (2, 7):
     pytestmark = pytest.mark.skip("pfSense Ansible modules require Python >= 2.7")
 
+from xml.etree.ElementTree import fromstring, ElementTree
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.community.internal_test_tools.tests.unit.compat.mock import patch
+from ansible_collections.community.internal_test_tools.tests.unit.plugins.modules.utils import AnsibleFailJson, set_module_args
+from ansible_collections.pfsensible.core.plugins.module_utils.pfsense import PFSenseModule
 from ansible_collections.pfsensible.haproxy.plugins.modules import pfsense_haproxy_backend
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_advanced import decode_advanced
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_apply import HAPROXY_DEFER_RELOAD_CMD, HAPROXY_RELOAD_CMD
 from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_backend import PFSenseHaproxyBackendModule
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_backend_server import PFSenseHaproxyBackendServerModule
 from ansible_collections.pfsensible.core.tests.unit.plugins.modules.pfsense_module import TestPFSenseModule
 
+# Local fixture path for haproxy tests
+HAPROXY_FIXTURE_PATH = os.path.join(os.path.dirname(__file__), 'fixtures')
+
 
 class TestPFSenseHaproxyBackendModule(TestPFSenseModule):
 
@@ -24,6 +36,13 @@ class TestPFSenseHaproxyBackendModule(TestPFSenseModule):
         self.config_file = 'pfsense_haproxy_backend_config.xml'
         self.pfmodule = PFSenseHaproxyBackendModule
 
+    def load_fixtures(self):
+        """ loading data from local haproxy fixtures """
+        fixture_file = os.path.join(HAPROXY_FIXTURE_PATH, self.config_file)
+        with open(fixture_file) as f:
+            data = f.read()
+        self.parse.return_value = ElementTree(fromstring(data))
+
     ##############
     # tests utils
     #
@@ -42,6 +61,13 @@ class TestPFSenseHaproxyBackendModule(TestPFSenseModule):
             self.fail('haproxy_backend ' + obj['name'] + ' not found.')
         return None
 
+    @staticmethod
+    def get_pfmodule(module_class, args, pfsense=None):
+        """ return a module_class instance for args, working on pfsense or on a freshly loaded config """
+        set_module_args(args)
+        module = AnsibleModule(argument_spec=module_class.get_argument_spec(), supports_check_mode=True)
+        return module_class(module, pfsense if pfsense is not None else PFSenseModule(module))
+
     def check_target_elt(self, obj, target_elt, backend_id=100):
         """ test the xml definition of backend """
         def _check_elt(name, fname=None, default=None):
@@ -103,6 +129,20 @@ class TestPFSenseHaproxyBackendModule(TestPFSenseModule):
         command = "create haproxy_backend 'exchange', balance='roundrobin', check_type='HTTP'"
         self.do_module_test(backend, command=command, backend_id=102)
 
+    def test_haproxy_backend_create_deferred(self):
+        """ test a deferred reload only flags haproxy as dirty, reporting the reloads pending """
+        with patch('ansible_collections.pfsensible.core.plugins.module_utils.pfsense.PFSenseModule.phpshell') as phpshell:
+            phpshell.return_value = (0, 'pending=2\n', '')
+            set_module_args(dict(name='exchange', reload='deferred'))
+            result = self.execute_module(changed=True)
+            commands = [call[0][0] for call in phpshell.call_args_list]
+
+        self.assertIn(HAPROXY_DEFER_RELOAD_CMD, commands)
+        self.assertNotIn(HAPROXY_RELOAD_CMD, commands)
+        self.assertEqual(result['pending_reloads'], 2)
+        self.assertFalse(result['reloaded'])
+        self.assertEqual(result['commands'], ["create haproxy_backend 'exchange', balance='none', check_type='none'"])
+
     def test_haproxy_backend_create_invalid_name(self):
         """ test creation of a new backend """
         backend = dict(name='exchange test')
@@ -127,3 +167,130 @@ class TestPFSenseHaproxyBackendModule(TestPFSenseModule):
         backend = dict(name='test-backend', balance='uri', check_type='SSL', check_frequency=123456, httpcheck_method='OPTIONS')
         command = "update haproxy_backend 'test-backend' set balance_uriwhole=False, log_checks=False"
         self.do_module_test(backend, changed=True, command=command)
+
+    def test_haproxy_backend_create_reuse(self):
+        """ test creation of a new backend reusing the connections to its servers """
+        backend = dict(name='exchange', http_reuse='always', pool_max_conn=100, pool_purge_delay='10s')
+        command = "create haproxy_backend 'exchange', balance='none', check_type='none', http_reuse='always', pool_max_conn=100, pool_purge_delay='10s'"
+        self.do_module_test(backend, command=command, backend_id=102)
+
+        target_elt = self.get_target_elt(backend)
+        lines = ['http-reuse always', 'default-server pool-max-conn 100', 'default-server pool-purge-delay 10s']
+        self.assertEqual(decode_advanced(target_elt.findtext('advanced_backend')), lines)
+
+    def test_haproxy_backend_update_reuse(self):
+        """ test updating the reuse options, the other lines of the backend pass thru are kept """
+        self.config_file = 'pfsense_haproxy_backend_reuse_config.xml'
+        backend = dict(name='test-backend', balance='roundrobin', http_reuse='aggressive', pool_max_conn=-1)
+        command = "update haproxy_backend 'test-backend' set http_reuse='aggressive', pool_max_conn=-1"
+        self.do_module_test(backend, changed=True, command=command)
+
+        target_elt = self.get_target_elt(backend)
+        lines = ['http-reuse aggressive', 'option forwardfor', 'default-server pool-max-conn -1']
+        self.assertEqual(decode_advanced(target_elt.findtext('advanced_backend')), lines)
+
+    def test_haproxy_backend_update_reuse_other_option(self):
+        """ test updating one reuse option, the lines of the others are kept """
+        self.config_file = 'pfsense_haproxy_backend_reuse_config.xml'
+        backend = dict(name='test-backend', balance='roundrobin', pool_purge_delay='5s')
+        command = "update haproxy_backend 'test-backend' set pool_purge_delay='5s'"
+        self.do_module_test(backend, changed=True, command=command)
+
+        target_elt = self.get_target_elt(backend)
+        lines = ['http-reuse safe', 'option forwardfor', 'default-server pool-max-conn 100', 'default-server pool-purge-delay 5s']
+        self.assertEqual(decode_advanced(target_elt.findtext('advanced_backend')), lines)
+
+    def test_haproxy_backend_update_reuse_noop(self):
+        """ test not updating the reuse options """
+        self.config_file = 'pfsense_haproxy_backend_reuse_config.xml'
+        backend = dict(name='test-backend', balance='roundrobin', http_reuse='safe', pool_max_conn=100)
+        self.do_module_test(backend, changed=False)
+
+    def test_haproxy_backend_invalid_pool_purge_delay(self):
+        """ test pool_purge_delay must be a haproxy time """
+        backend = dict(name='exchange', pool_purge_delay='10 seconds')
+        msg = "pool_purge_delay must be a haproxy time, like 5s or 500ms"
+        self.do_module_test(backend, msg=msg, failed=True)
+
+    def test_haproxy_backend_create_hdr_consistent(self):
+        """ test creation of a new backend hashing a header consistently """
+        backend = dict(name='cache', balance='hdr', balance_hdr='X-Cache-Key', hash_type='consistent')
+        set_module_args(backend)
+        result = self.execute_module(changed=True)
+
+        command = "create haproxy_backend 'cache', balance='hdr', balance_hdr='X-Cache-Key', hash_type='consistent', check_type='none'"
+        self.assertEqual(result['commands'], [command])
+        target_elt = self.get_target_elt(backend)
+        self.assert_xml_elt_equal(target_elt, 'balance', 'hdr(X-Cache-Key)')
+        self.assertEqual(decode_advanced(target_elt.findtext('advanced_backend')), ['hash-type consistent'])
+
+    def test_haproxy_backend_update_random(self):
+        """ test updating a backend to the random algorithm """
+        backend = dict(
+            name='test-backend', balance='random', balance_random_draws=3, log_checks=True, check_type='SSL', check_frequency=123456, httpcheck_method='OPTIONS'
+        )
+        set_module_args(backend)
+        self.execute_module(changed=True)
+        self.assert_xml_elt_equal(self.get_target_elt(backend), 'balance', 'random(3)')
+
+    def test_haproxy_backend_hdr_required(self):
+        """ test balance_hdr is required by the hdr algorithm """
+        backend = dict(name='cache', balance='hdr')
+        msg = "balance_hdr is required when balance is 'hdr'"
+        self.do_module_test(backend, msg=msg, failed=True)
+
+    def test_haproxy_backend_uri_param_other_balance(self):
+        """ test the uri arguments are refused with another algorithm """
+        backend = dict(name='cache', balance='roundrobin', balance_urilen=10)
+        msg = "balance_urilen is only valid when balance is 'uri'"
+        self.do_module_test(backend, msg=msg, failed=True)
+
+    def test_haproxy_backend_hash_type_not_hashing(self):
+        """ test hash_type is refused with an algorithm which does not hash """
+        backend = dict(name='cache', balance='leastconn', hash_type='consistent')
+        msg = "hash_type is only valid when balance is one of source, uri, hdr, url_param"
+        self.do_module_test(backend, msg=msg, failed=True)
+
+    def test_haproxy_backend_sections_shared(self):
+        """ test the haproxy sections are looked up once for all the modules working on the same config """
+        self.load_fixtures()
+        backend = self.get_pfmodule(PFSenseHaproxyBackendModule, dict(name='exchange'))
+        pfsense = backend.pfsense
+        server = self.get_pfmodule(PFSenseHaproxyBackendServerModule, dict(backend='test-backend', name='exchange'), pfsense)
+
+        with patch.object(pfsense, 'get_element', wraps=pfsense.get_element) as get_element:
+            self.assertIs(backend.backends, server.backends)
+            self.assertIs(backend.haproxy, server.haproxy)
+            self.assertEqual(get_element.call_count, 1)
+        self.assertIs(pfsense.haproxy_sections['ha_pools'], backend.backends)
+
+    def test_haproxy_backend_not_installed(self):
+        """ test a missing haproxy configuration is only reported when the module runs """
+        self.load_fixtures()
+        pkgs_elt = self.parse.return_value.getroot().find('installedpackages')
+        pkgs_elt.remove(pkgs_elt.find('haproxy'))
+        backend = self.get_pfmodule(PFSenseHaproxyBackendModule, dict(name='exchange'))
+
+        with self.assertRaises(AnsibleFailJson) as exc:
+            backend.run(backend.module.params)
+        self.assertEqual(exc.exception.args[0]['msg'], 'Unable to find backends XML configuration entry. Are you sure haproxy is installed ?')
+
+    def test_haproxy_backend_profile(self):
+        """ test the timings returned when profiling """
+        set_module_args(dict(name='exchange', profile=True))
+        result = self.execute_module(changed=True)
+
+        timings = result['timings']
+        for phase in ['load_config', 'validate', 'lookup', 'id_allocation', 'xml_update', 'fingerprint', 'write_config', 'phpshell']:
+            self.assertIn(phase, timings['phases'])
+            self.assertGreaterEqual(timings['phases'][phase], 0)
+        self.assertEqual(timings['calls']['lookup'], 1)
+        self.assertEqual(timings['calls']['fingerprint'], 2)
+        self.assertEqual(timings['visited']['index'], 1)
+        self.assertGreater(timings['visited']['fingerprint'], 0)
+
+    def test_haproxy_backend_no_profile(self):
+        """ test no timings are returned by default """
+        set_module_args(dict(name='exchange'))
+        result = self.execute_module(changed=True)
+        self.assertNotIn('timings', result)
@@ -10,9 +10,11 @@ import sys
 if sys.version_info < (2, 7):
     pytestmark = pytest.mark.skip("pfSense Ansible modules require Python >= 2.7")
 
+from ansible_collections.community.internal_test_tools.tests.unit.plugins.modules.utils import set_module_args
 from ansible_collections.pfsensible.haproxy.plugins.modules import pfsense_haproxy_backend_server
 from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_backend_server import PFSenseHaproxyBackendServerModule
 from ansible_collections.pfsensible.core.tests.unit.plugins.modules.pfsense_module import TestPFSenseModule
+from ansible_collections.pfsensible.haproxy.tests.unit.plugins.modules.fake_haproxy_socket import FakeHaproxySocket
 
 
 class TestPFSenseHaproxyBackendServerModule(TestPFSenseModule):
@@ -150,6 +152,20 @@ class TestPFSenseHaproxyBackendServerModule(TestPFSenseModule):
         )
         self.do_module_test(server, command=command, server_id=103)
 
+    def test_haproxy_backend_server_create_render_only(self):
+        """ test rendering haproxy.cfg without creating the backend server """
+        server = dict(backend='test-backend', name='exchange', address='exchange.acme.org', port=443, render_only=True)
+        set_module_args(server)
+        result = self.execute_module(changed=True)
+
+        line = '\tserver\t\t\texchange exchange.acme.org:443 id 103 check inter 123456'
+        self.assertNotIn(line, result['diff']['before'].split('\n'))
+        self.assertIn(line, result['haproxy_cfg'].split('\n'))
+        self.assertIn('\tserver\t\t\texchange.acme.org exchange.acme.org:443 id 101 check inter 123456', result['diff']['before'].split('\n'))
+        self.assertEqual(result['diff']['after'], result['haproxy_cfg'])
+        command = "create haproxy_backend_server 'exchange' on 'test-backend', status='active', address='exchange.acme.org', port=443"
+        self.assertEqual(result['commands'], [command])
+
     def test_haproxy_backend_server_create_invalid_backend(self):
         """ test creation of a new backend server """
         server = dict(backend='test.backend', name='exchange', address='exchange.acme.org', port=443)
@@ -187,6 +203,17 @@ class TestPFSenseHaproxyBackendServerModule(TestPFSenseModule):
         command = "update haproxy_backend_server 'exchange2.acme.org' on 'test-backend' set ca='test ca2', crl='test crl2', clientcert='test cert2'"
         self.do_module_test(server, changed=True, command=command, server_id=102)
 
+    def test_haproxy_backend_server_update_certs_scans(self):
+        """ test the certificate stores are scanned once by descr and once by refid when updating certs """
+        server = dict(
+            backend='test-backend', name='exchange2.acme.org', address='exchange2.acme.org', port=443, ca='test ca2', clientcert='test cert2', crl='test crl2'
+        )
+        set_module_args(dict(server, profile=True))
+        result = self.execute_module(changed=True)
+
+        # 3 certs, 2 cas and 2 crls, walked by descr to set the refids and by refid to log the previous names
+        self.assertEqual(result['timings']['visited']['certs'], 14)
+
     def test_haproxy_backend_server_update_certs2(self):
         """ test updating certs """
         server = dict(
@@ -226,3 +253,187 @@ class TestPFSenseHaproxyBackendServerModule(TestPFSenseModule):
         server = dict(backend='test-backend', name='exchange', forwardto='test frontend')
         msg = "The frontend named 'test frontend' does not exist"
         self.do_module_test(server, msg=msg, failed=True)
+
+    def test_haproxy_backend_server_servers_exclusive(self):
+        """ test replacing all the servers of a backend """
+        servers = [
+            dict(name='exchange.acme.org', address='exchange.acme.org', port=443),
+            dict(name='exchange3.acme.org', address='exchange3.acme.org', port=443),
+        ]
+        set_module_args(dict(backend='test-backend', servers=servers, exclusive=True))
+        result = self.execute_module(changed=True)
+
+        self.assertEqual(result['commands'], [
+            "create haproxy_backend_server 'exchange3.acme.org' on 'test-backend', status='active', address='exchange3.acme.org', port=443",
+            "delete haproxy_backend_server 'exchange2.acme.org' on 'test-backend'",
+        ])
+        self.check_target_elt(servers[1], self.get_target_elt(dict(backend='test-backend', name='exchange3.acme.org')), 103)
+        self.assertIsNone(self.get_target_elt(dict(backend='test-backend', name='exchange2.acme.org'), absent=True))
+
+    def test_haproxy_backend_server_servers_invalid_item(self):
+        """ test an invalid item of servers is reported with its position """
+        servers = [dict(name='exchange3.acme.org', address='exchange3.acme.org', forwardto='test-frontend')]
+        set_module_args(dict(backend='test-backend', servers=servers))
+        result = self.execute_module(failed=True)
+        self.assertEqual(result['msg'], 'servers[0]: parameters are mutually exclusive: forwardto|address')
+
+    def run_runtime_test(self, server, answers=None):
+        """ run the module with apply_via=runtime against a fake stats socket, return its result and the commands the socket got """
+        with FakeHaproxySocket(answers) as fake:
+            set_module_args(dict(server, apply_via='runtime', runtime_socket=fake.path))
+            result = self.execute_module(changed=True)
+        return (result, fake.commands)
+
+    def test_haproxy_backend_server_runtime_weight(self):
+        """ test pushing a weight change through the runtime API """
+        server = dict(backend='test-backend', name='exchange.acme.org', address='exchange.acme.org', port=443, weight=10)
+        (result, commands) = self.run_runtime_test(server)
+
+        self.assertEqual(commands, ['set server test-backend_ipvANY/exchange.acme.org weight 10'])
+        self.assertEqual(result['runtime_commands'], commands)
+        self.assertFalse(result['reloaded'])
+        self.assertNotIn('runtime_error', result)
+        self.assert_xml_elt_equal(self.get_target_elt(server), 'weight', '10')
+
+    def test_haproxy_backend_server_create_options(self):
+        """ test creation of a new backend server with queue, slowstart and health check options """
+        server = dict(
+            backend='test-backend', name='exchange', address='exchange.acme.org', port=443, maxqueue=100, slowstart='60s', rise=3, advanced='check-sni acme.org'
+        )
+        set_module_args(server)
+        result = self.execute_module(changed=True)
+
+        command = (
+            "create haproxy_backend_server 'exchange' on 'test-backend', status='active', address='exchange.acme.org', port=443, "
+            "maxqueue=100, slowstart='60s', rise=3, advanced='check-sni acme.org'"
+        )
+        self.assertEqual(result['commands'], [command])
+        self.assert_xml_elt_equal(self.get_target_elt(server), 'advanced', 'check-sni acme.org maxqueue 100 slowstart 60s rise 3')
+
+    def test_haproxy_backend_server_update_options(self):
+        """ test updating the health check options of a backend server, they require a reload """
+        server = dict(backend='test-backend', name='exchange.acme.org', address='exchange.acme.org', port=443, inter='2s', downinter='10s')
+        (result, commands) = self.run_runtime_test(server)
+
+        self.assertEqual(result['commands'], ["update haproxy_backend_server 'exchange.acme.org' on 'test-backend' set inter='2s', downinter='10s'"])
+        self.assertEqual(commands, [])
+        self.assert_xml_elt_equal(self.get_target_elt(server), 'advanced', 'inter 2s downinter 10s')
+
+    def test_haproxy_backend_server_invalid_inter(self):
+        """ test the check intervals must be haproxy times """
+        server = dict(backend='test-backend', name='exchange', address='exchange.acme.org', port=443, fastinter='1 second')
+        msg = "fastinter must be a haproxy time, like 2s or 500ms"
+        self.do_module_test(server, msg=msg, failed=True)
+
+    def test_haproxy_backend_server_option_in_advanced(self):
+        """ test an option can not also be set in advanced """
+        server = dict(backend='test-backend', name='exchange', address='exchange.acme.org', port=443, fall=2, advanced='fall 5')
+        msg = "fall is set both as an option and in advanced"
+        self.do_module_test(server, msg=msg, failed=True)
+
+    def test_haproxy_backend_server_create_http2_ssl(self):
+        """ test creation of a backend server speaking http/2 over ssl, negotiated with alpn """
+        server = dict(backend='test-backend', name='exchange', address='exchange.acme.org', port=443, ssl=True, http2=True)
+        set_module_args(server)
+        result = self.execute_module(changed=True)
+
+        command = "create haproxy_backend_server 'exchange' on 'test-backend', status='active', address='exchange.acme.org', port=443, ssl=True, http2=True"
+        self.assertEqual(result['commands'], [command])
+        self.assert_xml_elt_equal(self.get_target_elt(server), 'advanced', 'alpn h2')
+
+    def test_haproxy_backend_server_update_http2(self):
+        """ test switching a clear backend server to http/2 """
+        server = dict(backend='test-backend', name='exchange.acme.org', address='exchange.acme.org', port=443, inter='2s', http2=True)
+        (result, commands) = self.run_runtime_test(server)
+
+        self.assertEqual(result['commands'], ["update haproxy_backend_server 'exchange.acme.org' on 'test-backend' set inter='2s', http2=True"])
+        self.assertEqual(commands, [])
+        self.assert_xml_elt_equal(self.get_target_elt(server), 'advanced', 'inter 2s proto h2')
+
+    def test_haproxy_backend_server_http2_in_advanced(self):
+        """ test http2 can not also be set in advanced """
+        server = dict(backend='test-backend', name='exchange', address='exchange.acme.org', port=80, http2=True, advanced='proto h2')
+        msg = "http2 is set both as an option and with alpn or proto in advanced"
+        self.do_module_test(server, msg=msg, failed=True)
+
+    def test_haproxy_backend_server_runtime_state(self):
+        """ test pushing a mode change through the runtime API """
+        server = dict(backend='test-backend', name='exchange.acme.org', address='exchange.acme.org', port=443, mode='disabled', weight=5)
+        (result, commands) = self.run_runtime_test(server)
+
+        self.assertEqual(commands, [
+            'set server test-backend_ipvANY/exchange.acme.org state maint',
+            'set server test-backend_ipvANY/exchange.acme.org weight 5',
+        ])
+        self.assert_xml_elt_equal(self.get_target_elt(server), 'status', 'disabled')
+
+    def test_haproxy_backend_server_runtime_reload(self):
+        """ test changes the runtime API can not apply reload haproxy """
+        server = dict(backend='test-backend', name='exchange.acme.org', address='exchange3.acme.org', port=443, weight=10)
+        (result, commands) = self.run_runtime_test(server)
+
+        self.assertEqual(commands, [])
+        self.assertNotIn('runtime_commands', result)
+        self.assert_xml_elt_equal(self.get_target_elt(server), 'address', 'exchange3.acme.org')
+
+    def test_haproxy_backend_server_runtime_error(self):
+        """ test haproxy is reloaded when the runtime API fails """
+        server = dict(backend='test-backend', name='exchange.acme.org', address='exchange.acme.org', port=443, weight=10)
+        (result, commands) = self.run_runtime_test(server, {'set server': 'No such server.\n'})
+
+        self.assertEqual(len(commands), 1)
+        self.assertEqual(result['runtime_commands'], [])
+        self.assertEqual(result['runtime_error'], "'set server test-backend_ipvANY/exchange.acme.org weight 10' failed: No such server.")
+
+    @staticmethod
+    def stat_answer(*scurs):
+        """ return a show stat answer giving the sessions of exchange.acme.org, one value per call """
+        calls = []
+
+        def answer(command):
+            scur = scurs[min(len(calls), len(scurs) - 1)]
+            calls.append(command)
+            return (
+                '# pxname,svname,qcur,qmax,scur,smax,\n'
+                'test-backend_ipvANY,exchange.acme.org,0,0,{0},10,\n'
+                'test-backend_ipvANY,exchange2.acme.org,0,0,7,10,\n'.format(scur)
+            )
+        return answer
+
+    def test_haproxy_backend_server_drain(self):
+        """ test draining a server before deleting it """
+        server = dict(backend='test-backend', name='exchange.acme.org', state='absent', drain=True, drain_timeout=10)
+        with FakeHaproxySocket({'show stat': self.stat_answer(2, 0)}) as fake:
+            set_module_args(dict(server, runtime_socket=fake.path))
+            result = self.execute_module(changed=True)
+
+        self.assertEqual(fake.commands, [
+            'set server test-backend_ipvANY/exchange.acme.org state drain',
+            'show stat test-backend_ipvANY 4 -1',
+            'show stat test-backend_ipvANY 4 -1',
+        ])
+        self.assertTrue(result['drained'])
+        self.assertGreaterEqual(result['drain_time'], 0)
+        self.assertIsNone(self.get_target_elt(server, absent=True))
+
+    def test_haproxy_backend_server_drain_timeout(self):
+        """ test a server is deleted when its sessions do not end in time """
+        server = dict(backend='test-backend', name='exchange.acme.org', state='absent', drain=True, drain_timeout=0)
+        with FakeHaproxySocket({'show stat': self.stat_answer(2)}) as fake:
+            set_module_args(dict(server, runtime_socket=fake.path))
+            result = self.execute_module(changed=True)
+
+        self.assertEqual(len(fake.commands), 2)
+        self.assertFalse(result['drained'])
+        self.assertIsNone(self.get_target_elt(server, absent=True))
+
+    def test_haproxy_backend_server_drain_error(self):
+        """ test a server is deleted when it can not be drained """
+        server = dict(backend='test-backend', name='exchange.acme.org', state='absent', drain=True)
+        with FakeHaproxySocket({'set server': 'No such server.\n'}) as fake:
+            set_module_args(dict(server, runtime_socket=fake.path))
+            result = self.execute_module(changed=True)
+
+        self.assertFalse(result['drained'])
+        self.assertEqual(result['drain_error'], "'set server test-backend_ipvANY/exchange.acme.org state drain' failed: No such server.")
+        self.assertIsNone(self.get_target_elt(server, absent=True))
@@ -0,0 +1,243 @@
+# Copyright: (c) 2025, Chris Morton <cosmo@cosmo.2y.net>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import pytest
+import sys
+
+if sys.version_info < (2, 7):
+    pytestmark = pytest.mark.skip("pfSense Ansible modules require Python >= 2.7")
+
+from xml.etree.ElementTree import fromstring, ElementTree
+from ansible_collections.pfsensible.haproxy.plugins.modules import pfsense_haproxy_frontend
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_frontend import PFSenseHaproxyFrontendModule
+from ansible_collections.pfsensible.core.tests.unit.plugins.modules.pfsense_module import TestPFSenseModule
+
+# Local fixture path for haproxy tests
+HAPROXY_FIXTURE_PATH = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+class TestPFSenseHaproxyFrontendModule(TestPFSenseModule):
+
+    module = pfsense_haproxy_frontend
+
+    def __init__(self, *args, **kwargs):
+        super(TestPFSenseHaproxyFrontendModule, self).__init__(*args, **kwargs)
+        self.config_file = 'pfsense_haproxy_frontend_config.xml'
+        self.pfmodule = PFSenseHaproxyFrontendModule
+
+    def load_fixtures(self):
+        """ loading data from local haproxy fixtures """
+        fixture_file = os.path.join(HAPROXY_FIXTURE_PATH, self.config_file)
+        with open(fixture_file) as f:
+            data = f.read()
+        self.parse.return_value = ElementTree(fromstring(data))
+
+    ##############
+    # tests utils
+    #
+    def get_target_elt(self, obj, absent=False, module_result=None):
+        """ get the generated frontend xml definition """
+        pkgs_elt = self.assert_find_xml_elt(self.xml_result, 'installedpackages')
+        hap_elt = self.assert_find_xml_elt(pkgs_elt, 'haproxy')
+        frontends_elt = self.assert_find_xml_elt(hap_elt, 'ha_backends')
+
+        for item in frontends_elt:
+            name_elt = item.find('name')
+            if name_elt is not None and name_elt.text == obj['name']:
+                return item
+
+        if not absent:
+            self.fail('haproxy_frontend ' + obj['name'] + ' not found.')
+        return None
+
+    def check_target_elt(self, obj, target_elt, dcertadv=None, certificates=None):
+        """ test the xml definition of frontend """
+        self.assert_xml_elt_equal(target_elt, 'type', obj.get('type', 'http'))
+        if obj.get('backend_serverpool'):
+            self.assert_xml_elt_equal(target_elt, 'backend_serverpool', obj['backend_serverpool'])
+        if dcertadv is not None:
+            self.assert_xml_elt_equal(target_elt, 'dcertadv', dcertadv)
+        if certificates is not None:
+            self.assert_xml_elt_equal(target_elt, 'ssloffloadcert', certificates[0])
+            self.assertEqual(PFSenseHaproxyFrontendModule._get_certificates(target_elt), certificates[1:])
+
+    ##############
+    # tests
+    #
+    def test_haproxy_frontend_create_alpn(self):
+        """ test creation of a new frontend advertising protocols by ALPN """
+        frontend = dict(name='new-frontend', backend_serverpool='test-backend', ssloffloadcert='web cert', alpn=['h2', 'http/1.1'])
+        command = (
+            "create haproxy_frontend 'new-frontend', type='http', backend_serverpool='test-backend', ssloffloadcert='web cert', "
+            "max_connections=100, alpn='h2,http/1.1'"
+        )
+        self.do_module_test(frontend, command=command, dcertadv='alpn h2,http/1.1')
+
+    def test_haproxy_frontend_update_alpn(self):
+        """ test updating the protocols of a frontend offloading SSL, without giving its certificate again """
+        frontend = dict(name='test-frontend', backend_serverpool='test-backend', alpn=['h2'])
+        command = "update haproxy_frontend 'test-frontend' set alpn='h2'"
+        self.do_module_test(frontend, command=command, dcertadv='alpn h2')
+
+    def test_haproxy_frontend_update_alpn_noop(self):
+        """ test not updating the protocols of a frontend """
+        frontend = dict(name='test-frontend', backend_serverpool='test-backend', alpn=['h2', 'http/1.1'])
+        self.do_module_test(frontend, changed=False)
+
+    def test_haproxy_frontend_remove_alpn(self):
+        """ test removing the protocols of a frontend with an empty list """
+        frontend = dict(name='test-frontend', backend_serverpool='test-backend', alpn=[])
+        command = "update haproxy_frontend 'test-frontend' set alpn=none"
+        self.do_module_test(frontend, command=command)
+        self.assert_xml_elt_is_none_or_empty(self.get_target_elt(frontend), 'dcertadv')
+
+    def test_haproxy_frontend_alpn_no_certificate(self):
+        """ test the protocols are refused on a new frontend without offloading certificate """
+        frontend = dict(name='new-frontend', backend_serverpool='test-backend', alpn=['h2'])
+        msg = "Parameter 'alpn' requires an SSL offloading certificate. Set 'ssloffloadcert', ALPN is only negotiated by frontends offloading SSL."
+        self.do_module_test(frontend, msg=msg, failed=True)
+
+    def test_haproxy_frontend_alpn_no_offloading(self):
+        """ test the protocols are refused on an existing frontend which does not offload SSL """
+        frontend = dict(name='plain-frontend', backend_serverpool='test-backend', alpn=['h2'])
+        msg = "Parameter 'alpn' requires an SSL offloading certificate. Set 'ssloffloadcert', ALPN is only negotiated by frontends offloading SSL."
+        self.do_module_test(frontend, msg=msg, failed=True)
+
+    def test_haproxy_frontend_ocsp_no_certificate(self):
+        """ test OCSP stapling is refused on a new frontend without offloading certificate """
+        frontend = dict(name='new-frontend', backend_serverpool='test-backend', ocsp_stapling=True)
+        msg = (
+            "Parameter 'ocsp_stapling' requires an SSL offloading certificate. "
+            "Set 'ssloffloadcert', OCSP responses are only stapled by frontends offloading SSL."
+        )
+        self.do_module_test(frontend, msg=msg, failed=True)
+
+    def test_haproxy_frontend_ocsp_no_offloading(self):
+        """ test OCSP stapling is refused on an existing frontend which does not offload SSL """
+        frontend = dict(name='plain-frontend', backend_serverpool='test-backend', ocsp_stapling=True)
+        msg = (
+            "Parameter 'ocsp_stapling' requires an SSL offloading certificate. "
+            "Set 'ssloffloadcert', OCSP responses are only stapled by frontends offloading SSL."
+        )
+        self.do_module_test(frontend, msg=msg, failed=True)
+
+    def test_haproxy_frontend_alpn_invalid_type(self):
+        """ test the protocols are refused on a frontend which is not of http type """
+        frontend = dict(name='new-frontend', type='tcp', alpn=['h2'])
+        msg = "Parameter 'alpn' cannot be used with frontend type 'tcp'. ALPN is only negotiated by 'http' type frontends offloading SSL."
+        self.do_module_test(frontend, msg=msg, failed=True)
+
+    def test_haproxy_frontend_create_certificates(self):
+        """ test creation of a new frontend offloading several certificates """
+        frontend = dict(name='new-frontend', backend_serverpool='test-backend', ssloffloadcert=['web cert', 'api cert', 'admin cert'])
+        command = (
+            "create haproxy_frontend 'new-frontend', type='http', backend_serverpool='test-backend', ssloffloadcert='web cert,api cert,admin cert', "
+            "max_connections=100"
+        )
+        self.do_module_test(frontend, command=command, certificates=['5f3c4a1b2c001', '5f3c4a1b2c002', '5f3c4a1b2c003'])
+
+    def test_haproxy_frontend_update_certificates(self):
+        """ test updating the additional certificates of a frontend, logged by refid """
+        frontend = dict(name='test-frontend', backend_serverpool='test-backend', ssloffloadcert=['web cert', 'admin cert'])
+        command = "update haproxy_frontend 'test-frontend' set ssloffloadcert='5f3c4a1b2c001,5f3c4a1b2c003'"
+        self.do_module_test(frontend, command=command, certificates=['5f3c4a1b2c001', '5f3c4a1b2c003'])
+
+    def test_haproxy_frontend_update_default_certificate(self):
+        """ test swapping the default certificate with an additional one """
+        frontend = dict(name='test-frontend', backend_serverpool='test-backend', ssloffloadcert=['api cert', 'web cert'])
+        command = "update haproxy_frontend 'test-frontend' set ssloffloadcert='5f3c4a1b2c002,5f3c4a1b2c001'"
+        self.do_module_test(frontend, command=command, certificates=['5f3c4a1b2c002', '5f3c4a1b2c001'])
+
+    def test_haproxy_frontend_update_single_certificate(self):
+        """ test a single certificate only sets the default one, the additional certificates are kept """
+        frontend = dict(name='test-frontend', backend_serverpool='test-backend', ssloffloadcert='admin cert')
+        command = "update haproxy_frontend 'test-frontend' set ssloffloadcert='5f3c4a1b2c003,5f3c4a1b2c002'"
+        self.do_module_test(frontend, command=command, certificates=['5f3c4a1b2c003', '5f3c4a1b2c002'])
+
+    def test_haproxy_frontend_update_certificates_noop(self):
+        """ test not updating the certificates of a frontend """
+        frontend = dict(name='test-frontend', backend_serverpool='test-backend', ssloffloadcert=['web cert', 'api cert'])
+        self.do_module_test(frontend, changed=False)
+
+    def test_haproxy_frontend_remove_certificates(self):
+        """ test a list of one certificate removes the additional certificates """
+        frontend = dict(name='test-frontend', backend_serverpool='test-backend', ssloffloadcert=['web cert'])
+        command = "update haproxy_frontend 'test-frontend' set ssloffloadcert='5f3c4a1b2c001'"
+        self.do_module_test(frontend, command=command, certificates=['5f3c4a1b2c001'])
+
+    def test_haproxy_frontend_delete(self):
+        """ test deletion of a frontend offloading several certificates """
+        frontend = dict(name='test-frontend')
+        command = "delete haproxy_frontend 'test-frontend'"
+        self.do_module_test(frontend, delete=True, command=command)
+
+    def test_haproxy_frontend_duplicate_certificate(self):
+        """ test a certificate can not be given twice """
+        frontend = dict(name='test-frontend', backend_serverpool='test-backend', ssloffloadcert=['web cert', 'web cert'])
+        msg = "ssloffloadcert must not contain the same certificate twice"
+        self.do_module_test(frontend, msg=msg, failed=True)
+
+    def test_haproxy_frontend_invalid_certificates(self):
+        """ test the certificates must be names """
+        frontend = dict(name='test-frontend', backend_serverpool='test-backend', ssloffloadcert=['web cert', 3])
+        msg = "ssloffloadcert must be a certificate or a list of certificates"
+        self.do_module_test(frontend, msg=msg, failed=True)
+
+    def test_haproxy_frontend_invalid_certificate_type(self):
+        """ test the certificates must be a name or a list """
+        frontend = dict(name='test-frontend', backend_serverpool='test-backend', ssloffloadcert=dict(name='web cert'))
+        msg = "ssloffloadcert must be a certificate or a list of certificates"
+        self.do_module_test(frontend, msg=msg, failed=True)
+
+    def test_haproxy_frontend_missing_certificate(self):
+        """ test an additional certificate which does not exist """
+        frontend = dict(name='test-frontend', backend_serverpool='test-backend', ssloffloadcert=['web cert', 'missing cert'])
+        msg = "missing cert is not a valid certificate "
+        self.do_module_test(frontend, msg=msg, failed=True)
+
+    def test_haproxy_frontend_create_ocsp(self):
+        """ test creation of a new frontend stapling OCSP responses """
+        frontend = dict(name='new-frontend', backend_serverpool='test-backend', ssloffloadcert='web cert', ocsp_stapling=True)
+        command = (
+            "create haproxy_frontend 'new-frontend', type='http', backend_serverpool='test-backend', ssloffloadcert='web cert', "
+            "max_connections=100, ocsp_stapling=True"
+        )
+        self.do_module_test(frontend, command=command, dcertadv='ocsp-update on')
+
+    def test_haproxy_frontend_update_ocsp(self):
+        """ test enabling OCSP stapling, the protocols of the certificate options are kept """
+        frontend = dict(name='test-frontend', backend_serverpool='test-backend', ocsp_stapling=True)
+        command = "update haproxy_frontend 'test-frontend' set ocsp_stapling=True"
+        self.do_module_test(frontend, command=command, dcertadv='alpn h2,http/1.1 ocsp-update on')
+
+    def test_haproxy_frontend_update_ocsp_alpn(self):
+        """ test updating OCSP stapling and the protocols together """
+        frontend = dict(name='test-frontend', backend_serverpool='test-backend', ocsp_stapling=True, alpn=['h2'])
+        command = "update haproxy_frontend 'test-frontend' set alpn='h2', ocsp_stapling=True"
+        self.do_module_test(frontend, command=command, dcertadv='alpn h2 ocsp-update on')
+
+    def test_haproxy_frontend_disable_ocsp(self):
+        """ test disabling OCSP stapling, the protocols of the certificate options are kept """
+        frontend = dict(name='ocsp-frontend', backend_serverpool='test-backend', ocsp_stapling=False)
+        command = "update haproxy_frontend 'ocsp-frontend' set ocsp_stapling=False"
+        self.do_module_test(frontend, command=command, dcertadv='alpn h2')
+
+    def test_haproxy_frontend_update_ocsp_noop(self):
+        """ test not updating OCSP stapling """
+        frontend = dict(name='ocsp-frontend', backend_serverpool='test-backend', ocsp_stapling=True)
+        self.do_module_test(frontend, changed=False)
+
+    def test_haproxy_frontend_disable_ocsp_noop(self):
+        """ test disabling OCSP stapling on a frontend which does not staple """
+        frontend = dict(name='test-frontend', backend_serverpool='test-backend', ocsp_stapling=False)
+        self.do_module_test(frontend, changed=False)
+
+    def test_haproxy_frontend_ocsp_invalid_type(self):
+        """ test OCSP stapling is refused on a frontend which is not of http type """
+        frontend = dict(name='new-frontend', type='tcp', ocsp_stapling=True)
+        msg = "Parameter 'ocsp_stapling' cannot be used with frontend type 'tcp'. OCSP responses are only stapled by 'http' type frontends offloading SSL."
+        self.do_module_test(frontend, msg=msg, failed=True)
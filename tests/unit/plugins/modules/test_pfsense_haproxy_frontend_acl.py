@@ -0,0 +1,80 @@
+# Copyright: (c) 2025, Nicholas Morey <nicholas@morey.tech>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import pytest
+import sys
+
+if sys.version_info < (2, 7):
+    pytestmark = pytest.mark.skip("pfSense Ansible modules require Python >= 2.7")
+
+from xml.etree.ElementTree import fromstring, ElementTree
+from ansible_collections.community.internal_test_tools.tests.unit.plugins.modules.utils import set_module_args
+from ansible_collections.pfsensible.haproxy.plugins.modules import pfsense_haproxy_frontend_acl
+from ansible_collections.pfsensible.core.tests.unit.plugins.modules.pfsense_module import TestPFSenseModule
+
+# Local fixture path for haproxy tests
+HAPROXY_FIXTURE_PATH = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+class TestPFSenseHaproxyFrontendAclModule(TestPFSenseModule):
+
+    module = pfsense_haproxy_frontend_acl
+
+    def __init__(self, *args, **kwargs):
+        super(TestPFSenseHaproxyFrontendAclModule, self).__init__(*args, **kwargs)
+        self.config_file = 'pfsense_haproxy_aggregate_config.xml'
+
+    def load_fixtures(self):
+        """ loading data from local haproxy fixtures """
+        fixture_file = os.path.join(HAPROXY_FIXTURE_PATH, self.config_file)
+        with open(fixture_file) as f:
+            data = f.read()
+        self.parse.return_value = ElementTree(fromstring(data))
+
+    ##############
+    # tests utils
+    #
+    def get_acl_values(self, frontend, name):
+        """ return the values of the generated ACL named name, in a_acl and ha_acls """
+        pkgs_elt = self.assert_find_xml_elt(self.xml_result, 'installedpackages')
+        haproxy_elt = self.assert_find_xml_elt(pkgs_elt, 'haproxy')
+        frontends_elt = self.assert_find_xml_elt(haproxy_elt, 'ha_backends')
+        for item_elt in frontends_elt:
+            if item_elt.findtext('name') != frontend:
+                continue
+            values = []
+            for container in ['a_acl', 'ha_acls']:
+                for acl_elt in item_elt.find(container):
+                    if acl_elt.findtext('name') == name:
+                        values.append(acl_elt.findtext('value'))
+            return values
+        self.fail('haproxy frontend ' + frontend + ' not found.')
+
+    ##############
+    # tests
+    #
+    def test_acl_create_values(self):
+        """ test creating an ACL matching several values """
+        values = ['a.example.com', 'b.example.com', 'a.example.com']
+        set_module_args(dict(frontend='sni-frontend', name='is_tenant', expression='ssl_sni_matches', value=values))
+        result = self.execute_module(changed=True)
+
+        self.assertIn("value='a.example.com b.example.com'", result['commands'][0])
+        self.assertEqual(self.get_acl_values('sni-frontend', 'is_tenant'), ['a.example.com b.example.com', 'a.example.com b.example.com'])
+
+    def test_acl_add_value(self):
+        """ test adding a value to an ACL, the values already there are kept first """
+        set_module_args(dict(frontend='sni-frontend', name='is_web', expression='ssl_sni_matches', value=['www2.example.com', 'www.example.com']))
+        result = self.execute_module(changed=True)
+
+        self.assertEqual(result['commands'], ["update haproxy_frontend_acl 'is_web' set value='www.example.com www2.example.com'"])
+        self.assertEqual(self.get_acl_values('sni-frontend', 'is_web'), ['www.example.com www2.example.com', 'www.example.com www2.example.com'])
+
+    def test_acl_single_value_noop(self):
+        """ test a single value is still accepted as a string """
+        set_module_args(dict(frontend='sni-frontend', name='is_web', expression='ssl_sni_matches', value='www.example.com'))
+        self.execute_module(changed=False)
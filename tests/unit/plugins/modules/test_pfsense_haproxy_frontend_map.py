@@ -0,0 +1,166 @@
+# Copyright: (c) 2025, Nicholas Morey <nicholas@morey.tech>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import base64
+import os
+import pytest
+import sys
+
+if sys.version_info < (2, 7):
+    pytestmark = pytest.mark.skip("pfSense Ansible modules require Python >= 2.7")
+
+from xml.etree.ElementTree import fromstring, ElementTree
+from ansible_collections.community.internal_test_tools.tests.unit.plugins.modules.utils import set_module_args
+from ansible_collections.pfsensible.haproxy.plugins.modules import pfsense_haproxy_frontend_map
+from ansible_collections.pfsensible.core.tests.unit.plugins.modules.pfsense_module import TestPFSenseModule
+from ansible_collections.pfsensible.haproxy.tests.unit.plugins.modules.fake_haproxy_socket import FakeHaproxySocket
+
+# Local fixture path for haproxy tests
+HAPROXY_FIXTURE_PATH = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+SNI_MAP = '/var/etc/haproxy/sni-frontend.map'
+
+
+class TestPFSenseHaproxyFrontendMapModule(TestPFSenseModule):
+
+    module = pfsense_haproxy_frontend_map
+
+    def __init__(self, *args, **kwargs):
+        super(TestPFSenseHaproxyFrontendMapModule, self).__init__(*args, **kwargs)
+        self.config_file = 'pfsense_haproxy_frontend_map_config.xml'
+
+    def load_fixtures(self):
+        """ loading data from local haproxy fixtures """
+        fixture_file = os.path.join(HAPROXY_FIXTURE_PATH, self.config_file)
+        with open(fixture_file) as f:
+            data = f.read()
+        self.parse.return_value = ElementTree(fromstring(data))
+
+    ##############
+    # tests utils
+    #
+    def get_map(self, name):
+        """ return the decoded content of the generated map file named name """
+        pkgs_elt = self.assert_find_xml_elt(self.xml_result, 'installedpackages')
+        haproxy_elt = self.assert_find_xml_elt(pkgs_elt, 'haproxy')
+        files_elt = self.assert_find_xml_elt(haproxy_elt, 'files')
+        for item_elt in files_elt:
+            if item_elt.findtext('name') == name:
+                self.assertEqual(item_elt.findtext('type'), 'writetodisk')
+                return base64.b64decode(item_elt.findtext('content')).decode('utf-8')
+        self.fail('haproxy file ' + name + ' not found.')
+
+    def get_custom_actions(self, name):
+        """ return the custom actions of the generated frontend named name """
+        pkgs_elt = self.assert_find_xml_elt(self.xml_result, 'installedpackages')
+        haproxy_elt = self.assert_find_xml_elt(pkgs_elt, 'haproxy')
+        frontends_elt = self.assert_find_xml_elt(haproxy_elt, 'ha_backends')
+        for item_elt in frontends_elt:
+            if item_elt.findtext('name') == name:
+                return [elt.findtext('customcustomaction') for elt in item_elt.find('a_actionitems') if elt.findtext('action') == 'custom']
+        self.fail('haproxy frontend ' + name + ' not found.')
+
+    def run_runtime_test(self, args, answers=None):
+        """ run the module with apply_via=runtime against a fake stats socket, return its result and the commands the socket got """
+        with FakeHaproxySocket(answers) as fake:
+            set_module_args(dict(args, apply_via='runtime', runtime_socket=fake.path))
+            result = self.execute_module(changed=True)
+        return (result, fake.commands)
+
+    ##############
+    # tests
+    #
+    def test_map_create(self):
+        """ test routing an http frontend with a new map """
+        self.config_file = 'pfsense_haproxy_aggregate_config.xml'
+        hosts = [dict(host='WWW.example.com', backend='web'), dict(host='api.example.com', backend='old')]
+        set_module_args(dict(frontend='test-frontend', hosts=hosts))
+        result = self.execute_module(changed=True)
+
+        self.assertEqual(result['commands'][:3], [
+            "create haproxy_file 'test-frontend.map', type='writetodisk'",
+            "create haproxy_frontend_map 'api.example.com' on 'test-frontend', backend='old_ipvANY'",
+            "create haproxy_frontend_map 'www.example.com' on 'test-frontend', backend='web_ipvANY'",
+        ])
+        self.assertEqual(self.get_map('test-frontend.map'), 'api.example.com old_ipvANY\nwww.example.com web_ipvANY\n')
+        self.assertEqual(self.get_custom_actions('test-frontend'), [
+            'use_backend %[req.hdr(host),lower,word(1,:),map(/var/etc/haproxy/test-frontend.map)]',
+        ])
+        self.assertEqual(result['map_file'], '/var/etc/haproxy/test-frontend.map')
+
+    def test_map_noop(self):
+        """ test not changing a map """
+        hosts = [dict(host='www.example.com', backend='web'), dict(host='old.example.com', backend='old')]
+        set_module_args(dict(frontend='sni-frontend', hosts=hosts))
+        self.execute_module(changed=False)
+
+    def test_map_exclusive(self):
+        """ test replacing the entries of a map """
+        set_module_args(dict(frontend='sni-frontend', hosts=[dict(host='new.example.com', backend='web')], exclusive=True))
+        result = self.execute_module(changed=True)
+
+        self.assertEqual(result['commands'], [
+            "create haproxy_frontend_map 'new.example.com' on 'sni-frontend', backend='web_ipvANY'",
+            "delete haproxy_frontend_map 'old.example.com' on 'sni-frontend'",
+            "delete haproxy_frontend_map 'www.example.com' on 'sni-frontend'",
+        ])
+        self.assertEqual(self.get_map('sni-frontend.map'), 'new.example.com web_ipvANY\n')
+
+    def test_map_runtime(self):
+        """ test pushing the map changes through the runtime API """
+        hosts = [
+            dict(host='www.example.com', backend='old'),
+            dict(host='old.example.com', state='absent'),
+            dict(host='new.example.com', backend='web'),
+        ]
+        (result, commands) = self.run_runtime_test(dict(frontend='sni-frontend', hosts=hosts))
+
+        self.assertEqual(commands, [
+            'add map {0} new.example.com web_ipvANY'.format(SNI_MAP),
+            'del map {0} old.example.com'.format(SNI_MAP),
+            'set map {0} www.example.com old_ipvANY'.format(SNI_MAP),
+        ])
+        self.assertEqual(result['runtime_commands'], commands)
+        self.assertFalse(result['reloaded'])
+        self.assertEqual(self.get_map('sni-frontend.map'), 'new.example.com web_ipvANY\nwww.example.com old_ipvANY\n')
+
+    def test_map_runtime_new_map(self):
+        """ test a new map needs a reload """
+        self.config_file = 'pfsense_haproxy_aggregate_config.xml'
+        (result, commands) = self.run_runtime_test(dict(frontend='sni-frontend', hosts=[dict(host='www.example.com', backend='web')]))
+
+        self.assertEqual(commands, [])
+        self.assertNotIn('runtime_commands', result)
+        self.assertEqual(self.get_custom_actions('sni-frontend'), [
+            'tcp-request inspect-delay 5s',
+            'tcp-request content accept if { req.ssl_hello_type 1 }',
+            'use_backend %[req.ssl_sni,lower,map(/var/etc/haproxy/sni-frontend.map)]',
+        ])
+
+    def test_map_runtime_error(self):
+        """ test falling back to a reload when the runtime API fails """
+        args = dict(frontend='sni-frontend', hosts=[dict(host='old.example.com', state='absent')])
+        (result, commands) = self.run_runtime_test(args, answers={'del map': 'Key not found.\n'})
+
+        self.assertEqual(result['runtime_error'], "'del map {0} old.example.com' failed: Key not found.".format(SNI_MAP))
+
+    def test_map_invalid_backend(self):
+        """ test routing a host to a backend which does not exist """
+        set_module_args(dict(frontend='sni-frontend', hosts=[dict(host='www.example.com', backend='missing')]))
+        result = self.execute_module(failed=True)
+        self.assertEqual(result['msg'], "hosts[0]: the backend named 'missing' does not exist")
+
+    def test_map_invalid_content(self):
+        """ test a map file whose content has been edited by hand without encoding it """
+        set_module_args(dict(frontend='test-frontend', hosts=[dict(host='www.example.com', backend='web')]))
+        result = self.execute_module(failed=True)
+        self.assertEqual(result['msg'], "The content of the haproxy file 'test-frontend.map' is not a base64 encoded UTF-8 map")
+
+    def test_map_host_fetch_on_https(self):
+        """ test the Host header can not be used on a https frontend """
+        set_module_args(dict(frontend='sni-frontend', hosts=[dict(host='www.example.com', backend='web')], fetch='host'))
+        result = self.execute_module(failed=True)
+        self.assertEqual(result['msg'], "fetch 'host' requires an http frontend, the type of 'sni-frontend' is https")
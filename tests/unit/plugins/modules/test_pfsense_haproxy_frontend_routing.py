@@ -0,0 +1,90 @@
+# Copyright: (c) 2025, Nicholas Morey <nicholas@morey.tech>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import pytest
+import sys
+
+if sys.version_info < (2, 7):
+    pytestmark = pytest.mark.skip("pfSense Ansible modules require Python >= 2.7")
+
+from xml.etree.ElementTree import fromstring, ElementTree
+from ansible_collections.community.internal_test_tools.tests.unit.plugins.modules.utils import set_module_args
+from ansible_collections.pfsensible.haproxy.plugins.modules import pfsense_haproxy_frontend_routing
+from ansible_collections.pfsensible.core.tests.unit.plugins.modules.pfsense_module import TestPFSenseModule
+
+# Local fixture path for haproxy tests
+HAPROXY_FIXTURE_PATH = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+class TestPFSenseHaproxyFrontendRoutingModule(TestPFSenseModule):
+
+    module = pfsense_haproxy_frontend_routing
+
+    def __init__(self, *args, **kwargs):
+        super(TestPFSenseHaproxyFrontendRoutingModule, self).__init__(*args, **kwargs)
+        self.config_file = 'pfsense_haproxy_aggregate_config.xml'
+
+    def load_fixtures(self):
+        """ loading data from local haproxy fixtures """
+        fixture_file = os.path.join(HAPROXY_FIXTURE_PATH, self.config_file)
+        with open(fixture_file) as f:
+            data = f.read()
+        self.parse.return_value = ElementTree(fromstring(data))
+
+    ##############
+    # tests utils
+    #
+    def get_frontend_elt(self, name):
+        """ return the generated frontend named name """
+        pkgs_elt = self.assert_find_xml_elt(self.xml_result, 'installedpackages')
+        haproxy_elt = self.assert_find_xml_elt(pkgs_elt, 'haproxy')
+        frontends_elt = self.assert_find_xml_elt(haproxy_elt, 'ha_backends')
+        for item_elt in frontends_elt:
+            if item_elt.findtext('name') == name:
+                return item_elt
+        self.fail('haproxy frontend ' + name + ' not found.')
+
+    @staticmethod
+    def rule(acl, value, backend):
+        """ return a routing rule """
+        return dict(acl=acl, expression='ssl_sni_matches', value=value, backend=backend)
+
+    ##############
+    # tests
+    #
+    def test_routing_exclusive(self):
+        """ test replacing the routing rules of a frontend """
+        rules = [self.rule('is_new', 'new.example.com', 'web'), self.rule('is_web', 'www.example.com', 'web')]
+        set_module_args(dict(frontend='sni-frontend', rules=rules, exclusive=True))
+        result = self.execute_module(changed=True)
+
+        self.assertIn("delete haproxy_frontend_action 'is_old' -> 'old'", result['commands'])
+        self.assertIn("delete haproxy_frontend_acl 'is_old'", result['commands'])
+        self.assertEqual(result['commands'][-1], "update haproxy_frontend_routing 'sni-frontend' set order='is_new,is_web'")
+
+        frontend_elt = self.get_frontend_elt('sni-frontend')
+        actions = [(elt.findtext('acl'), elt.findtext('use_backendbackend')) for elt in frontend_elt.find('a_actionitems')]
+        self.assertEqual(actions, [('is_new', 'web'), ('is_web', 'web')])
+        self.assertEqual([elt.findtext('name') for elt in frontend_elt.find('a_acl')], ['is_web', 'is_new'])
+        self.assertEqual([elt.findtext('name') for elt in frontend_elt.find('ha_acls')], ['is_web', 'is_new'])
+
+    def test_routing_change_backend(self):
+        """ test routing an ACL to another backend """
+        set_module_args(dict(frontend='sni-frontend', rules=[self.rule('is_web', 'www.example.com', 'old')]))
+        result = self.execute_module(changed=True)
+
+        self.assertEqual(result['commands'][0], "delete haproxy_frontend_action 'is_web' -> 'web'")
+        frontend_elt = self.get_frontend_elt('sni-frontend')
+        actions = [(elt.findtext('acl'), elt.findtext('use_backendbackend')) for elt in frontend_elt.find('a_actionitems')]
+        self.assertEqual(actions, [('is_old', 'old'), ('is_web', 'old')])
+
+    def test_routing_duplicate_acl(self):
+        """ test an ACL can only be used by one rule """
+        rules = [self.rule('is_web', 'www.example.com', 'web'), self.rule('is_web', 'www.example.com', 'old')]
+        set_module_args(dict(frontend='sni-frontend', rules=rules))
+        result = self.execute_module(failed=True)
+        self.assertEqual(result['msg'], "rules[1]: duplicate acl 'is_web'")
@@ -192,3 +192,45 @@ class TestPFSenseHaproxyFrontendServerModule(TestPFSenseModule):
         server = dict(frontend='test-frontend', extaddr='wan_ipv4', extaddr_port=443)
         command = "delete haproxy_frontend_server 'wan_ipv4_443'"
         self.do_module_test(server, delete=True, command=command)
+
+    ##############
+    # bind options tests
+    #
+    def test_frontend_server_create_bind_options(self):
+        """ test creation of a frontend server binding with bind options """
+        server = dict(frontend='test-frontend', extaddr='any_ipv4', extaddr_port=80, shards='by-thread', tfo=True, backlog=4096)
+        command = "create haproxy_frontend_server 'any_ipv4_80', extaddr='any_ipv4', extaddr_port=80, shards='by-thread', tfo=True, backlog=4096"
+        self.do_module_test(server, command=command)
+        self.assert_xml_elt_equal(self.get_target_elt(server), 'extaddr_advanced', 'shards by-thread tfo backlog 4096')
+
+    def test_frontend_server_update_bind_options(self):
+        """ test setting the threads of an existing binding """
+        server = dict(frontend='test-frontend', extaddr='wan_ipv4', extaddr_port=443, extaddr_ssl='yes', thread='1-4')
+        command = "update haproxy_frontend_server 'wan_ipv4_443' set thread='1-4'"
+        self.do_module_test(server, changed=True, command=command)
+        self.assert_xml_elt_equal(self.get_target_elt(server), 'extaddr_advanced', 'thread 1-4')
+
+    def test_frontend_server_create_alpn(self):
+        """ test creation of an offloading binding advertising http/2 """
+        server = dict(frontend='test-frontend', extaddr='any_ipv4', extaddr_port=8443, extaddr_ssl='yes', alpn=['h2', 'http/1.1'])
+        command = "create haproxy_frontend_server 'any_ipv4_8443', extaddr='any_ipv4', extaddr_port=8443, extaddr_ssl='yes', alpn='h2,http/1.1'"
+        self.do_module_test(server, command=command)
+        self.assert_xml_elt_equal(self.get_target_elt(server), 'extaddr_advanced', 'alpn h2,http/1.1')
+
+    def test_frontend_server_alpn_without_ssl(self):
+        """ test alpn requires ssl offloading on the binding """
+        server = dict(frontend='test-frontend', extaddr='any_ipv4', extaddr_port=80, extaddr_ssl='no', alpn=['h2'])
+        msg = "Parameter 'alpn' requires SSL offloading on the bind (extaddr_ssl='yes')."
+        self.do_module_test(server, msg=msg, failed=True)
+
+    def test_frontend_server_invalid_thread(self):
+        """ test thread must be a thread set """
+        server = dict(frontend='test-frontend', extaddr='any_ipv4', extaddr_port=80, thread='1-four')
+        msg = "thread must be a set of threads, like 1-4, odd or 1/all"
+        self.do_module_test(server, msg=msg, failed=True)
+
+    def test_frontend_server_invalid_shards(self):
+        """ test shards must be a number or a sharding mode """
+        server = dict(frontend='test-frontend', extaddr='any_ipv4', extaddr_port=80, shards='0')
+        msg = "shards must be a positive number, by-thread or by-group"
+        self.do_module_test(server, msg=msg, failed=True)
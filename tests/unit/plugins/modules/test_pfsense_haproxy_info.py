@@ -0,0 +1,63 @@
+# Copyright: (c) 2025, Nicholas Morey <nicholas@morey.tech>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import pytest
+import sys
+
+if sys.version_info < (2, 7):
+    pytestmark = pytest.mark.skip("pfSense Ansible modules require Python >= 2.7")
+
+from xml.etree.ElementTree import fromstring, ElementTree
+from ansible_collections.community.internal_test_tools.tests.unit.plugins.modules.utils import set_module_args
+from ansible_collections.pfsensible.haproxy.plugins.modules import pfsense_haproxy_info
+from ansible_collections.pfsensible.core.tests.unit.plugins.modules.pfsense_module import TestPFSenseModule
+
+# Local fixture path for haproxy tests
+HAPROXY_FIXTURE_PATH = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+class TestPFSenseHaproxyInfoModule(TestPFSenseModule):
+
+    module = pfsense_haproxy_info
+
+    def __init__(self, *args, **kwargs):
+        super(TestPFSenseHaproxyInfoModule, self).__init__(*args, **kwargs)
+        self.config_file = 'pfsense_haproxy_aggregate_config.xml'
+
+    def load_fixtures(self):
+        """ loading data from local haproxy fixtures """
+        fixture_file = os.path.join(HAPROXY_FIXTURE_PATH, self.config_file)
+        with open(fixture_file) as f:
+            data = f.read()
+        self.parse.return_value = ElementTree(fromstring(data))
+
+    ##############
+    # tests
+    #
+    def test_info_all(self):
+        """ test gathering the whole configuration """
+        set_module_args(dict())
+        result = self.execute_module(changed=False)
+
+        self.assertEqual([backend['name'] for backend in result['backends']], ['web', 'old'])
+        self.assertEqual(result['backend_servers'][0], dict(backend='web', name='web1', id='103', status='active', address='10.0.0.11', port='80'))
+        self.assertEqual(len(result['backend_servers']), 3)
+        self.assertEqual([frontend['name'] for frontend in result['frontends']], ['test-frontend', 'sni-frontend'])
+        self.assertEqual(len(result['frontend_servers']), 2)
+        self.assertEqual(result['acls'][0], dict(frontend='sni-frontend', name='is_web', expression='ssl_sni_matches', value='www.example.com'))
+        self.assertEqual(len(result['acls']), 2)
+        self.assertEqual(result['actions'][1], dict(frontend='sni-frontend', action='use_backend', use_backendbackend='old', acl='is_old'))
+
+    def test_info_filtered(self):
+        """ test gathering only some lists of some items """
+        set_module_args(dict(gather=['backend_servers', 'actions'], backends=['we*'], frontends=['test-*']))
+        result = self.execute_module(changed=False)
+
+        self.assertEqual([server['name'] for server in result['backend_servers']], ['web1', 'web2'])
+        self.assertEqual(result['actions'], [])
+        self.assertNotIn('backends', result)
+        self.assertNotIn('acls', result)
@@ -0,0 +1,99 @@
+# Copyright: (c) 2025, Nicholas Morey <nicholas@morey.tech>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import pytest
+import sys
+
+if sys.version_info < (2, 7):
+    pytestmark = pytest.mark.skip("pfSense Ansible modules require Python >= 2.7")
+
+from xml.etree.ElementTree import fromstring, ElementTree
+from ansible_collections.community.internal_test_tools.tests.unit.plugins.modules.utils import set_module_args
+from ansible_collections.pfsensible.haproxy.plugins.modules import pfsense_haproxy_settings
+from ansible_collections.pfsensible.haproxy.plugins.module_utils.haproxy_advanced import decode_advanced
+from ansible_collections.pfsensible.core.tests.unit.plugins.modules.pfsense_module import TestPFSenseModule
+
+# Local fixture path for haproxy tests
+HAPROXY_FIXTURE_PATH = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+class TestPFSenseHaproxySettingsModule(TestPFSenseModule):
+
+    module = pfsense_haproxy_settings
+
+    def __init__(self, *args, **kwargs):
+        super(TestPFSenseHaproxySettingsModule, self).__init__(*args, **kwargs)
+        self.config_file = 'pfsense_haproxy_settings_config.xml'
+
+    def load_fixtures(self):
+        """ loading data from local haproxy fixtures """
+        fixture_file = os.path.join(HAPROXY_FIXTURE_PATH, self.config_file)
+        with open(fixture_file) as f:
+            data = f.read()
+        self.parse.return_value = ElementTree(fromstring(data))
+
+    ##############
+    # tests utils
+    #
+    def get_haproxy_elt(self):
+        """ return the haproxy element of the resulting configuration """
+        pkgs_elt = self.assert_find_xml_elt(self.xml_result, 'installedpackages')
+        return self.assert_find_xml_elt(pkgs_elt, 'haproxy')
+
+    ##############
+    # tests
+    #
+    def test_settings_noop(self):
+        """ test setting the settings already in effect """
+        set_module_args(dict(maxconn=1000, nbthread=2, ssl_cache_size=20000))
+        result = self.execute_module(changed=False)
+        self.assertEqual(result['settings'], dict(maxconn=1000, nbthread=2, ssl_cache_size=20000))
+
+    def test_settings_update(self):
+        """ test updating fields and tunes, the other advanced lines are kept """
+        set_module_args(dict(maxconn=4000, ssl_cache_size=100000, bufsize=32768))
+        result = self.execute_module(changed=True)
+
+        self.assertEqual(result['settings'], dict(maxconn=4000, nbthread=2, ssl_cache_size=100000, bufsize=32768))
+        haproxy_elt = self.get_haproxy_elt()
+        self.assert_xml_elt_equal(haproxy_elt, 'maxconn', '4000')
+        self.assertEqual(decode_advanced(haproxy_elt.findtext('advanced')), ['tune.ssl.cachesize 100000', 'log-send-hostname', 'tune.bufsize 32768'])
+
+    def test_settings_create(self):
+        """ test setting the settings on a configuration without any """
+        self.config_file = 'pfsense_haproxy_aggregate_config.xml'
+        set_module_args(dict(nbthread=4, hard_stop_after='15m', maxrewrite=1024))
+        result = self.execute_module(changed=True)
+
+        self.assertEqual(result['settings']['nbthread'], 4)
+        self.assertEqual(result['settings']['hard_stop_after'], '15m')
+        self.assertEqual(decode_advanced(self.get_haproxy_elt().findtext('advanced')), ['tune.maxrewrite 1024'])
+
+    def test_settings_maxrewrite_too_large(self):
+        """ test maxrewrite must fit in half a buffer """
+        set_module_args(dict(bufsize=8192, maxrewrite=8192))
+        result = self.execute_module(failed=True)
+        self.assertEqual(result['msg'], 'maxrewrite must not be more than half of bufsize (8192), haproxy would lower it to 4096')
+
+    def test_settings_invalid_hard_stop_after(self):
+        """ test hard_stop_after must be a haproxy time """
+        set_module_args(dict(hard_stop_after='15 minutes'))
+        result = self.execute_module(failed=True)
+        self.assertEqual(result['msg'], 'hard_stop_after must be a haproxy time, like 30s or 15m')
+
+    def test_settings_spread_checks(self):
+        """ test setting the health checks jitter """
+        set_module_args(dict(spread_checks=5))
+        result = self.execute_module(changed=True)
+        self.assertEqual(result['settings']['spread_checks'], 5)
+        self.assertEqual(decode_advanced(self.get_haproxy_elt().findtext('advanced')), ['tune.ssl.cachesize 20000', 'log-send-hostname', 'spread-checks 5'])
+
+    def test_settings_invalid_spread_checks(self):
+        """ test spread_checks is a percentage up to 50 """
+        set_module_args(dict(spread_checks=60))
+        result = self.execute_module(failed=True)
+        self.assertEqual(result['msg'], 'spread_checks must be between 0 and 50')
@@ -0,0 +1,110 @@
+# Copyright: (c) 2025, Nicholas Morey <nicholas@morey.tech>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import pytest
+import sys
+
+if sys.version_info < (2, 7):
+    pytestmark = pytest.mark.skip("pfSense Ansible modules require Python >= 2.7")
+
+from xml.etree.ElementTree import fromstring, ElementTree
+from ansible_collections.community.internal_test_tools.tests.unit.plugins.modules.utils import set_module_args
+from ansible_collections.pfsensible.haproxy.plugins.modules import pfsense_haproxy_stats
+from ansible_collections.pfsensible.core.tests.unit.plugins.modules.pfsense_module import TestPFSenseModule
+from ansible_collections.pfsensible.haproxy.tests.unit.plugins.modules.fake_haproxy_socket import FakeHaproxySocket
+
+# Local fixture path for haproxy tests
+HAPROXY_FIXTURE_PATH = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+SHOW_STAT = """# pxname,svname,qcur,qmax,scur,smax,slim,stot,bin,bout,ereq,econ,eresp,status,weight,lastchg,
+sni-frontend,FRONTEND,,,3,10,2000,100,5120,20480,1,,,OPEN,,,
+web_ipvANY,web1,0,1,2,5,,40,2048,8192,,0,0,UP,1,120,
+web_ipvANY,web2,0,0,1,5,,30,1024,4096,,2,1,DOWN,1,30,
+web_ipvANY,BACKEND,0,1,3,10,200,70,3072,12288,,2,1,UP,2,120,
+old_ipvANY,old1,0,0,0,0,,0,0,0,,0,0,MAINT,1,5,
+old_ipvANY,BACKEND,0,0,0,0,200,0,0,0,,0,0,DOWN,0,5,
+"""
+
+SHOW_INFO = """Name: HAProxy
+Version: 2.8.3
+Nbthread: 4
+Maxconn: 2000
+CurrConns: 3
+"""
+
+
+class TestPFSenseHaproxyStatsModule(TestPFSenseModule):
+
+    module = pfsense_haproxy_stats
+
+    def __init__(self, *args, **kwargs):
+        super(TestPFSenseHaproxyStatsModule, self).__init__(*args, **kwargs)
+        self.config_file = 'pfsense_haproxy_aggregate_config.xml'
+
+    def load_fixtures(self):
+        """ loading data from local haproxy fixtures """
+        fixture_file = os.path.join(HAPROXY_FIXTURE_PATH, self.config_file)
+        with open(fixture_file) as f:
+            data = f.read()
+        self.parse.return_value = ElementTree(fromstring(data))
+
+    def run_stats_test(self, args, answers=None, failed=False):
+        """ run the module against a fake stats socket, return its result and the commands the socket got """
+        if answers is None:
+            answers = {'show stat': SHOW_STAT, 'show info': SHOW_INFO}
+        with FakeHaproxySocket(answers) as fake:
+            set_module_args(dict(args, runtime_socket=fake.path))
+            if failed:
+                result = self.execute_module(failed=True)
+            else:
+                result = self.execute_module(changed=False)
+        return (result, fake.commands)
+
+    ##############
+    # tests
+    #
+    def test_stats_default(self):
+        """ test gathering the backends and servers statistics """
+        (result, commands) = self.run_stats_test(dict())
+
+        self.assertEqual(commands, ['show stat -1 6 -1'])
+        self.assertEqual([backend['name'] for backend in result['backends']], ['web', 'old'])
+        self.assertEqual(result['servers'][1], dict(
+            backend='web', name='web2', qcur=0, qmax=0, scur=1, smax=5, stot=30, econ=2, eresp=1, status='DOWN', weight=1, lastchg=30))
+        self.assertEqual(len(result['servers']), 3)
+        self.assertNotIn('frontends', result)
+        self.assertNotIn('info', result)
+
+    def test_stats_filtered(self):
+        """ test gathering some fields of some servers """
+        (result, commands) = self.run_stats_test(dict(gather=['servers'], backends=['we*'], servers=['*2'], fields=['status', 'scur']))
+
+        self.assertEqual(commands, ['show stat -1 4 -1'])
+        self.assertEqual(result['servers'], [dict(backend='web', name='web2', status='DOWN', scur=1)])
+        self.assertNotIn('backends', result)
+
+    def test_stats_single_backend(self):
+        """ test only asking haproxy for the statistics of one backend """
+        (result, commands) = self.run_stats_test(dict(backends=['web'], fields=['scur']))
+
+        self.assertEqual(commands, ['show stat web_ipvANY 6 -1'])
+        self.assertEqual(result['backends'], [dict(name='web', scur=3)])
+        self.assertEqual([server['name'] for server in result['servers']], ['web1', 'web2'])
+
+    def test_stats_frontends_info(self):
+        """ test gathering the frontends statistics and the process information """
+        (result, commands) = self.run_stats_test(dict(gather=['frontends', 'info'], info_fields=['Version', 'CurrConns']))
+
+        self.assertEqual(commands, ['show stat -1 1 -1', 'show info'])
+        self.assertEqual(result['frontends'], [dict(name='sni-frontend', scur=3, smax=10, slim=2000, stot=100, ereq=1, status='OPEN')])
+        self.assertEqual(result['info'], dict(Version='2.8.3', CurrConns=3))
+
+    def test_stats_unknown_backend(self):
+        """ test asking for a backend haproxy does not know """
+        (result, commands) = self.run_stats_test(dict(backends=['missing']), answers={'show stat': 'No such proxy.\n'}, failed=True)
+
+        self.assertEqual(result['msg'], 'unexpected show stat output: No such proxy.')